@@ -11,6 +11,9 @@ import os
 import sys
 import logging
 import logging.handlers
+import itertools
+import threading
+import collections
 from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
@@ -35,13 +38,25 @@ LOG_LEVELS = {
     "CRITICAL": logging.CRITICAL
 }
 
+# Domyślny współczynnik próbkowania logów zapisywanych do bazy danych
+# dla loggerów pracujących na poziomie DEBUG (1 na 100 rekordów)
+DEBUG_DB_SAMPLE_RATE = 0.01
+
+# Rekordy dla bazy danych zapisywane są partiami: po zebraniu DB_LOG_BATCH_SIZE
+# rekordów lub co DB_LOG_FLUSH_INTERVAL sekund. Bufor mieści DB_LOG_BUFFER_CAPACITY
+# rekordów - przy przepełnieniu odrzucane są najstarsze.
+DB_LOG_BATCH_SIZE = 500
+DB_LOG_FLUSH_INTERVAL = 0.5
+DB_LOG_BUFFER_CAPACITY = 10000
+
 def get_logger(name: str, 
                level: str = "INFO", 
                log_to_file: bool = True, 
                log_to_console: bool = True,
                log_to_db: bool = True,
                log_file: Optional[str] = None,
-               format_string: str = DEFAULT_FORMAT) -> logging.Logger:
+               format_string: str = DEFAULT_FORMAT,
+               db_sample_rate: float = 1.0) -> logging.Logger:
     """
     Konfiguruje i zwraca logger z podaną nazwą.
     
@@ -53,6 +68,8 @@ def get_logger(name: str,
         log_to_db: Czy zapisywać logi do bazy danych
         log_file: Nazwa pliku logu (domyślnie generowana z nazwy modułu)
         format_string: Format komunikatów logowania
+        db_sample_rate: Część rekordów poniżej WARNING zapisywanych do bazy danych
+            (1.0 = wszystkie)
         
     Returns:
         logging.Logger: Skonfigurowany logger
@@ -97,59 +114,151 @@ def get_logger(name: str,
     if log_to_db:
         db_handler = DatabaseLogHandler()
         db_handler.setLevel(logging.INFO)  # Zapisujemy tylko INFO i wyższe poziomy
+        if db_sample_rate < 1.0:
+            # Przy próbkowaniu do bazy trafia także próbka rekordów DEBUG
+            db_handler.setLevel(logging.DEBUG)
+            db_handler.addFilter(SamplingFilter(db_sample_rate))
         logger.addHandler(db_handler)
     
     return logger
 
 
+class SamplingFilter(logging.Filter):
+    """
+    Filtr przepuszczający tylko część rekordów logowania.
+    
+    Rekordy o poziomie INFO i wyższym są zawsze przepuszczane, z rekordów DEBUG
+    przepuszczany jest co n-ty rekord, gdzie n = 1 / rate.
+    """
+    
+    def __init__(self, rate: float = DEBUG_DB_SAMPLE_RATE):
+        """
+        Inicjalizacja filtra.
+        
+        Args:
+            rate: Część rekordów poniżej INFO, która ma zostać przepuszczona (0-1]
+        """
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError(f"Współczynnik próbkowania musi być z przedziału (0, 1]: {rate}")
+        self.rate = rate
+        self.interval = max(1, round(1 / rate))
+        self._counter = itertools.count(1)
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decyduje, czy rekord ma zostać przekazany dalej.
+        
+        Args:
+            record: Rekord logowania
+            
+        Returns:
+            bool: True, jeśli rekord ma zostać zapisany
+        """
+        if record.levelno >= logging.INFO:
+            return True
+        return next(self._counter) % self.interval == 0
+
+
 class DatabaseLogHandler(logging.Handler):
     """
     Handler do zapisywania logów w bazie danych.
     
     Ten handler zapisuje komunikaty logowania w tabeli system_logs
-    w bazie danych aplikacji.
+    w bazie danych aplikacji. Rekordy trafiają do bufora pierścieniowego,
+    z którego wątek w tle zapisuje je partiami w jednej transakcji.
     """
     
-    def __init__(self):
-        """Inicjalizacja handlera."""
+    def __init__(self, batch_size: int = DB_LOG_BATCH_SIZE,
+                 flush_interval: float = DB_LOG_FLUSH_INTERVAL,
+                 capacity: int = DB_LOG_BUFFER_CAPACITY):
+        """
+        Inicjalizacja handlera.
+        
+        Args:
+            batch_size: Liczba rekordów, po której zebraniu partia jest zapisywana od razu
+            flush_interval: Maksymalny czas (w sekundach) oczekiwania rekordu na zapis
+            capacity: Maksymalna liczba rekordów oczekujących w buforze
+        """
         super().__init__()
         self.db_handler = None
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = collections.deque(maxlen=capacity)
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
     
     def emit(self, record):
         """
-        Zapisuje rekord logowania do bazy danych.
+        Dodaje rekord logowania do bufora zapisu w bazie danych.
         
         Args:
             record: Rekord logowania
         """
-        # Lazy loading modułu DatabaseHandler, aby uniknąć cyklicznych importów
-        if self.db_handler is None:
-            try:
-                # Próba importu DatabaseHandler
-                sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-                from Database.database import DatabaseHandler
-                self.db_handler = DatabaseHandler(auto_init=False)
-            except ImportError:
-                # W przypadku braku dostępu do bazy danych, logujemy błąd i nie zapisujemy
-                print(f"Nie można zaimportować DatabaseHandler: {sys.exc_info()[1]}")
-                return
-        
         try:
-            # Formatowanie komunikatu
-            msg = self.format(record)
-            
-            # Określenie nazwy modułu
-            module = record.name
-            
-            # Określenie poziomu logowania
-            level = record.levelname
+            # Formatowanie komunikatu; nazwa loggera służy jako nazwa modułu
+            self._buffer.append((record.levelname, record.name, self.format(record)))
+        except Exception:
+            self.handleError(record)
+            return
+        
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._flush_loop,
+                                            name="DatabaseLogHandler", daemon=True)
+            self._thread.start()
+        if len(self._buffer) >= self.batch_size:
+            self._flush_requested.set()
+    
+    def _flush_loop(self):
+        """Zapisuje zbuforowane rekordy co flush_interval sekund lub po zebraniu partii."""
+        while not self._stopped.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            self.flush()
+    
+    def flush(self):
+        """Zapisuje wszystkie zbuforowane rekordy do bazy danych w jednej transakcji."""
+        with self._flush_lock:
+            rows = []
+            while self._buffer:
+                rows.append(self._buffer.popleft())
+            if not rows:
+                return
             
-            # Zapisanie logu do bazy danych
-            self.db_handler.insert_log(level=level, module=module, message=msg)
-        except Exception as e:
-            # W przypadku błędu podczas zapisywania do bazy, ignorujemy błąd
-            # aby nie powodować błędów w głównej aplikacji
-            print(f"Błąd podczas zapisywania logu do bazy danych: {e}")
+            try:
+                # Lazy loading modułu DatabaseHandler, aby uniknąć cyklicznych importów
+                if self.db_handler is None:
+                    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+                    from Database.database import DatabaseHandler
+                    self.db_handler = DatabaseHandler(auto_init=False)
+                
+                self.db_handler.insert_logs_batch(rows)
+            except Exception as e:
+                # Błąd bazy danych (także przy tworzeniu połączenia) nie może przerwać wątku
+                # zapisu ani głównej aplikacji - rekordy wracają do bufora na kolejną próbę
+                print(f"Błąd podczas zapisywania logów do bazy danych: {e}")
+                self._requeue(rows)
+    
+    def _requeue(self, rows):
+        """
+        Zwraca niezapisane rekordy na początek bufora.
+        
+        Jeśli bufor nie mieści wszystkich, odrzucane są najstarsze - jak przy przepełnieniu.
+        """
+        free = self._buffer.maxlen - len(self._buffer)
+        if free > 0:
+            self._buffer.extendleft(reversed(rows[-free:]))
+    
+    def close(self):
+        """Zatrzymuje wątek zapisu i zapisuje pozostałe rekordy."""
+        self._stopped.set()
+        self._flush_requested.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+        super().close()
 
 
 def configure_loggers(config: Dict[str, Any]) -> None:
@@ -172,23 +281,30 @@ def configure_loggers(config: Dict[str, Any]) -> None:
         log_file="system.log"
     )
     
-    # Konfiguruj loggery dla poszczególnych modułów
+    # Konfiguruj loggery dla poszczególnych modułów (moduł -> sufiks klucza konfiguracji)
     module_loggers = {
-        "LLM_Engine": config.get("LOG_LEVEL_LLM", global_level),
-        "MT5_Connector": config.get("LOG_LEVEL_MT5", global_level),
-        "Agent_Manager": config.get("LOG_LEVEL_AGENT", global_level),
-        "Database": config.get("LOG_LEVEL_DB", global_level),
-        "Dashboard": config.get("LOG_LEVEL_DASHBOARD", global_level)
+        "LLM_Engine": "LLM",
+        "MT5_Connector": "MT5",
+        "Agent_Manager": "AGENT",
+        "Database": "DB",
+        "Dashboard": "DASHBOARD"
     }
     
-    for module, level in module_loggers.items():
+    for module, suffix in module_loggers.items():
+        level = config.get(f"LOG_LEVEL_{suffix}", global_level)
+        
+        # Loggery pracujące na poziomie DEBUG zapisują do bazy tylko próbkę rekordów DEBUG
+        default_rate = DEBUG_DB_SAMPLE_RATE if level.upper() == "DEBUG" else 1.0
+        sample_rate = float(config.get(f"LOG_SAMPLE_{suffix}", config.get("LOG_SAMPLE", default_rate)))
+        
         get_logger(
             name=module,
             level=level,
             log_to_file=True,
             log_to_console=True,
             log_to_db=True,
-            log_file=f"{module.lower()}.log"
+            log_file=f"{module.lower()}.log",
+            db_sample_rate=sample_rate
         )
 
 
@@ -9,13 +9,44 @@ Umożliwia wysyłanie sygnałów handlowych i odbieranie statusu EA.
 import zmq
 import json
 import time
+import uuid
 import logging
+import threading
+from concurrent.futures import Future
 from typing import Dict, Any, Optional, List, Union, Tuple
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - bez niego używany jest standardowy moduł json
+    orjson = None
+
 # Konfiguracja loggera
 logger = logging.getLogger(__name__)
 
+# Prefiksy tematów kanału PUBLISH - subskrybenci filtrują wiadomości po prefiksie
+# bez parsowania JSON (np. b"SIG.EURUSD" - tylko sygnały dla EURUSD)
+SIGNAL_TOPIC_PREFIX = b"SIG."
+# Temat potwierdzeń sygnałów publikowanych przez EA
+ACK_TOPIC = b"ACK"
+# Domyślny czas oczekiwania na odpowiedź w kanale REQUEST/REPLY (w milisekundach)
+REQUEST_TIMEOUT_MS = 5000
+
+
+def _dumps(message: Dict[str, Any]) -> bytes:
+    """Serializuje wiadomość do zwartego JSON w postaci bajtów."""
+    if orjson is not None:
+        return orjson.dumps(message)
+    return json.dumps(message, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(buffer) -> Dict[str, Any]:
+    """Parsuje wiadomość JSON z bufora ramki ZeroMQ (bez kopiowania, jeśli dostępny jest orjson)."""
+    if orjson is not None:
+        return orjson.loads(buffer)
+    return json.loads(bytes(buffer))
+
+
 class ZmqClient:
     """
     Klasa klienta ZeroMQ do komunikacji z MT5 Expert Advisor.
@@ -23,9 +54,13 @@ class ZmqClient:
     Wspiera komunikację w dwóch trybach:
     1. REQUEST/REPLY - do wysyłania poleceń i odbierania odpowiedzi
     2. PUBLISH/SUBSCRIBE - do rozsyłania sygnałów handlowych
+    
+    Potwierdzenia sygnałów odbierane są asynchronicznie przez socket SUBSCRIBE
+    nasłuchujący tematu ACK, obsługiwany przez wątek w tle.
     """
     
-    def __init__(self, server_address: str = "localhost", req_port: int = 5555, pub_port: int = 5556):
+    def __init__(self, server_address: str = "localhost", req_port: int = 5555, pub_port: int = 5556,
+                 ack_port: int = 5557, ack_timeout: float = 5.0):
         """
         Inicjalizacja klienta ZeroMQ.
         
@@ -33,17 +68,31 @@ class ZmqClient:
             server_address: Adres serwera ZeroMQ (domyślnie localhost)
             req_port: Port dla komunikacji REQUEST/REPLY
             pub_port: Port dla komunikacji PUBLISH/SUBSCRIBE
+            ack_port: Port, na którym EA publikuje potwierdzenia sygnałów
+            ack_timeout: Maksymalny czas oczekiwania na potwierdzenie sygnału w sekundach
         """
         self.server_address = server_address
         self.req_port = req_port
         self.pub_port = pub_port
+        self.ack_port = ack_port
+        self.ack_timeout = ack_timeout
         
         self.context = zmq.Context()
         self.req_socket = None
         self.pub_socket = None
+        self.ack_socket = None
+        self._req_poller = zmq.Poller()
         
         self.is_connected = False
         self.last_error = None
+        # Czy EA obsługuje zbiorcze zapytania o dane rynkowe (wyłączane po nieoczekiwanej odpowiedzi lub jej braku)
+        self.supports_batch = True
+        
+        # Oczekujące potwierdzenia: request_id -> (Future, czas wysłania)
+        self._pending_acks: Dict[str, Tuple[Future, float]] = {}
+        self._ack_lock = threading.Lock()
+        self._ack_stop = threading.Event()
+        self._ack_thread = None
         
         self._initialize_sockets()
     
@@ -51,20 +100,72 @@ class ZmqClient:
         """Inicjalizacja socketów ZeroMQ."""
         try:
             # Inicjalizacja socketu REQUEST/REPLY
-            self.req_socket = self.context.socket(zmq.REQ)
-            # Ustawienie timeout na operacje
-            self.req_socket.setsockopt(zmq.RCVTIMEO, 5000)  # 5 sekund timeout na odbieranie
-            self.req_socket.setsockopt(zmq.SNDTIMEO, 5000)  # 5 sekund timeout na wysyłanie
+            self._create_req_socket()
             
             # Inicjalizacja socketu PUBLISH
             self.pub_socket = self.context.socket(zmq.PUB)
             
+            # Inicjalizacja socketu SUBSCRIBE dla potwierdzeń sygnałów
+            self.ack_socket = self.context.socket(zmq.SUB)
+            self.ack_socket.setsockopt(zmq.SUBSCRIBE, ACK_TOPIC)
+            
             logger.info("Zainicjalizowano sockety ZeroMQ")
         except zmq.ZMQError as e:
             self.last_error = f"Błąd podczas inicjalizacji socketów ZeroMQ: {e}"
             logger.error(self.last_error)
             self._cleanup_sockets()
     
+    def _create_req_socket(self):
+        """Utworzenie socketu REQUEST/REPLY i zarejestrowanie go w pollerze odpowiedzi."""
+        self.req_socket = self.context.socket(zmq.REQ)
+        self._req_poller.register(self.req_socket, zmq.POLLIN)
+        # Ustawienie timeout na operacje
+        self.req_socket.setsockopt(zmq.RCVTIMEO, REQUEST_TIMEOUT_MS)  # timeout na odbieranie
+        self.req_socket.setsockopt(zmq.SNDTIMEO, REQUEST_TIMEOUT_MS)  # timeout na wysyłanie
+    
+    def _reset_req_socket(self):
+        """
+        Odtworzenie socketu REQUEST/REPLY po braku odpowiedzi.
+        
+        Socket REQ nie pozwala wysłać kolejnego zapytania przed odebraniem odpowiedzi,
+        dlatego po przekroczeniu czasu oczekiwania musi zostać zamknięty i utworzony na nowo.
+        """
+        self._req_poller.unregister(self.req_socket)
+        self.req_socket.close(linger=0)
+        self._create_req_socket()
+        self.req_socket.connect(f"tcp://{self.server_address}:{self.req_port}")
+    
+    def request(self, message: Dict[str, Any], timeout_ms: int = REQUEST_TIMEOUT_MS) -> Optional[Dict[str, Any]]:
+        """
+        Wysłanie zapytania REQUEST/REPLY i oczekiwanie na odpowiedź co najwyżej timeout_ms.
+        
+        Brak odpowiedzi nie blokuje wywołującego dłużej niż timeout - socket REQ jest
+        wtedy odtwarzany, aby kolejne zapytania mogły zostać wysłane.
+        
+        Args:
+            message: Treść zapytania
+            timeout_ms: Maksymalny czas oczekiwania na odpowiedź w milisekundach
+            
+        Returns:
+            Słownik z odpowiedzią lub None w przypadku błędu lub przekroczenia czasu
+        """
+        try:
+            self.req_socket.send(_dumps(message), copy=False)
+            
+            events = dict(self._req_poller.poll(timeout_ms))
+            if self.req_socket not in events:
+                self.last_error = f"Brak odpowiedzi na zapytanie {message.get('type')} w ciągu {timeout_ms} ms"
+                logger.error(self.last_error)
+                self._reset_req_socket()
+                return None
+            
+            return _loads(self.req_socket.recv(copy=False).buffer)
+            
+        except zmq.ZMQError as e:
+            self.last_error = f"Błąd podczas wysyłania zapytania {message.get('type')}: {e}"
+            logger.error(self.last_error)
+            return None
+    
     def connect(self) -> bool:
         """
         Połączenie z serwerem ZeroMQ.
@@ -79,9 +180,11 @@ class ZmqClient:
             # Połączenie socketów
             req_endpoint = f"tcp://{self.server_address}:{self.req_port}"
             pub_endpoint = f"tcp://{self.server_address}:{self.pub_port}"
+            ack_endpoint = f"tcp://{self.server_address}:{self.ack_port}"
             
             self.req_socket.connect(req_endpoint)
             self.pub_socket.bind(pub_endpoint)
+            self.ack_socket.connect(ack_endpoint)
             
             # Daj czas na ustanowienie połączenia
             time.sleep(0.5)
@@ -89,6 +192,7 @@ class ZmqClient:
             # Sprawdź połączenie poprzez ping
             if self._ping():
                 self.is_connected = True
+                self._start_ack_dispatcher()
                 logger.info(f"Połączono z serwerem ZeroMQ na {req_endpoint} i {pub_endpoint}")
                 return True
             else:
@@ -127,6 +231,7 @@ class ZmqClient:
     
     def disconnect(self):
         """Zakończenie połączenia z serwerem ZeroMQ."""
+        self._stop_ack_dispatcher()
         self._cleanup_sockets()
         self.is_connected = False
         logger.info("Rozłączono z serwerem ZeroMQ")
@@ -134,24 +239,176 @@ class ZmqClient:
     def _cleanup_sockets(self):
         """Zamknięcie socketów i zwolnienie zasobów."""
         if self.req_socket:
+            self._req_poller.unregister(self.req_socket)
             self.req_socket.close()
             self.req_socket = None
             
         if self.pub_socket:
             self.pub_socket.close()
             self.pub_socket = None
+            
+        if self.ack_socket:
+            self.ack_socket.close()
+            self.ack_socket = None
     
     def __del__(self):
         """Destruktor klasy - upewniamy się, że sockety są zamykane."""
+        self._stop_ack_dispatcher()
         self._cleanup_sockets()
         if self.context:
             self.context.term()
     
+    def _start_ack_dispatcher(self):
+        """Uruchomienie wątku w tle dopasowującego potwierdzenia do wysłanych sygnałów."""
+        if self._ack_thread and self._ack_thread.is_alive():
+            return
+        
+        self._ack_stop.clear()
+        self._ack_thread = threading.Thread(target=self._dispatch_acks, name="zmq-ack-dispatcher", daemon=True)
+        self._ack_thread.start()
+    
+    def _stop_ack_dispatcher(self):
+        """Zatrzymanie wątku potwierdzeń i anulowanie oczekujących potwierdzeń."""
+        self._ack_stop.set()
+        if self._ack_thread and self._ack_thread is not threading.current_thread():
+            self._ack_thread.join(timeout=1.0)
+        self._ack_thread = None
+        
+        with self._ack_lock:
+            pending = list(self._pending_acks.values())
+            self._pending_acks.clear()
+        for future, _ in pending:
+            future.cancel()
+    
+    def _dispatch_acks(self):
+        """Pętla wątku potwierdzeń - odbiera wiadomości ACK i rozwiązuje odpowiadające im Future."""
+        poller = zmq.Poller()
+        poller.register(self.ack_socket, zmq.POLLIN)
+        
+        while not self._ack_stop.is_set():
+            try:
+                events = dict(poller.poll(100))
+                if self.ack_socket in events:
+                    _, body = self.ack_socket.recv_multipart()
+                    reply = _loads(body)
+                    if isinstance(reply, dict):
+                        self._resolve_ack(reply)
+                    else:
+                        logger.warning(f"Pominięto potwierdzenie sygnału o nieoczekiwanym formacie: {reply!r}")
+                
+                self._expire_acks()
+            except (zmq.ZMQError, ValueError) as e:
+                if self._ack_stop.is_set():
+                    break
+                logger.error(f"Błąd podczas odbierania potwierdzenia sygnału: {e}")
+            except Exception as e:
+                # Wątek potwierdzeń musi działać dalej - inaczej żaden Future nie zostałby rozwiązany
+                logger.error(f"Nieoczekiwany błąd wątku potwierdzeń sygnałów: {e}")
+    
+    def _resolve_ack(self, reply: Dict[str, Any]):
+        """
+        Rozwiązanie Future sygnału na podstawie otrzymanego potwierdzenia.
+        
+        Args:
+            reply: Treść potwierdzenia zawierająca request_id i status
+        """
+        with self._ack_lock:
+            entry = self._pending_acks.pop(reply.get("request_id"), None)
+        
+        if entry is None:
+            return
+        
+        future, _ = entry
+        if reply.get("status") == "success":
+            logger.info(f"Otrzymano potwierdzenie sygnału {reply.get('request_id')}")
+        else:
+            self.last_error = f"Błąd podczas przetwarzania sygnału: {reply.get('error', 'Nieznany błąd')}"
+            logger.error(self.last_error)
+        # Future anulowany przez wywołującego nie przyjmuje już wyniku
+        if future.set_running_or_notify_cancel():
+            future.set_result(reply)
+    
+    def _expire_acks(self):
+        """Zakończenie błędem Future, dla których nie otrzymano potwierdzenia w czasie ack_timeout."""
+        deadline = time.monotonic() - self.ack_timeout
+        with self._ack_lock:
+            expired = [request_id for request_id, (_, sent_at) in self._pending_acks.items()
+                       if sent_at < deadline]
+            entries = [self._pending_acks.pop(request_id) for request_id in expired]
+        
+        for future, _ in entries:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(TimeoutError("Nie otrzymano potwierdzenia sygnału"))
+    
+    @staticmethod
+    def signal_topic(symbol: str) -> bytes:
+        """
+        Zwraca temat kanału PUBLISH dla sygnałów danego symbolu.
+        
+        Args:
+            symbol: Symbol instrumentu (np. 'EURUSD')
+            
+        Returns:
+            Temat w postaci bajtów (np. b'SIG.EURUSD')
+        """
+        return SIGNAL_TOPIC_PREFIX + symbol.encode("utf-8")
+    
+    def _publish(self, topic: bytes, payload: Dict[str, Any]):
+        """
+        Publikacja wiadomości wieloczęściowej [temat, treść JSON].
+        
+        Args:
+            topic: Temat wiadomości używany do filtrowania subskrypcji
+            payload: Treść wiadomości
+        """
+        self.pub_socket.send_multipart([topic, _dumps(payload)], copy=False)
+    
+    def create_subscriber(self, symbols: Optional[List[str]] = None) -> zmq.Socket:
+        """
+        Utworzenie socketu SUBSCRIBE odbierającego sygnały z kanału publikacji.
+        
+        Args:
+            symbols: Lista symboli do subskrypcji (None = wszystkie sygnały)
+            
+        Returns:
+            Połączony socket SUBSCRIBE
+        """
+        sub_socket = self.context.socket(zmq.SUB)
+        sub_socket.connect(f"tcp://{self.server_address}:{self.pub_port}")
+        
+        if symbols:
+            for symbol in symbols:
+                sub_socket.setsockopt(zmq.SUBSCRIBE, self.signal_topic(symbol))
+        else:
+            sub_socket.setsockopt(zmq.SUBSCRIBE, SIGNAL_TOPIC_PREFIX)
+            
+        return sub_socket
+    
+    @staticmethod
+    def decode_signal(frames: List[bytes]) -> Dict[str, Any]:
+        """
+        Dekodowanie wiadomości wieloczęściowej z kanału publikacji.
+        
+        Args:
+            frames: Ramki wiadomości [temat, treść JSON]
+            
+        Returns:
+            Słownik sygnału uzupełniony o symbol odczytany z tematu
+        """
+        topic, body = frames
+        signal = _loads(body)
+        if topic.startswith(SIGNAL_TOPIC_PREFIX):
+            signal["symbol"] = topic[len(SIGNAL_TOPIC_PREFIX):].decode("utf-8")
+        return signal
+    
     def send_trade_signal(self, action: str, symbol: str, entry_price: float = 0.0,
                          stop_loss: float = 0.0, take_profit: float = 0.0) -> bool:
         """
         Wysłanie sygnału handlowego do Expert Advisor.
         
+        Sygnał jest publikowany bez oczekiwania na potwierdzenie. Potwierdzenie
+        odbierane jest w tle - aby na nie poczekać, użyj send_trade_signal_async.
+        
         Args:
             action: Rodzaj akcji ('BUY', 'SELL', 'CLOSE')
             symbol: Symbol instrumentu (np. 'EURUSD')
@@ -162,49 +419,62 @@ class ZmqClient:
         Returns:
             True, jeśli sygnał został wysłany pomyślnie, False w przeciwnym razie
         """
+        return self.send_trade_signal_async(action, symbol, entry_price, stop_loss, take_profit) is not None
+    
+    def send_trade_signal_async(self, action: str, symbol: str, entry_price: float = 0.0,
+                                stop_loss: float = 0.0, take_profit: float = 0.0) -> Optional[Future]:
+        """
+        Wysłanie sygnału handlowego z możliwością oczekiwania na potwierdzenie.
+        
+        Args:
+            action: Rodzaj akcji ('BUY', 'SELL', 'CLOSE')
+            symbol: Symbol instrumentu (np. 'EURUSD')
+            entry_price: Cena wejścia (0 = cena rynkowa)
+            stop_loss: Poziom stop loss (0 = brak)
+            take_profit: Poziom take profit (0 = brak)
+            
+        Returns:
+            Future rozwiązywany odpowiedzią EA (lub TimeoutError po ack_timeout),
+            albo None, jeśli sygnału nie udało się wysłać
+        """
         if not self.is_connected:
             self.last_error = "Nie połączono z serwerem ZeroMQ"
             logger.error(self.last_error)
-            return False
+            return None
             
         # Walidacja parametrów
         if action not in ["BUY", "SELL", "CLOSE"]:
             self.last_error = f"Nieznana akcja: {action}. Dozwolone: BUY, SELL, CLOSE"
             logger.error(self.last_error)
-            return False
+            return None
             
-        # Przygotowanie wiadomości
+        # Przygotowanie wiadomości - typ i symbol są zakodowane w temacie
+        request_id = uuid.uuid4().hex
         signal = {
-            "type": "trade_signal",
+            "request_id": request_id,
             "action": action,
-            "symbol": symbol,
             "entry_price": entry_price,
             "stop_loss": stop_loss,
             "take_profit": take_profit,
             "timestamp": datetime.now().isoformat()
         }
         
+        future = Future()
+        with self._ack_lock:
+            self._pending_acks[request_id] = (future, time.monotonic())
+        
         try:
             # Wysłanie sygnału przez PUBLISH
-            self.pub_socket.send_json(signal)
+            self._publish(self.signal_topic(symbol), signal)
             logger.info(f"Wysłano sygnał {action} dla {symbol} przez kanał publikacji")
-            
-            # Dodatkowo możemy wysłać przez REQUEST/REPLY, aby otrzymać potwierdzenie
-            self.req_socket.send_json(signal)
-            reply = self.req_socket.recv_json()
-            
-            if reply.get("status") == "success":
-                logger.info("Otrzymano potwierdzenie sygnału")
-                return True
-            else:
-                self.last_error = f"Błąd podczas przetwarzania sygnału: {reply.get('error', 'Nieznany błąd')}"
-                logger.error(self.last_error)
-                return False
+            return future
                 
         except zmq.ZMQError as e:
+            with self._ack_lock:
+                self._pending_acks.pop(request_id, None)
             self.last_error = f"Błąd podczas wysyłania sygnału: {e}"
             logger.error(self.last_error)
-            return False
+            return None
     
     def get_status(self) -> Optional[Dict[str, Any]]:
         """
@@ -225,11 +495,10 @@ class ZmqClient:
                 "timestamp": datetime.now().isoformat()
             }
             
-            # Wysłanie zapytania
-            self.req_socket.send_json(request)
-            
-            # Odebranie odpowiedzi
-            reply = self.req_socket.recv_json()
+            # Wysłanie zapytania i odebranie odpowiedzi
+            reply = self.request(request)
+            if reply is None:
+                return None
             
             if reply.get("type") == "status":
                 return reply
@@ -243,6 +512,56 @@ class ZmqClient:
             logger.error(self.last_error)
             return None
     
+    def get_market_data_batch(self, symbols: List[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Pobranie danych rynkowych dla wielu symboli jednym zapytaniem.
+        
+        Jeśli EA nie rozpoznaje zapytania zbiorczego lub nie odpowiada na nie w czasie,
+        flaga supports_batch jest wyłączana, a wywołujący powinien pobierać dane dla
+        każdego symbolu osobno.
+        
+        Args:
+            symbols: Lista symboli instrumentów
+            
+        Returns:
+            Słownik symbol -> dane rynkowe lub None w przypadku błędu
+        """
+        if not self.is_connected:
+            self.last_error = "Nie połączono z serwerem ZeroMQ"
+            logger.error(self.last_error)
+            return None
+            
+        request = {
+            "type": "get_market_data_batch",
+            "symbols": symbols,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        reply = self.request(request)
+        if reply is None:
+            # Bez wyłączenia flagi każdy cykl czekałby na zapytanie zbiorcze pełny czas oczekiwania
+            self.supports_batch = False
+            logger.warning("Wyłączono zbiorcze zapytania o dane rynkowe po braku odpowiedzi EA")
+            return None
+            
+        if reply.get("type") != "market_data_batch":
+            self.supports_batch = False
+            self.last_error = f"Nieoczekiwany typ odpowiedzi na zapytanie zbiorcze: {reply.get('type')}"
+            logger.warning(self.last_error)
+            return None
+            
+        market_data = reply.get("data", {})
+        if not isinstance(market_data, dict) or not all(isinstance(data, dict) for data in market_data.values()):
+            # Niepoprawna treść traktowana jest jak brak obsługi zapytania zbiorczego
+            self.supports_batch = False
+            self.last_error = "Nieprawidłowy format danych w odpowiedzi na zapytanie zbiorcze"
+            logger.warning(self.last_error)
+            return None
+            
+        for symbol, data in market_data.items():
+            data.setdefault("symbol", symbol)
+        return market_data
+    
     def get_last_error(self) -> Optional[str]:
         """
         Zwraca ostatni błąd, który wystąpił podczas komunikacji.
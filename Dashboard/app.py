@@ -12,6 +12,7 @@ Zarządza:
 
 import os
 import json
+import time
 from pathlib import Path
 from datetime import datetime, timedelta
 from flask import Flask, render_template, request, jsonify, redirect, url_for
@@ -24,6 +25,16 @@ import plotly.graph_objects as go
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
 STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+LOG_DIR = os.path.join(PROJECT_DIR, "logs")
+
+# Pliki logów komponentów systemu (nazwa komponentu -> ścieżka pliku)
+COMPONENT_LOGS = {
+    name: os.path.join(LOG_DIR, f"{name}.log")
+    for name in ("system", "llm_engine", "database", "mt5_connector", "agent_manager")
+}
+
+# Maksymalny wiek logu (w sekundach), przy którym komponent uznawany jest za aktywny
+COMPONENT_ACTIVE_WINDOW = 5 * 60
 
 
 def create_app(db_handler=None, config=None):
@@ -185,15 +196,10 @@ def create_app(db_handler=None, config=None):
         # TODO: Zaimplementować rzeczywiste sprawdzanie statusu komponentów
         # To jest uproszczona implementacja
         try:
-            log_path = os.path.join(PROJECT_DIR, "logs", f"{component_name}.log")
-            if os.path.exists(log_path):
-                # Sprawdź, czy log był aktualizowany w ciągu ostatnich 5 minut
-                mtime = os.path.getmtime(log_path)
-                last_modified = datetime.fromtimestamp(mtime)
-                if datetime.now() - last_modified < timedelta(minutes=5):
-                    return True
-            return False
-        except Exception:
+            # Sprawdź, czy log był aktualizowany w ciągu ostatnich 5 minut
+            mtime = os.stat(COMPONENT_LOGS[component_name]).st_mtime
+            return time.time() - mtime < COMPONENT_ACTIVE_WINDOW
+        except (KeyError, OSError):
             return False
     
     def get_performance_data():
@@ -211,25 +217,24 @@ def create_app(db_handler=None, config=None):
         """Pobiera ostatnie wpisy z logów."""
         log_entries = []
         try:
-            log_dir = os.path.join(PROJECT_DIR, "logs")
-            for log_file in ["system.log", "llm_engine.log", "database.log", 
-                            "mt5_connector.log", "agent_manager.log"]:
-                file_path = os.path.join(log_dir, log_file)
-                if os.path.exists(file_path):
-                    component = log_file.replace(".log", "")
+            for component, file_path in COMPONENT_LOGS.items():
+                try:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         lines = f.readlines()
-                        for line in lines[-limit:]:
-                            if line.strip():
-                                parts = line.split(" - ", 3)
-                                if len(parts) >= 4:
-                                    timestamp, _, level, message = parts
-                                    log_entries.append({
-                                        "timestamp": timestamp,
-                                        "component": component,
-                                        "level": level,
-                                        "message": message.strip()
-                                    })
+                except FileNotFoundError:
+                    continue
+                    
+                for line in lines[-limit:]:
+                    if line.strip():
+                        parts = line.split(" - ", 3)
+                        if len(parts) >= 4:
+                            timestamp, _, level, message = parts
+                            log_entries.append({
+                                "timestamp": timestamp,
+                                "component": component,
+                                "level": level,
+                                "message": message.strip()
+                            })
         except Exception as e:
             app.logger.error(f"Błąd podczas pobierania logów: {e}")
         
@@ -7,37 +7,322 @@ oraz Plotly do interaktywnych wizualizacji.
 """
 import os
 import json
-from datetime import datetime, timedelta
+import shutil
+import sqlite3
+import time
+import mimetypes
+import threading
+import functools
+from operator import itemgetter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import (Flask, Response, render_template, request, jsonify, redirect, url_for, flash,
+                   current_app, send_from_directory, stream_with_context, session)
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.utils import secure_filename
 import uuid
 
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - bez niego używany jest standardowy moduł json
+    orjson = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow jest opcjonalny - bez niego miniatury wykresów nie są tworzone
+    Image = None
+
 from Database.database import DatabaseHandler
 from LLM_Engine.market_data import MarketData
 from MT5_Connector.connector import MT5Connector
 from Agent_Manager.risk_manager import RiskManager
 from Agent_Manager.order_processor import OrderProcessor
 
+class RowJSONProvider(DefaultJSONProvider):
+    """Dostawca JSON dla Flask serializujący także wiersze sqlite3.Row z DatabaseHandler."""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, sqlite3.Row):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(RowJSONProvider):
+    """Dostawca JSON dla Flask serializujący odpowiedzi za pomocą orjson."""
+    
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
 app = Flask(__name__, template_folder="templates", static_folder="static")
+app.json = OrjsonProvider(app) if orjson is not None else RowJSONProvider(app)
 app.secret_key = os.environ.get('SECRET_KEY', 'tajny_klucz_do_zmiany_w_produkcji')
 app.config['UPLOAD_FOLDER'] = os.path.join(app.static_folder, 'charts')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Limit 16MB dla plików
+# Prefiks wewnętrznej lokalizacji nginx dla wykresów (np. /protected_charts/).
+# Gdy jest ustawiony, pliki wysyła nginx przez X-Accel-Redirect zamiast Pythona.
+app.config['CHARTS_ACCEL_PREFIX'] = os.environ.get('CHARTS_ACCEL_PREFIX')
 
 # Utwórz folder na wykresy, jeśli nie istnieje
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 db_handler = DatabaseHandler()
-mt5_connector = None  # Będzie inicjalizowany tylko gdy potrzebny
-risk_manager = None
-order_processor = None
+
+# Operacje MT5 wykonywane są w tle, aby nie blokować obsługi żądań HTTP.
+# Jeden wątek roboczy serializuje wywołania biblioteki MT5.
+mt5_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5-worker")
+
+# Miniatury wykresów generowane są w osobnym wątku, poza obsługą żądania
+thumbnail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnail-worker")
+
+# Zadania wykonania pomysłów handlowych: job_id -> stan zadania
+jobs = OrderedDict()
+jobs_lock = threading.Lock()
+MAX_TRACKED_JOBS = 100
+# Stany zakończonych zadań - tylko takie mogą zostać usunięte z rejestru
+FINISHED_JOB_STATUSES = frozenset(('EXECUTED', 'REJECTED'))
+
+# Ostatni znany stan konta odświeżany w tle
+account_snapshot = {
+    'account_info': None,
+    'open_positions': None,
+    'error': None,
+    'updated_at': None
+}
+account_refresh = None
 
 # Konfiguracja
 DEFAULT_SYMBOLS = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD"]
 DEFAULT_TIMEFRAMES = ["M15", "H1", "H4", "D1"]
 
+# Dozwolone rozszerzenia plików z wykresami
+ALLOWED_EXTENSIONS = frozenset({'png', 'jpg', 'jpeg', 'gif'})
+
+# Klasy bootstrap i polskie etykiety statusów pomysłów handlowych
+STATUS_BADGES = {
+    'PENDING': 'bg-warning',
+    'QUEUED': 'bg-primary',
+    'EXECUTING': 'bg-primary',
+    'EXECUTED': 'bg-success',
+    'EXPIRED': 'bg-secondary',
+    'REJECTED': 'bg-danger'
+}
+STATUS_LABELS = {
+    'PENDING': 'Oczekujący',
+    'QUEUED': 'W kolejce',
+    'EXECUTING': 'Wykonywany',
+    'EXECUTED': 'Wykonany',
+    'EXPIRED': 'Wygasły',
+    'REJECTED': 'Odrzucony'
+}
+
+# Pola formularza pomysłu handlowego i ich wartości domyślne
+IDEA_TEXT_FIELDS = {
+    'symbol': None,
+    'direction': None,
+    'timeframe': None,
+    'strategy': None,
+    'source': None,
+    'technical_analysis': None,
+    'fundamental_analysis': '',
+    'risk_analysis': '',
+    'notes': ''
+}
+IDEA_FLOAT_FIELDS = {
+    'entry_price': None,
+    'stop_loss': None,
+    'take_profit': None,
+    'risk_percentage': 1.0
+}
+
+# Rozmiar porcji przy zapisie przesłanych plików oraz maksymalny rozmiar miniatury
+UPLOAD_CHUNK_SIZE = 64 * 1024
+CHART_THUMBNAIL_SIZE = (320, 240)
+
+# Maksymalna liczba punktów krzywej kapitału zwracanych do wykresu
+EQUITY_CHART_MAX_POINTS = 1000
+
+# Czas życia (w sekundach) zbuforowanych agregatów pomysłów handlowych
+TRADE_IDEAS_CACHE_TTL = 15
+
+# Czas życia (w sekundach) zbuforowanego HTML często odwiedzanych stron
+PAGE_CACHE_TTL = 15
+
+# Czas życia (w sekundach) zbuforowanej ramki danych z historią transakcji
+TRADES_DF_CACHE_TTL = 5
+
+
+class MT5Services:
+    """Współdzielone przez wszystkie żądania obiekty dostępu do MT5."""
+    
+    def __init__(self, db):
+        self.connector = MT5Connector()
+        self.risk_manager = RiskManager(db)
+        self.risk_manager.set_mt5_connector(self.connector)
+        self.order_processor = OrderProcessor(
+            mt5_connector=self.connector,
+            db_handler=db,
+            risk_manager=self.risk_manager
+        )
+
+
+_mt5_init_lock = threading.Lock()
+
+
+def init_app(flask_app, db=None):
+    """
+    Rejestruje usługi MT5 w aplikacji Flask.
+    
+    Konektor, menedżer ryzyka i procesor zleceń tworzone są jednokrotnie
+    przy starcie aplikacji i udostępniane przez app.extensions['mt5'].
+    
+    Args:
+        flask_app: Aplikacja Flask
+        db: Handler bazy danych (domyślnie globalny db_handler)
+        
+    Returns:
+        Zarejestrowane usługi MT5
+    """
+    with _mt5_init_lock:
+        if 'mt5' not in flask_app.extensions:
+            flask_app.extensions['mt5'] = MT5Services(db or db_handler)
+    return flask_app.extensions['mt5']
+
+
+init_app(app)
+
+
+def ttl_cache(ttl, maxsize=32):
+    """
+    Dekorator zapamiętujący wyniki funkcji na określony czas.
+    
+    Wyniki są kluczowane krotką argumentów. Zbuforowane wartości można usunąć
+    wywołując cache_clear() na udekorowanej funkcji.
+    
+    Args:
+        ttl: Czas życia wpisu w sekundach
+        maxsize: Maksymalna liczba przechowywanych wpisów
+    """
+    def decorator(func):
+        cache = {}
+        lock = threading.Lock()
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] > now:
+                    return entry[1]
+            
+            value = func(*args, **kwargs)
+            with lock:
+                if len(cache) >= maxsize:
+                    # Usuń wpisy przeterminowane, a jeśli to nie wystarczy - najstarszy
+                    for expired_key in [k for k, (expires, _) in cache.items() if expires <= now]:
+                        del cache[expired_key]
+                    if len(cache) >= maxsize:
+                        del cache[min(cache, key=lambda k: cache[k][0])]
+                cache[key] = (now + ttl, value)
+            return value
+        
+        def cache_clear():
+            with lock:
+                cache.clear()
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+def cached_page(ttl, maxsize=64):
+    """
+    Dekorator buforujący wyrenderowany HTML widoku na określony czas.
+    
+    Kluczem jest ścieżka żądania wraz z parametrami zapytania. Buforowane są
+    tylko odpowiedzi tekstowe; przekierowania i inne obiekty Response oraz
+    żądania z oczekującymi komunikatami flash zawsze trafiają do widoku.
+    Bufor można wyczyścić wywołując cache_clear() na udekorowanym widoku.
+    
+    Args:
+        ttl: Czas życia wpisu w sekundach
+        maxsize: Maksymalna liczba przechowywanych stron
+    """
+    def decorator(view):
+        cache = OrderedDict()
+        lock = threading.Lock()
+        
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if '_flashes' in session:
+                return view(*args, **kwargs)
+            
+            key = request.full_path
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] > now:
+                    return entry[1]
+            
+            page = view(*args, **kwargs)
+            if isinstance(page, str):
+                with lock:
+                    cache[key] = (now + ttl, page)
+                    cache.move_to_end(key)
+                    while len(cache) > maxsize:
+                        cache.popitem(last=False)
+            return page
+        
+        def cache_clear():
+            with lock:
+                cache.clear()
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+@ttl_cache(TRADE_IDEAS_CACHE_TTL)
+def get_recent_trade_ideas(limit=5):
+    """Pobiera najnowsze pomysły handlowe (buforowane przez TRADE_IDEAS_CACHE_TTL sekund)."""
+    return db_handler.get_trade_ideas(limit=limit)
+
+
+@ttl_cache(TRADE_IDEAS_CACHE_TTL)
+def get_trade_ideas_stats():
+    """Pobiera statystyki pomysłów handlowych (buforowane przez TRADE_IDEAS_CACHE_TTL sekund)."""
+    return db_handler.get_trade_ideas_stats()
+
+
+@ttl_cache(TRADES_DF_CACHE_TTL)
+def get_trades_df(limit=1000):
+    """Zwraca ostatnie transakcje jako DataFrame współdzielony przez endpointy wykresów."""
+    return pd.DataFrame(db_handler.get_trades(limit=limit))
+
+
+def invalidate_trade_ideas_cache():
+    """Usuwa zbuforowane agregaty i strony po zmianie pomysłów handlowych."""
+    get_recent_trade_ideas.cache_clear()
+    get_trade_ideas_stats.cache_clear()
+    home.cache_clear()
+    trade_ideas.cache_clear()
+
 
 @app.route('/')
 @app.route('/index')
@@ -47,6 +332,7 @@ def index():
 
 
 @app.route('/home')
+@cached_page(PAGE_CACHE_TTL)
 def home():
     """Strona główna dashboardu."""
     # Pobierz podstawowe dane do wyświetlenia
@@ -62,7 +348,7 @@ def home():
     active_trades = []  # Zastąpić rzeczywistymi danymi
     
     # Pobierz najnowsze pomysły handlowe
-    trade_ideas = db_handler.get_trade_ideas(limit=5)
+    trade_ideas = get_recent_trade_ideas(limit=5)
     
     return render_template('home.html', 
                           account_summary=account_summary,
@@ -78,21 +364,18 @@ def statistics():
     start_date = end_date - timedelta(days=30)
     
     if request.args.get('start_date'):
-        start_date = datetime.strptime(request.args.get('start_date'), '%Y-%m-%d')
+        start_date = date.fromisoformat(request.args.get('start_date'))
     if request.args.get('end_date'):
-        end_date = datetime.strptime(request.args.get('end_date'), '%Y-%m-%d')
-    
-    # Pobierz dane z bazy
-    trades = db_handler.get_trades(limit=1000)
+        end_date = date.fromisoformat(request.args.get('end_date'))
     
-    # Przefiltruj transakcje do wybranego zakresu dat
-    filtered_trades = [
-        trade for trade in trades 
-        if start_date <= datetime.fromisoformat(trade["entry_time"]) <= end_date
-    ]
+    # Pobierz z bazy zagregowane dzienne wyniki z wybranego zakresu dat
+    totals = db_handler.get_stats(
+        start_date=start_date.strftime('%Y-%m-%d'),
+        end_date=end_date.strftime('%Y-%m-%d')
+    )
     
     # Przygotuj dane statystyczne
-    stats = calculate_statistics(filtered_trades)
+    stats = summarize_statistics(totals)
     
     return render_template(
         'statistics.html', 
@@ -103,6 +386,7 @@ def statistics():
 
 
 @app.route('/market_analysis')
+@cached_page(PAGE_CACHE_TTL)
 def market_analysis():
     """Strona z analizami rynkowymi LLM."""
     # Pobierz parametry z URL lub ustaw domyślne
@@ -127,13 +411,16 @@ def market_analysis():
 
 
 @app.route('/trade_ideas')
+@cached_page(PAGE_CACHE_TTL)
 def trade_ideas():
     """Strona z pomysłami handlowymi."""
     # Pobierz parametry filtrowania
     symbol = request.args.get('symbol', '')
     status = request.args.get('status', '')
     sort_by = request.args.get('sort', 'created_at')
-    order = request.args.get('order', 'desc')
+    order = request.args.get('order', 'desc').upper()
+    cursor = request.args.get('cursor')
+    before = request.args.get('before')
     page = int(request.args.get('page', 1))
     per_page = 20
     
@@ -144,19 +431,23 @@ def trade_ideas():
     if status:
         filters['status'] = status
     
-    total, trade_ideas = db_handler.get_trade_ideas_paginated(
-        page=page, 
-        per_page=per_page, 
-        filters=filters, 
-        sort_by=sort_by, 
-        order=order
+    # Stronicowanie kursorem - 'before' oznacza przejście do poprzedniej strony
+    result = db_handler.get_trade_ideas_paginated(
+        cursor=before or cursor,
+        items_per_page=per_page,
+        filters=filters,
+        sort_by=sort_by,
+        sort_order=order,
+        backwards=bool(before)
     )
+    trade_ideas = result['data']
+    pagination = result['pagination']
     
-    # Oblicz liczbę stron
-    pages = (total + per_page - 1) // per_page
+    # Liczba stron jest przybliżona (licznik rekordów jest buforowany)
+    pages = pagination['total_pages']
     
     # Pobierz statystyki pomysłów handlowych
-    stats = db_handler.get_trade_ideas_stats()
+    stats = get_trade_ideas_stats()
     
     return render_template(
         'trade_ideas.html', 
@@ -164,6 +455,8 @@ def trade_ideas():
         stats=stats,
         pages=pages,
         current_page=page,
+        next_cursor=pagination['next_cursor'],
+        prev_cursor=pagination['prev_cursor'],
         now=datetime.now()
     )
 
@@ -197,67 +490,15 @@ def add_trade_idea():
     """Dodawanie nowego pomysłu handlowego."""
     if request.method == 'POST':
         try:
-            # Pobierz dane z formularza
-            symbol = request.form.get('symbol')
-            direction = request.form.get('direction')
-            entry_price = float(request.form.get('entry_price'))
-            stop_loss = float(request.form.get('stop_loss'))
-            take_profit = float(request.form.get('take_profit'))
-            risk_percentage = float(request.form.get('risk_percentage', 1.0))
-            valid_until = datetime.strptime(request.form.get('valid_until'), '%Y-%m-%dT%H:%M')
-            timeframe = request.form.get('timeframe')
-            strategy = request.form.get('strategy')
-            source = request.form.get('source')
-            technical_analysis = request.form.get('technical_analysis')
-            fundamental_analysis = request.form.get('fundamental_analysis', '')
-            risk_analysis = request.form.get('risk_analysis', '')
-            notes = request.form.get('notes', '')
-            
-            # Oblicz RR ratio
-            if direction == 'BUY':
-                risk = entry_price - stop_loss
-                reward = take_profit - entry_price
-            else:  # SELL
-                risk = stop_loss - entry_price
-                reward = entry_price - take_profit
-                
-            risk_reward_ratio = round(reward / risk, 2) if risk > 0 else 0
-            
-            # Obsługa pliku z wykresem
-            chart_image = None
-            if 'chart_image' in request.files and request.files['chart_image'].filename:
-                file = request.files['chart_image']
-                if file and allowed_file(file.filename):
-                    # Generuj unikalną nazwę pliku
-                    filename = secure_filename(f"{symbol}_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    file.save(file_path)
-                    chart_image = filename
+            # Pobierz dane z formularza i zapisz przesłany wykres
+            idea_data = parse_idea_form(request.form, request.files)
             
             # Utworzenie nowego pomysłu handlowego
-            idea_data = {
-                'symbol': symbol,
-                'direction': direction,
-                'entry_price': entry_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'risk_percentage': risk_percentage,
-                'risk_reward_ratio': risk_reward_ratio,
-                'valid_until': valid_until.isoformat(),
-                'timeframe': timeframe,
-                'strategy': strategy,
-                'source': source,
-                'technical_analysis': technical_analysis,
-                'fundamental_analysis': fundamental_analysis,
-                'risk_analysis': risk_analysis,
-                'notes': notes,
-                'chart_image': chart_image,
-                'status': 'PENDING',
-                'created_at': datetime.now().isoformat()
-            }
+            idea_data.update(status='PENDING', created_at=datetime.now().isoformat())
             
             # Zapisz w bazie danych
             idea_id = db_handler.add_trade_idea(idea_data)
+            invalidate_trade_ideas_cache()
             
             # Sprawdź czy wykonać od razu
             if request.form.get('action') == 'execute':
@@ -286,83 +527,13 @@ def edit_trade_idea(idea_id):
     
     if request.method == 'POST':
         try:
-            # Pobierz dane z formularza
-            symbol = request.form.get('symbol')
-            direction = request.form.get('direction')
-            entry_price = float(request.form.get('entry_price'))
-            stop_loss = float(request.form.get('stop_loss'))
-            take_profit = float(request.form.get('take_profit'))
-            risk_percentage = float(request.form.get('risk_percentage', 1.0))
-            valid_until = datetime.strptime(request.form.get('valid_until'), '%Y-%m-%dT%H:%M')
-            timeframe = request.form.get('timeframe')
-            strategy = request.form.get('strategy')
-            source = request.form.get('source')
-            technical_analysis = request.form.get('technical_analysis')
-            fundamental_analysis = request.form.get('fundamental_analysis', '')
-            risk_analysis = request.form.get('risk_analysis', '')
-            notes = request.form.get('notes', '')
-            
-            # Oblicz RR ratio
-            if direction == 'BUY':
-                risk = entry_price - stop_loss
-                reward = take_profit - entry_price
-            else:  # SELL
-                risk = stop_loss - entry_price
-                reward = entry_price - take_profit
-                
-            risk_reward_ratio = round(reward / risk, 2) if risk > 0 else 0
-            
-            # Obsługa pliku z wykresem
-            chart_image = trade_idea.get('chart_image')
-            
-            # Sprawdź czy usunąć istniejący wykres
-            if request.form.get('delete_chart') and chart_image:
-                try:
-                    os.remove(os.path.join(app.config['UPLOAD_FOLDER'], chart_image))
-                    chart_image = None
-                except Exception as e:
-                    pass  # Ignoruj błędy usuwania
-            
-            # Sprawdź czy dodać nowy wykres
-            if 'chart_image' in request.files and request.files['chart_image'].filename:
-                file = request.files['chart_image']
-                if file and allowed_file(file.filename):
-                    # Usuń stary plik jeśli istnieje
-                    if chart_image:
-                        try:
-                            os.remove(os.path.join(app.config['UPLOAD_FOLDER'], chart_image))
-                        except Exception as e:
-                            pass  # Ignoruj błędy usuwania
-                    
-                    # Generuj unikalną nazwę pliku
-                    filename = secure_filename(f"{symbol}_{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}")
-                    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                    file.save(file_path)
-                    chart_image = filename
-            
-            # Aktualizacja danych pomysłu handlowego
-            idea_data = {
-                'symbol': symbol,
-                'direction': direction,
-                'entry_price': entry_price,
-                'stop_loss': stop_loss,
-                'take_profit': take_profit,
-                'risk_percentage': risk_percentage,
-                'risk_reward_ratio': risk_reward_ratio,
-                'valid_until': valid_until.isoformat(),
-                'timeframe': timeframe,
-                'strategy': strategy,
-                'source': source,
-                'technical_analysis': technical_analysis,
-                'fundamental_analysis': fundamental_analysis,
-                'risk_analysis': risk_analysis,
-                'notes': notes,
-                'chart_image': chart_image,
-                'updated_at': datetime.now().isoformat()
-            }
+            # Pobierz dane z formularza i zaktualizuj wykres
+            idea_data = parse_idea_form(request.form, request.files, existing=trade_idea)
+            idea_data['updated_at'] = datetime.now().isoformat()
             
             # Zaktualizuj w bazie danych
             db_handler.update_trade_idea(idea_id, idea_data)
+            invalidate_trade_ideas_cache()
             
             # Sprawdź czy wykonać po edycji
             if request.form.get('action') == 'execute' and trade_idea.get('status') == 'PENDING':
@@ -378,11 +549,46 @@ def edit_trade_idea(idea_id):
     return render_template('edit_trade_idea.html', trade_idea=trade_idea)
 
 
+def update_job(job_id, **fields):
+    """Aktualizuje stan zadania działającego w tle."""
+    with jobs_lock:
+        job = jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+
+def run_trade_idea_job(job_id, idea_id, trade_idea, order_processor):
+    """Wykonuje pomysł handlowy w wątku roboczym MT5 i zapisuje wynik."""
+    status, error = 'REJECTED', None
+    
+    try:
+        update_job(job_id, status='EXECUTING')
+        db_handler.update_trade_idea(idea_id, {'status': 'EXECUTING'})
+        
+        result = order_processor.process_trade_idea(trade_idea)
+        
+        if result.get('success'):
+            status = 'EXECUTED'
+        else:
+            error = result.get('error')
+            
+    except Exception as e:
+        error = str(e)
+    finally:
+        # Stan końcowy zapisywany jest zawsze, aby pomysł nie pozostał jako QUEUED/EXECUTING
+        update_job(job_id, status=status, error=error)
+        fields = {'status': status}
+        if status == 'REJECTED':
+            fields['rejection_reason'] = error
+        try:
+            db_handler.update_trade_idea(idea_id, fields)
+        finally:
+            invalidate_trade_ideas_cache()
+
+
 @app.route('/execute_trade_idea/<int:idea_id>')
 def execute_trade_idea(idea_id):
-    """Wykonanie pomysłu handlowego."""
-    global mt5_connector, risk_manager, order_processor
-    
+    """Przekazanie pomysłu handlowego do wykonania w tle."""
     # Pobierz dane pomysłu
     trade_idea = db_handler.get_trade_idea(idea_id)
     
@@ -394,38 +600,46 @@ def execute_trade_idea(idea_id):
         flash('Tylko oczekujące pomysły handlowe mogą być wykonane.', 'warning')
         return redirect(url_for('trade_idea_details', idea_id=idea_id))
     
-    try:
-        # Inicjalizuj MT5Connector jeśli nie istnieje
-        if mt5_connector is None:
-            mt5_connector = MT5Connector()
-            
-        # Inicjalizuj RiskManager jeśli nie istnieje
-        if risk_manager is None:
-            risk_manager = RiskManager(db_handler)
-            risk_manager.set_mt5_connector(mt5_connector)
-            
-        # Inicjalizuj OrderProcessor jeśli nie istnieje
-        if order_processor is None:
-            order_processor = OrderProcessor(db_handler, mt5_connector, risk_manager)
-        
-        # Przetworzyć pomysł handlowy
-        result = order_processor.process_trade_idea(trade_idea)
-        
-        if result.get('success'):
-            flash('Pomyślnie wykonano pomysł handlowy!', 'success')
-            # Aktualizuj status pomysłu w bazie danych
-            db_handler.update_trade_idea(idea_id, {'status': 'EXECUTED'})
-        else:
-            flash(f'Nie udało się wykonać pomysłu: {result.get("error")}', 'danger')
-            # Aktualizuj status pomysłu w bazie danych
-            db_handler.update_trade_idea(idea_id, {'status': 'REJECTED', 'rejection_reason': result.get('error')})
-            
-    except Exception as e:
-        flash(f'Wystąpił błąd podczas wykonywania pomysłu: {str(e)}', 'danger')
-        # Aktualizuj status pomysłu w bazie danych
-        db_handler.update_trade_idea(idea_id, {'status': 'REJECTED', 'rejection_reason': str(e)})
+    # Zarejestruj zadanie i przekaż je do wątku roboczego MT5
+    job_id = uuid.uuid4().hex
+    with jobs_lock:
+        jobs[job_id] = {'id': job_id, 'idea_id': idea_id, 'status': 'QUEUED', 'error': None}
+        # Usuwane są najstarsze zakończone zadania - oczekujące i wykonywane pozostają w rejestrze
+        finished = [key for key, job in jobs.items() if job['status'] in FINISHED_JOB_STATUSES]
+        for key in finished[:max(0, len(jobs) - MAX_TRACKED_JOBS)]:
+            del jobs[key]
     
-    return redirect(url_for('trade_idea_details', idea_id=idea_id))
+    db_handler.update_trade_idea(idea_id, {'status': 'QUEUED'})
+    invalidate_trade_ideas_cache()
+    mt5_executor.submit(run_trade_idea_job, job_id, idea_id, trade_idea,
+                        current_app.extensions['mt5'].order_processor)
+    
+    flash('Pomysł handlowy został przekazany do wykonania.', 'info')
+    return redirect(url_for('trade_idea_details', idea_id=idea_id, job=job_id))
+
+
+@app.route('/charts/<path:filename>')
+def chart_image(filename):
+    """Zwraca plik wykresu dołączonego do pomysłu handlowego."""
+    accel_prefix = app.config['CHARTS_ACCEL_PREFIX']
+    if accel_prefix:
+        # Treść pliku wysyła nginx (sendfile), aplikacja zwraca tylko nagłówek
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + secure_filename(filename)
+        return response
+    
+    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+
+
+@app.route('/api/job/<job_id>')
+def job_status(job_id):
+    """API endpoint zwracający stan zadania wykonania pomysłu handlowego."""
+    with jobs_lock:
+        job = dict(jobs[job_id]) if job_id in jobs else None
+    
+    if job is None:
+        return jsonify({'error': 'Nie znaleziono zadania'}), 404
+    return jsonify(job)
 
 
 @app.route('/delete_trade_idea/<int:idea_id>', methods=['POST'])
@@ -441,13 +655,11 @@ def delete_trade_idea(idea_id):
     try:
         # Usuń zdjęcie wykresu jeśli istnieje
         if trade_idea.get('chart_image'):
-            try:
-                os.remove(os.path.join(app.config['UPLOAD_FOLDER'], trade_idea['chart_image']))
-            except Exception as e:
-                pass  # Ignoruj błędy usuwania pliku
+            remove_chart_image(trade_idea['chart_image'])
         
         # Usuń pomysł z bazy danych
         db_handler.delete_trade_idea(idea_id)
+        invalidate_trade_ideas_cache()
         
         flash('Pomyślnie usunięto pomysł handlowy!', 'success')
     except Exception as e:
@@ -491,190 +703,333 @@ def add_comment(idea_id):
     return redirect(url_for('trade_idea_details', idea_id=idea_id))
 
 
+def refresh_account_snapshot(connector):
+    """Pobiera stan konta z MT5 w wątku roboczym i zapisuje go w account_snapshot."""
+    try:
+        account_snapshot.update(
+            account_info=connector.get_account_info(),
+            open_positions=connector.get_open_positions(),
+            error=None,
+            updated_at=datetime.now().isoformat()
+        )
+    except Exception as e:
+        account_snapshot['error'] = str(e)
+
+
+def schedule_account_refresh():
+    """Zleca odświeżenie stanu konta, jeśli poprzednie odświeżenie już się zakończyło."""
+    global account_refresh
+    
+    if account_refresh is None or account_refresh.done():
+        account_refresh = mt5_executor.submit(refresh_account_snapshot,
+                                              current_app.extensions['mt5'].connector)
+
+
 @app.route('/account_status')
 def account_status():
     """Strona ze statusem konta handlowego."""
-    global mt5_connector
-    
-    # Inicjalizuj MT5Connector tylko jeśli potrzebny
-    if mt5_connector is None:
-        try:
-            mt5_connector = MT5Connector()
-        except Exception as e:
-            return render_template('account_status.html', error=str(e))
-    
-    # Pobierz informacje o koncie
-    try:
-        account_info = mt5_connector.get_account_info()
-        open_positions = mt5_connector.get_open_positions()
-    except Exception as e:
-        return render_template('account_status.html', error=str(e))
+    # Odśwież dane w tle i wyświetl ostatni znany stan konta
+    schedule_account_refresh()
     
     return render_template(
         'account_status.html', 
-        account_info=account_info, 
-        open_positions=open_positions
+        account_info=account_snapshot['account_info'], 
+        open_positions=account_snapshot['open_positions'],
+        error=account_snapshot['error'],
+        updated_at=account_snapshot['updated_at']
     )
 
 
+@app.route('/api/account_status')
+def api_account_status():
+    """API endpoint zwracający ostatni znany stan konta."""
+    schedule_account_refresh()
+    return jsonify(account_snapshot)
+
+
 @app.route('/api/equity_chart')
 def equity_chart():
     """API endpoint zwracający dane dla wykresu kapitału."""
-    # Pobierz historię transakcji z bazy danych
-    trades = db_handler.get_trades(limit=1000)
+    # Historia transakcji pobierana jest raz i buforowana na kilka sekund
+    trades = get_trades_df()
     
     # Oblicz krzywą kapitału
     equity_data = calculate_equity_curve(trades)
     
-    return jsonify(equity_data)
+    # Ogranicz liczbę punktów zachowując kształt krzywej
+    if len(equity_data) > EQUITY_CHART_MAX_POINTS:
+        equity = np.fromiter((point['equity'] for point in equity_data),
+                             dtype=np.float64, count=len(equity_data))
+        indices = lttb_downsample(equity, EQUITY_CHART_MAX_POINTS)
+        equity_data = [equity_data[i] for i in indices]
+    
+    return Response(stream_with_context(stream_json_array(equity_data)), mimetype='application/json')
 
 
 @app.route('/api/performance_by_symbol')
 def performance_by_symbol():
     """API endpoint zwracający wyniki handlowe w podziale na instrumenty."""
-    # Pobierz transakcje z bazy danych
-    trades = db_handler.get_trades(limit=1000)
-    
-    # Grupuj wyniki według symboli
-    symbols_data = {}
-    for trade in trades:
-        symbol = trade.get('symbol', 'Unknown')
-        profit_loss = trade.get('profit_loss', 0)
-        
-        if symbol not in symbols_data:
-            symbols_data[symbol] = {'count': 0, 'profit_loss': 0}
-        
-        symbols_data[symbol]['count'] += 1
-        symbols_data[symbol]['profit_loss'] += profit_loss
-    
-    # Konwertuj na format odpowiedni dla wykresu
-    result = []
-    for symbol, data in symbols_data.items():
-        result.append({
-            'symbol': symbol,
-            'count': data['count'],
-            'profit_loss': data['profit_loss']
-        })
+    # Agregacja według symboli wykonywana po stronie bazy danych
+    result = db_handler.get_performance_by_symbol()
     
     return jsonify(result)
 
 
+def stream_json_array(items):
+    """Generuje tablicę JSON element po elemencie, bez budowania całej odpowiedzi w pamięci."""
+    yield '['
+    for i, item in enumerate(items):
+        yield (',' if i else '') + app.json.dumps(item)
+    yield ']'
+
+
 def calculate_statistics(trades):
     """Oblicza statystyki handlowe na podstawie historii transakcji."""
-    if not trades:
-        return {
-            'total_trades': 0,
-            'winning_trades': 0,
-            'losing_trades': 0,
-            'win_rate': 0,
-            'total_profit': 0,
-            'total_loss': 0,
-            'net_profit': 0,
-            'profit_factor': 0,
-            'avg_profit': 0,
-            'avg_loss': 0,
-            'largest_profit': 0,
-            'largest_loss': 0
-        }
-    
-    # Inicjalizacja zmiennych
-    total_trades = len(trades)
-    winning_trades = sum(1 for t in trades if t.get('profit_loss', 0) > 0)
-    losing_trades = sum(1 for t in trades if t.get('profit_loss', 0) < 0)
-    
-    # Obliczenie zysków i strat
-    winning_amounts = [t.get('profit_loss', 0) for t in trades if t.get('profit_loss', 0) > 0]
-    losing_amounts = [abs(t.get('profit_loss', 0)) for t in trades if t.get('profit_loss', 0) < 0]
+    # Wyniki transakcji jako jedna tablica - wszystkie agregaty liczone wektorowo
+    profit_loss = np.fromiter(
+        (pl or 0 for pl in map(itemgetter('profit_loss'), trades)), dtype=np.float64, count=len(trades)
+    )
+    winning_amounts = profit_loss[profit_loss > 0]
+    losing_amounts = -profit_loss[profit_loss < 0]
     
-    total_profit = sum(winning_amounts) if winning_amounts else 0
-    total_loss = sum(losing_amounts) if losing_amounts else 0
-    net_profit = total_profit - total_loss
+    return summarize_statistics({
+        'total_trades': len(trades),
+        'winning_trades': int(winning_amounts.size),
+        'losing_trades': int(losing_amounts.size),
+        'total_profit': float(winning_amounts.sum()),
+        'total_loss': float(losing_amounts.sum()),
+        'largest_profit': float(winning_amounts.max(initial=0)),
+        'largest_loss': float(losing_amounts.max(initial=0))
+    })
+
+
+def summarize_statistics(totals):
+    """Wylicza wskaźniki handlowe z zagregowanych sum (np. z DatabaseHandler.get_stats)."""
+    total_trades = totals['total_trades']
+    winning_trades = totals['winning_trades']
+    losing_trades = totals['losing_trades']
+    total_profit = totals['total_profit']
+    total_loss = totals['total_loss']
     
-    # Obliczenie wskaźników
-    win_rate = (winning_trades / total_trades) * 100 if total_trades > 0 else 0
-    profit_factor = total_profit / total_loss if total_loss > 0 else float('inf')
-    avg_profit = total_profit / winning_trades if winning_trades > 0 else 0
-    avg_loss = total_loss / losing_trades if losing_trades > 0 else 0
-    largest_profit = max(winning_amounts) if winning_amounts else 0
-    largest_loss = max(losing_amounts) if losing_amounts else 0
+    if total_trades == 0:
+        profit_factor = 0
+    elif total_loss > 0:
+        profit_factor = round(total_profit / total_loss, 2)
+    else:
+        profit_factor = 'inf'
     
     return {
         'total_trades': total_trades,
         'winning_trades': winning_trades,
         'losing_trades': losing_trades,
-        'win_rate': round(win_rate, 2),
+        'win_rate': round(winning_trades / total_trades * 100, 2) if total_trades > 0 else 0,
         'total_profit': round(total_profit, 2),
         'total_loss': round(total_loss, 2),
-        'net_profit': round(net_profit, 2),
-        'profit_factor': round(profit_factor, 2) if profit_factor != float('inf') else 'inf',
-        'avg_profit': round(avg_profit, 2),
-        'avg_loss': round(avg_loss, 2),
-        'largest_profit': round(largest_profit, 2),
-        'largest_loss': round(largest_loss, 2)
+        'net_profit': round(total_profit - total_loss, 2),
+        'profit_factor': profit_factor,
+        'avg_profit': round(total_profit / winning_trades, 2) if winning_trades > 0 else 0,
+        'avg_loss': round(total_loss / losing_trades, 2) if losing_trades > 0 else 0,
+        'largest_profit': round(totals['largest_profit'], 2),
+        'largest_loss': round(totals['largest_loss'], 2)
     }
 
 
 def calculate_equity_curve(trades):
-    """Oblicza krzywą kapitału na podstawie historii transakcji."""
-    if not trades:
+    """Oblicza krzywą kapitału na podstawie historii transakcji (lista słowników lub DataFrame)."""
+    df = pd.DataFrame(trades)
+    
+    # Transakcje z bazy danych przechowują czas zamknięcia w kolumnie exit_time
+    if 'close_time' not in df and 'exit_time' in df:
+        df = df.rename(columns={'exit_time': 'close_time'})
+    if df.empty or 'close_time' not in df or 'profit_loss' not in df:
         return []
     
-    # Posortuj transakcje według czasu
-    sorted_trades = sorted(trades, key=lambda x: x.get('entry_time', ''))
+    # Tylko zamknięte transakcje z wynikiem, w kolejności zamknięcia
+    df = df[['close_time', 'profit_loss']].dropna()
+    if df.empty:
+        return []
+    df = df.sort_values('close_time', kind='stable')
+    
+    # Kapitał narastająco od początkowego kapitału 1000
+    df['equity'] = df['profit_loss'].cumsum() + 1000.0
+    
+    return df.rename(columns={'close_time': 'date'})[['date', 'equity']].to_dict('records')
+
+
+def lttb_downsample(values, n_out):
+    """
+    Zwraca indeksy punktów wybranych algorytmem Largest-Triangle-Three-Buckets.
+    
+    Punkty są traktowane jako równomiernie rozłożone na osi X. Pierwszy i ostatni
+    punkt są zawsze zachowywane, z każdego kubełka pomiędzy nimi wybierany jest
+    punkt tworzący największy trójkąt z poprzednio wybranym punktem i średnią
+    następnego kubełka.
+    
+    Args:
+        values: Tablica wartości (oś Y)
+        n_out: Docelowa liczba punktów
+        
+    Returns:
+        np.ndarray: Rosnąca tablica indeksów wybranych punktów
+    """
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
     
-    # Inicjalizuj krzywą kapitału
-    equity_curve = []
-    running_balance = 1000.0  # Początkowy kapitał
+    y = np.asarray(values, dtype=np.float64)
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
     
-    for trade in sorted_trades:
-        close_time = trade.get('close_time', None)
-        profit_loss = trade.get('profit_loss', 0)
+    for i in range(n_out - 2):
+        # Średnia następnego kubełka (dla ostatniego kubełka - ostatni punkt)
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = (avg_start + avg_end - 1) / 2.0
+        avg_y = y[avg_start:avg_end].mean()
         
-        if close_time and profit_loss is not None:
-            running_balance += profit_loss
-            equity_curve.append({
-                'date': close_time,
-                'equity': running_balance
-            })
+        # Punkt bieżącego kubełka tworzący największy trójkąt
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        x = np.arange(start, end, dtype=np.float64)
+        area = np.abs((a - avg_x) * (y[start:end] - y[a]) - (a - x) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        indices[i + 1] = a
     
-    return equity_curve
+    return indices
 
 
 def allowed_file(filename):
     """Sprawdza czy plik ma dozwolone rozszerzenie."""
-    ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def parse_idea_form(form, files, existing=None):
+    """
+    Przetwarza formularz dodawania lub edycji pomysłu handlowego.
+    
+    Args:
+        form: Dane formularza (request.form)
+        files: Przesłane pliki (request.files)
+        existing: Edytowany pomysł handlowy lub None przy dodawaniu nowego
+        
+    Returns:
+        Słownik z danymi pomysłu handlowego, w tym obliczonym RR i nazwą wykresu
+    """
+    idea_data = {name: form.get(name, default) for name, default in IDEA_TEXT_FIELDS.items()}
+    idea_data.update({name: float(form.get(name, default)) for name, default in IDEA_FLOAT_FIELDS.items()})
+    idea_data['valid_until'] = datetime.fromisoformat(form.get('valid_until')).isoformat()
+    
+    # Oblicz RR ratio
+    entry_price, stop_loss, take_profit = (
+        idea_data['entry_price'], idea_data['stop_loss'], idea_data['take_profit']
+    )
+    if idea_data['direction'] == 'BUY':
+        risk, reward = entry_price - stop_loss, take_profit - entry_price
+    else:  # SELL
+        risk, reward = stop_loss - entry_price, entry_price - take_profit
+    idea_data['risk_reward_ratio'] = round(reward / risk, 2) if risk > 0 else 0
+    
+    # Obsługa pliku z wykresem
+    chart_image = existing.get('chart_image') if existing else None
+    if existing and form.get('delete_chart') and chart_image:
+        remove_chart_image(chart_image)
+        chart_image = None
+    
+    file = files.get('chart_image')
+    if file and file.filename and allowed_file(file.filename):
+        # Nowy wykres zastępuje poprzedni
+        if chart_image:
+            remove_chart_image(chart_image)
+        chart_image = save_chart_image(file)
+    
+    idea_data['chart_image'] = chart_image
+    return idea_data
+
+
+def save_chart_image(file):
+    """
+    Zapisuje przesłany wykres pod unikalną nazwą i zwraca tę nazwę.
+    
+    Plik zapisywany jest najpierw pod nazwą tymczasową, a następnie atomowo
+    przenoszony na miejsce docelowe, więc przerwany zapis nie zostawia
+    niekompletnego pliku pod nazwą zapisaną w bazie danych.
+    """
+    # Nazwa składa się z UUID i zweryfikowanego rozszerzenia - nie wymaga sanityzacji
+    filename = f"{uuid.uuid4().hex}.{file.filename.rsplit('.', 1)[1].lower()}"
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    tmp_path = file_path + '.part'
+    
+    try:
+        with open(tmp_path, 'wb') as out:
+            shutil.copyfileobj(file.stream, out, UPLOAD_CHUNK_SIZE)
+        os.replace(tmp_path, file_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    
+    if Image is not None:
+        thumbnail_executor.submit(create_chart_thumbnail, file_path)
+    return filename
+
+
+def chart_thumbnail_name(filename):
+    """Zwraca nazwę pliku miniatury dla wykresu."""
+    return f"{filename.rsplit('.', 1)[0]}_thumb.jpg"
+
+
+def create_chart_thumbnail(file_path):
+    """Tworzy miniaturę JPEG wykresu obok pliku źródłowego."""
+    directory, filename = os.path.split(file_path)
+    thumb_path = os.path.join(directory, chart_thumbnail_name(filename))
+    tmp_path = thumb_path + '.part'
+    
+    try:
+        with Image.open(file_path) as image:
+            image.thumbnail(CHART_THUMBNAIL_SIZE)
+            image.convert('RGB').save(tmp_path, 'JPEG', quality=85)
+        os.replace(tmp_path, thumb_path)
+    except Exception as e:
+        app.logger.warning(f"Nie udało się utworzyć miniatury wykresu {filename}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def remove_chart_image(filename):
+    """Usuwa plik wykresu wraz z miniaturą, ignorując brakujące pliki."""
+    for name in (filename, chart_thumbnail_name(filename)):
+        try:
+            os.remove(os.path.join(app.config['UPLOAD_FOLDER'], name))
+        except OSError:
+            pass
+
+
 # Filtry do szablonów
 @app.template_filter('status_badge')
 def status_badge_filter(status):
     """Zwraca klasę bootstrap dla badge ze statusem."""
-    if status == 'PENDING':
-        return 'bg-warning'
-    elif status == 'EXECUTED':
-        return 'bg-success'
-    elif status == 'EXPIRED':
-        return 'bg-secondary'
-    elif status == 'REJECTED':
-        return 'bg-danger'
-    else:
-        return 'bg-info'
+    return STATUS_BADGES.get(status, 'bg-info')
 
 
 @app.template_filter('status_label')
 def status_label_filter(status):
     """Zwraca etykietę dla statusu po polsku."""
-    if status == 'PENDING':
-        return 'Oczekujący'
-    elif status == 'EXECUTED':
-        return 'Wykonany'
-    elif status == 'EXPIRED':
-        return 'Wygasły'
-    elif status == 'REJECTED':
-        return 'Odrzucony'
-    else:
-        return status
+    return STATUS_LABELS.get(status, status)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_iso_datetime(value):
+    """Parsuje znacznik czasu ISO 8601; wynik jest buforowany, bo te same wartości wracają przy każdym renderowaniu."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+@app.template_filter('chart_thumbnail')
+def chart_thumbnail_filter(filename):
+    """Zwraca nazwę pliku miniatury wykresu do użycia w szablonach."""
+    return chart_thumbnail_name(filename)
 
 
 @app.template_filter('datetime')
@@ -683,7 +1038,7 @@ def datetime_filter(value, format='%d-%m-%Y %H:%M'):
     if value is None:
         return ''
     if isinstance(value, str):
-        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        value = parse_iso_datetime(value)
     return value.strftime(format)
 
 
@@ -11,31 +11,132 @@ Odpowiada za:
 
 import os
 import sys
+import copy
+import functools
 import json
 import logging
+import logging.handlers
+import pickle
 import argparse
 from pathlib import Path
 
-from Dashboard.app import create_app
-from Database.database import DatabaseHandler
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - bez niego używany jest standardowy moduł json
+    orjson = None
+
+from Common.logging_config import LOG_LEVELS
 
 # Ścieżki konfiguracji
-PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-CONFIG_DIR = os.path.join(PROJECT_DIR, "config")
-LOG_DIR = os.path.join(PROJECT_DIR, "logs", "dashboard")
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = PROJECT_DIR / "config"
+LOG_DIR = PROJECT_DIR / "logs" / "dashboard"
+CONFIG_SUFFIX = "_config.json"
+CONFIG_CACHE_FILE = ".config.cache"
 
 # Konfiguracja logowania
-os.makedirs(LOG_DIR, exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(LOG_DIR, "dashboard.log")),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
 logger = logging.getLogger("dashboard")
 
+# Konfiguracja domyślna używana, gdy brak pliku konfiguracyjnego.
+# Pola zależne od środowiska uzupełniane są w load_config na kopii.
+_DEFAULT_CONFIG = {
+    "environment": "dev",
+    "dashboard": {
+        "host": "localhost",
+        "port": 5000,
+        "debug": True,
+        "log_level": "DEBUG",
+        "threads": 8
+    },
+    "database": {
+        "url": "sqlite:///data/llm_trader.db"
+    }
+}
+
+# Sparsowane pliki konfiguracyjne: (ścieżka, czas modyfikacji w ns) -> konfiguracja
+_CONFIG_CACHE = {}
+
+
+def configure_logging():
+    """
+    Konfiguruje logowanie do pliku i na konsolę, jeśli nie zostało już skonfigurowane.
+    
+    Plik logu otwierany jest dopiero przy zapisie pierwszego rekordu.
+    """
+    if logging.getLogger().handlers:
+        return
+    
+    if not LOG_DIR.exists():
+        LOG_DIR.mkdir(parents=True, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.handlers.RotatingFileHandler(
+                LOG_DIR / "dashboard.log",
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding='utf-8',
+                delay=True
+            ),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+
+def parse_config(raw):
+    """Parsuje zawartość pliku konfiguracyjnego JSON podaną jako bajty."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def build_config_cache():
+    """
+    Parsuje wszystkie pliki *_config.json i zapisuje je do wspólnego bufora pickle.
+    
+    Returns:
+        dict: Konfiguracje indeksowane nazwą środowiska
+    """
+    configs = {
+        path.name[:-len(CONFIG_SUFFIX)]: parse_config(path.read_bytes())
+        for path in CONFIG_DIR.glob(f"*{CONFIG_SUFFIX}")
+    }
+    
+    cache_path = CONFIG_DIR / CONFIG_CACHE_FILE
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(configs, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Nie można zapisać bufora konfiguracji: {e}")
+    
+    return configs
+
+
+def _load_cached():
+    """
+    Zwraca konfiguracje wszystkich środowisk z bufora pickle.
+    
+    Bufor jest przebudowywany, jeśli nie istnieje lub jest starszy
+    od któregokolwiek pliku *_config.json.
+    """
+    cache_path = CONFIG_DIR / CONFIG_CACHE_FILE
+    try:
+        cache_mtime = cache_path.stat().st_mtime_ns
+        if all(path.stat().st_mtime_ns <= cache_mtime
+               for path in CONFIG_DIR.glob(f"*{CONFIG_SUFFIX}")):
+            with open(cache_path, 'rb') as f:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    
+    return build_config_cache()
+
 
 def load_config(env="dev"):
     """
@@ -47,34 +148,55 @@ def load_config(env="dev"):
     Returns:
         dict: Konfiguracja
     """
-    config_path = os.path.join(CONFIG_DIR, f"{env}_config.json")
-    
-    # Sprawdź czy plik konfiguracyjny istnieje
-    if not os.path.exists(config_path):
-        logger.warning(f"Plik konfiguracyjny nie istnieje: {config_path}. Używanie konfiguracji domyślnej.")
-        return {
-            "environment": env,
-            "dashboard": {
-                "host": "localhost",
-                "port": 5000,
-                "debug": env == "dev",
-                "log_level": "INFO" if env != "dev" else "DEBUG"
-            },
-            "database": {
-                "url": "sqlite:///data/llm_trader.db"
-            }
-        }
+    config_path = CONFIG_DIR / f"{env}{CONFIG_SUFFIX}"
     
     try:
-        with open(config_path, 'r') as file:
-            config = json.load(file)
+        # Plik parsowany jest ponownie tylko po zmianie jego czasu modyfikacji.
+        # Brak pliku wykrywany jest przez stat(), bez osobnego sprawdzania istnienia.
+        key = (config_path, config_path.stat().st_mtime_ns)
+        if key not in _CONFIG_CACHE:
+            config = _load_cached().get(env)
+            if config is None:
+                config = parse_config(config_path.read_bytes())
+            for stale_key in [k for k in _CONFIG_CACHE if k[0] == config_path]:
+                del _CONFIG_CACHE[stale_key]
+            _CONFIG_CACHE[key] = config
             logger.info(f"Załadowano konfigurację dla środowiska: {env}")
-            return config
+        
+        # Kopia chroni bufor przed modyfikacjami wprowadzanymi przez wywołującego
+        return copy.deepcopy(_CONFIG_CACHE[key])
+    except FileNotFoundError:
+        logger.warning(f"Plik konfiguracyjny nie istnieje: {config_path}. Używanie konfiguracji domyślnej.")
+        config = copy.deepcopy(_DEFAULT_CONFIG)
+        config["environment"] = env
+        config["dashboard"]["debug"] = env == "dev"
+        config["dashboard"]["log_level"] = "DEBUG" if env == "dev" else "INFO"
+        return config
     except Exception as e:
         logger.error(f"Błąd podczas ładowania konfiguracji: {e}")
         sys.exit(1)
 
 
+def serve_production(app, host, port, threads):
+    """
+    Uruchamia aplikację na wielowątkowym serwerze WSGI waitress.
+    
+    Args:
+        app: Aplikacja Flask
+        host (str): Host serwera
+        port (int): Port serwera
+        threads (int): Liczba wątków obsługujących żądania
+    """
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("Pakiet waitress nie jest zainstalowany. Używanie wielowątkowego serwera Flask.")
+        app.run(host=host, port=port, threaded=True)
+        return
+    
+    serve(app, host=host, port=port, threads=threads)
+
+
 def run_dashboard_service(env, host=None, port=None, debug=None):
     """
     Inicjalizuje serwis dashboardu.
@@ -85,20 +207,20 @@ def run_dashboard_service(env, host=None, port=None, debug=None):
         port (int, optional): Port dla serwera Flask
         debug (bool, optional): Tryb debugowania
     """
+    # Flask i warstwa bazy danych importowane są dopiero przy uruchomieniu serwisu,
+    # dzięki czemu --help i błędy argumentów nie płacą za ich import
+    from Dashboard.app import create_app
+    from Database.database import DatabaseHandler
+    
+    configure_logging()
+    
     try:
         # Załaduj konfigurację
         config = load_config(env)
         
         # Ustaw poziom logowania
         log_level = config.get("dashboard", {}).get("log_level", "INFO")
-        if log_level == "DEBUG":
-            logger.setLevel(logging.DEBUG)
-        elif log_level == "INFO":
-            logger.setLevel(logging.INFO)
-        elif log_level == "WARNING":
-            logger.setLevel(logging.WARNING)
-        elif log_level == "ERROR":
-            logger.setLevel(logging.ERROR)
+        logger.setLevel(LOG_LEVELS.get(log_level.upper(), logging.INFO))
         
         logger.info("Inicjalizacja serwisu Dashboard")
         
@@ -111,22 +233,34 @@ def run_dashboard_service(env, host=None, port=None, debug=None):
             debug = config.get("dashboard", {}).get("debug", env == "dev")
         
         # Połączenie z bazą danych
-        db_url = config.get("database", {}).get("url", "sqlite:///data/llm_trader.db")
-        db_handler = DatabaseHandler(db_url)
+        db_config = config.get("database", {})
+        db_url = db_config.get("url", "sqlite:///data/llm_trader.db")
+        db_handler = DatabaseHandler(db_url, pool_size=db_config.get("pool_size", 5))
         
         # Tworzenie aplikacji Flask
         app = create_app(db_handler=db_handler, config=config)
         
+        # Przygotuj połączenia z bazą przed przyjęciem pierwszych żądań
+        warmed = db_handler.warm(db_config.get("warm_size", 2))
+        logger.debug(f"Przygotowano {warmed} połączeń z bazą danych")
+        
         logger.info(f"Uruchamianie serwera dashboard na {host}:{port} (debug={debug})")
-        app.run(host=host, port=port, debug=debug)
+        if env == "dev":
+            app.run(host=host, port=port, debug=debug)
+        else:
+            serve_production(app, host, port, config.get("dashboard", {}).get("threads", 8))
+        
+        # Serwer zakończył pracę - zamknij połączenia z bazą danych
+        db_handler.close()
         
     except Exception as e:
         logger.error(f"Błąd podczas uruchamiania dashboardu: {e}")
         sys.exit(1)
 
 
-def main():
-    """Funkcja główna skryptu."""
+@functools.lru_cache(maxsize=None)
+def build_parser():
+    """Tworzy (jednokrotnie) parser argumentów wiersza poleceń."""
     parser = argparse.ArgumentParser(description="Uruchamia dashboard systemu handlowego LLM")
     parser.add_argument("--env", "-e", type=str, default="dev", 
                         choices=["dev", "test", "prod"],
@@ -134,8 +268,19 @@ def main():
     parser.add_argument("--host", type=str, help="Host serwera Flask")
     parser.add_argument("--port", type=int, help="Port serwera Flask")
     parser.add_argument("--debug", action="store_true", help="Włącza tryb debug")
+    parser.add_argument("--build-config-cache", action="store_true",
+                        help="Buduje bufor sparsowanych plików konfiguracyjnych i kończy działanie")
+    return parser
+
+
+def main():
+    """Funkcja główna skryptu."""
+    args = build_parser().parse_args()
     
-    args = parser.parse_args()
+    if args.build_config_cache:
+        configs = build_config_cache()
+        print(f"Zbuforowano konfigurację środowisk: {', '.join(sorted(configs))}")
+        return
     
     # Uruchom serwis dashboard
     run_dashboard_service(args.env, args.host, args.port, args.debug)
@@ -8,15 +8,290 @@ Implementuje klasę DatabaseHandler do zarządzania bazą danych i operacjami CR
 
 import os
 import json
+import time
+import queue
+import base64
 import sqlite3
 import logging
 import datetime
+import functools
+import contextlib
+import threading
+import collections
+from concurrent.futures import Future
 from typing import Dict, List, Any, Optional, Union, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - bez niego używany jest standardowy moduł json
+    orjson = None
+
 # Konfiguracja loggera
 logger = logging.getLogger(__name__)
 
+# Czas (w sekundach), przez jaki buforowana jest liczba rekordów dla stronicowania
+COUNT_CACHE_TTL = 60
+
+
+# Ustawienia każdego nowego połączenia. WAL pozwala dashboardowi czytać podczas
+# zapisów procesora zleceń, a synchronous=NORMAL w trybie WAL nie wymusza fsync
+# przy każdym zatwierdzeniu transakcji.
+CONNECTION_PRAGMAS = """
+PRAGMA foreign_keys = ON;
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA cache_size = -64000;
+PRAGMA temp_store = MEMORY;
+PRAGMA mmap_size = 268435456;
+"""
+
+# Liczba wierszy pobieranych jednorazowo przez iter_logs
+LOG_FETCH_SIZE = 1000
+
+# Maksymalna liczba analiz zapisywanych przez wątek w tle w jednej transakcji
+WRITE_BATCH_SIZE = 100
+
+# Rozmiar bufora przygotowanych instrukcji SQL na połączenie
+CACHED_STATEMENTS = 256
+
+# Instrukcje najczęściej wykonywanych zapisów, przygotowywane raz na połączenie
+INSERT_MARKET_ANALYSIS_SQL = (
+    "INSERT INTO market_analyses (symbol, timeframe, analysis_data) VALUES (?, ?, ?)"
+)
+INSERT_TRADE_IDEA_SQL = (
+    "INSERT INTO trade_ideas (analysis_id, symbol, direction, entry_price, stop_loss, take_profit, risk_reward) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_TRADE_SQL = (
+    "INSERT INTO trades (trade_idea_id, symbol, direction, entry_price, entry_time, stop_loss, take_profit, "
+    "volume, status, comment) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+INSERT_LOG_SQL = "INSERT INTO system_log_entries (level_id, module_id, message) VALUES (?, ?, ?)"
+
+# Logi systemowe przechowują poziom i moduł jako identyfikatory ze słowników
+# log_levels i log_modules. Widok system_logs odtwarza dotychczasowy układ kolumn.
+SYSTEM_LOGS_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS log_levels (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    "CREATE TABLE IF NOT EXISTS log_modules (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)",
+    '''
+    CREATE TABLE IF NOT EXISTS system_log_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        level_id INTEGER NOT NULL REFERENCES log_levels (id),
+        module_id INTEGER NOT NULL REFERENCES log_modules (id),
+        message TEXT NOT NULL,
+        timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE VIEW IF NOT EXISTS system_logs AS
+    SELECT e.id, l.name AS level, m.name AS module, e.message, e.timestamp, e.created_at
+    FROM system_log_entries e
+    JOIN log_levels l ON l.id = e.level_id
+    JOIN log_modules m ON m.id = e.module_id
+    ''',
+)
+
+# Bieżący czas lokalny w formacie ISO 8601 wyliczany przez SQLite w instrukcji INSERT
+SQL_LOCAL_TIMESTAMP = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+
+# Tabela pomysłów handlowych obsługiwanych przez dashboard
+TRADE_IDEAS_EXTENDED_TABLE = '''
+CREATE TABLE IF NOT EXISTS trade_ideas_extended (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    symbol TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    stop_loss REAL NOT NULL,
+    take_profit REAL NOT NULL,
+    risk_percentage REAL,
+    status TEXT DEFAULT 'PENDING',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    valid_until TEXT,
+    executed_at TEXT,
+    ticket TEXT,
+    rejection_reason TEXT,
+    timeframe TEXT,
+    strategy TEXT,
+    source TEXT,
+    technical_analysis TEXT,
+    fundamental_analysis TEXT,
+    additional_notes TEXT,
+    risk_analysis TEXT,
+    chart_image_path TEXT,
+    author TEXT
+)
+'''
+
+# Kolumny, po których można sortować listę pomysłów handlowych (nazwa kolumny trafia
+# do tekstu zapytania, więc dopuszczalny jest tylko ten zestaw)
+TRADE_IDEAS_SORT_COLUMNS = frozenset((
+    "created_at", "updated_at", "valid_until", "executed_at",
+    "symbol", "status", "direction", "source", "entry_price", "risk_percentage",
+))
+
+# Kolumny sortowania zadeklarowane jako NOT NULL - kursor nie musi dla nich obsługiwać NULL
+TRADE_IDEAS_NOT_NULL_SORT_COLUMNS = frozenset((
+    "created_at", "updated_at", "symbol", "direction", "entry_price",
+))
+
+# Tabela komentarzy do pomysłów handlowych (usuwanych razem z pomysłem)
+TRADE_IDEA_COMMENTS_TABLE = '''
+CREATE TABLE IF NOT EXISTS trade_idea_comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    trade_idea_id INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    author TEXT,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY (trade_idea_id) REFERENCES trade_ideas_extended (id) ON DELETE CASCADE
+)
+'''
+
+# Indeks komentarzy po pomyśle handlowym (odczyt komentarzy i usuwanie razem z pomysłem)
+TRADE_IDEA_COMMENTS_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_tic_idea ON trade_idea_comments (trade_idea_id)"
+)
+
+# Indeksy dla filtrów i sortowania listy pomysłów handlowych. SQLite dołącza
+# rowid do każdego indeksu, więc pokrywają one także porządek (created_at, id).
+TRADE_IDEAS_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ti_created ON trade_ideas_extended (created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_ti_status_created ON trade_ideas_extended (status, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_ti_symbol_created ON trade_ideas_extended (symbol, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_ti_source_created ON trade_ideas_extended (source, created_at)",
+)
+
+# Migracje schematu: (wersja, opis, skrypt SQL). Skrypty nie przyjmują parametrów
+# i wykonywane są jednym wywołaniem executescript.
+SCHEMA_MIGRATIONS = (
+    (1, "Dodawanie tabeli trade_ideas_extended", TRADE_IDEAS_EXTENDED_TABLE + ";"),
+    (2, "Dodawanie tabeli account_history", '''
+    CREATE TABLE IF NOT EXISTS account_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        balance REAL NOT NULL,
+        equity REAL NOT NULL,
+        margin REAL,
+        margin_level REAL,
+        profit_day REAL,
+        profit_week REAL,
+        profit_month REAL,
+        profit_total REAL,
+        timestamp TEXT NOT NULL,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    '''),
+    (3, "Dodawanie tabeli system_parameters", '''
+    CREATE TABLE IF NOT EXISTS system_parameters (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        description TEXT,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    INSERT OR IGNORE INTO system_parameters (key, value, description) VALUES
+        ('risk_percentage', '1.0', 'Domyślny procent ryzyka na transakcję'),
+        ('max_daily_risk', '5.0', 'Maksymalny dzienny procent ryzyka'),
+        ('max_positions', '5', 'Maksymalna liczba otwartych pozycji'),
+        ('default_timeframe', 'H1', 'Domyślny timeframe analizy'),
+        ('trading_symbols', 'EURUSD,GBPUSD,USDJPY,USDCHF,AUDUSD', 'Lista par walutowych do analizy');
+    '''),
+    (4, "Dodawanie indeksów trade_ideas_extended", ";\n".join(TRADE_IDEAS_INDEXES) + ";"),
+)
+
+# Transakcje otwarte z pomysłu dashboardu mają komentarz "LLM_TradeIdea_{id}" (id z
+# trade_ideas_extended, więc nie kolumna trade_idea_id wskazująca na trade_ideas).
+# Wyrażenie wyciąga id z komentarza i jest indeksowane zamiast wyszukiwania LIKE '%...%'.
+TRADE_IDEA_COMMENT_PREFIX = "LLM_TradeIdea_"
+SQL_COMMENT_IDEA_ID = f"CAST(substr(comment, {len(TRADE_IDEA_COMMENT_PREFIX) + 1}) AS INTEGER)"
+
+# Indeksy dla filtrów i sortowania w metodach get_* (filtr równościowy + ORDER BY ... DESC)
+QUERY_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_ma_symbol_ts ON market_analyses (symbol, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_ti_symbol_status_ts ON trade_ideas (symbol, status, timestamp DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_trades_symbol_status_entry ON trades (symbol, status, entry_time DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_logs_level_module_ts ON system_log_entries (level_id, module_id, timestamp DESC)",
+    f"CREATE INDEX IF NOT EXISTS idx_trades_comment_idea ON trades ({SQL_COMMENT_IDEA_ID}, entry_time DESC)",
+)
+
+# Agregaty dzienne transakcji liczone z tabeli trades dla jednego symbolu i dnia.
+# Ten sam SELECT służy do przebudowy całej tabeli i do odświeżania w triggerach.
+TRADE_STATS_DAILY_SELECT = '''
+SELECT symbol,
+       date(entry_time) AS date,
+       COUNT(*) AS trades,
+       SUM(pl > 0) AS wins,
+       SUM(pl < 0) AS losses,
+       SUM(pl) AS pl_sum,
+       SUM(pl * pl) AS pl_sqsum,
+       SUM(CASE WHEN pl > 0 THEN pl ELSE 0 END) AS gross_profit,
+       SUM(CASE WHEN pl < 0 THEN -pl ELSE 0 END) AS gross_loss,
+       MAX(CASE WHEN pl > 0 THEN pl END) AS max_profit,
+       MAX(CASE WHEN pl < 0 THEN -pl END) AS max_loss
+FROM (SELECT symbol, entry_time, COALESCE(profit_loss, 0) AS pl FROM trades {where})
+GROUP BY symbol, date(entry_time)
+'''
+
+
+def _trade_stats_refresh_sql(ref: str) -> str:
+    """Zwraca instrukcje triggera przeliczające dzień transakcji wskazanej przez NEW lub OLD."""
+    where = (f"WHERE symbol = {ref}.symbol "
+             f"AND entry_time >= date({ref}.entry_time) "
+             f"AND entry_time < date({ref}.entry_time, '+1 day')")
+    return (
+        f"DELETE FROM trade_stats_daily WHERE symbol = {ref}.symbol AND date = date({ref}.entry_time);\n"
+        f"INSERT INTO trade_stats_daily {TRADE_STATS_DAILY_SELECT.format(where=where)};"
+    )
+
+
+# Dekodowanie danych analiz zapisanych jako JSON
+_load_json = orjson.loads if orjson is not None else json.loads
+
+
+def _dump_json(data: Any) -> str:
+    """Serializuje dane analizy do tekstu JSON zapisywanego w kolumnie TEXT."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(data, ensure_ascii=False)
+
+
+def _synchronized(method):
+    """Serializuje wywołania metody na współdzielonym połączeniu handlera."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _encode_cursor(sort_by: str, sort_order: str, sort_value: Any, row_id: int) -> str:
+    """Koduje pozycję (wartość sortowania, id) wraz z kolumną i kierunkiem sortowania jako kursor bezpieczny dla URL."""
+    raw = json.dumps([sort_by, sort_order, sort_value, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """
+    Dekoduje kursor utworzony przez _encode_cursor.
+    
+    Raises:
+        ValueError: Gdy kursor utworzono dla innej kolumny lub kierunku sortowania
+    """
+    cursor_sort_by, cursor_order, sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    if (cursor_sort_by, cursor_order) != (sort_by, sort_order):
+        raise ValueError(f"Kursor dotyczy sortowania {cursor_sort_by} {cursor_order}, a nie {sort_by} {sort_order}")
+    return sort_value, row_id
+
+
+def _sorted_fields(data: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """
+    Zwraca kolumny i wartości w stałej kolejności, aby ten sam zestaw pól dawał
+    identyczny tekst zapytania (i trafienie w buforze przygotowanych instrukcji).
+    """
+    columns = sorted(data)
+    return columns, [data[column] for column in columns]
+
+
 class DatabaseHandler:
     """
     Klasa DatabaseHandler do zarządzania bazą danych SQLite.
@@ -29,13 +304,14 @@ class DatabaseHandler:
     - Dostęp do danych historycznych
     """
     
-    def __init__(self, db_path: str = None, auto_init: bool = True):
+    def __init__(self, db_path: str = None, auto_init: bool = True, pool_size: int = 0):
         """
         Inicjalizacja handlera bazy danych.
         
         Args:
-            db_path: Ścieżka do pliku bazy danych (domyślnie: "cache/trading_data.db")
+            db_path: Ścieżka do pliku bazy danych lub URL "sqlite:///..." (domyślnie: "cache/trading_data.db")
             auto_init: Czy automatycznie inicjalizować bazę danych
+            pool_size: Liczba bezczynnych połączeń przechowywanych do ponownego użycia (0 = bez puli)
         """
         # Ustawienie domyślnej ścieżki do bazy danych
         if db_path is None:
@@ -48,17 +324,44 @@ class DatabaseHandler:
                 os.makedirs(db_dir)
                 
             db_path = str(db_dir / "trading_data.db")
+        elif db_path.startswith("sqlite:///"):
+            db_path = db_path[len("sqlite:///"):]
         
         self.db_path = db_path
         self.conn = None
         self.cursor = None
         
+        # Połączenie pozostaje otwarte między wywołaniami i może być współdzielone
+        # przez wątki serwera, dlatego dostęp do niego jest serializowany
+        self._lock = threading.RLock()
+        
+        # Pula otwartych połączeń zwracanych przez disconnect() zamiast ich zamykania
+        self._pool = queue.LifoQueue(maxsize=pool_size) if pool_size > 0 else None
+        
+        # Bufor liczników rekordów: (tabela, warunki, parametry) -> (czas wygaśnięcia, liczba)
+        self._count_cache = {}
+        
+        # Identyfikatory poziomów i modułów logów: (tabela słownika, nazwa) -> id
+        self._lookup_ids = {}
+        
+        # Kolumny tabel (nazwa tabeli -> zbiór kolumn), czyszczone przy zmianach schematu
+        self._column_cache = {}
+        
+        # Flaga trybu bulk_writes() - pojedyncze zapisy pomijają własny commit
+        self._in_bulk = False
+        
+        # Kolejka analiz zapisywanych przez wątek w tle (submit_market_analysis)
+        self._write_queue = queue.Queue()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        
         logger.info(f"Inicjalizacja DatabaseHandler z bazą danych: {self.db_path}")
         
         # Automatyczna inicjalizacja bazy danych
         if auto_init:
             self.init_database()
     
+    @_synchronized
     def connect(self) -> bool:
         """
         Nawiązanie połączenia z bazą danych.
@@ -71,24 +374,85 @@ class DatabaseHandler:
             return True
             
         try:
-            self.conn = sqlite3.connect(self.db_path)
-            # Włączenie obsługi klucza obcego
-            self.conn.execute("PRAGMA foreign_keys = ON")
-            # Ustawienie zwracania wyników w formie słowników
-            self.conn.row_factory = sqlite3.Row
+            try:
+                self.conn = self._pool.get_nowait() if self._pool is not None else self._open_connection()
+            except queue.Empty:
+                self.conn = self._open_connection()
             self.cursor = self.conn.cursor()
             return True
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas łączenia z bazą danych: {e}")
             return False
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Otwiera i konfiguruje nowe połączenie z bazą danych."""
+        # Połączenie może być używane przez różne wątki serwera (dostęp chroni self._lock)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=CACHED_STATEMENTS)
+        conn.executescript(CONNECTION_PRAGMAS)
+        # Ustawienie zwracania wyników w formie słowników
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    @_synchronized
     def disconnect(self):
-        """Zakończenie połączenia z bazą danych."""
+        """Zakończenie połączenia z bazą danych (lub zwrócenie go do puli)."""
         if self.conn:
-            self.conn.close()
+            if self._pool is None:
+                self.conn.close()
+            else:
+                # Niezatwierdzone zmiany nie mogą trafić do kolejnego użytkownika połączenia
+                self.conn.rollback()
+                try:
+                    self._pool.put_nowait(self.conn)
+                except queue.Full:
+                    self.conn.close()
             self.conn = None
             self.cursor = None
     
+    def close(self):
+        """Zamyka połączenie z bazą danych oraz wszystkie połączenia w puli."""
+        # Analizy oczekujące w kolejce zapisywane są przed zamknięciem połączenia
+        self._stop_writer()
+        
+        with self._lock:
+            if self.conn:
+                self.conn.close()
+                self.conn = None
+                self.cursor = None
+            
+            while self._pool is not None:
+                try:
+                    self._pool.get_nowait().close()
+                except queue.Empty:
+                    break
+    
+    def warm(self, n: int) -> int:
+        """
+        Otwiera z wyprzedzeniem połączenia do puli, aby pierwsze żądania nie czekały na ich nawiązanie.
+        
+        Args:
+            n: Liczba połączeń do przygotowania (ograniczona rozmiarem puli)
+            
+        Returns:
+            Liczba połączeń dodanych do puli
+        """
+        if self._pool is None:
+            return 0
+        
+        warmed = 0
+        while warmed < n and not self._pool.full():
+            try:
+                conn = self._open_connection()
+                conn.execute("SELECT 1").fetchone()
+                self._pool.put_nowait(conn)
+                warmed += 1
+            except (sqlite3.Error, queue.Full) as e:
+                logger.error(f"Błąd podczas przygotowywania połączenia z bazą danych: {e}")
+                break
+        return warmed
+    
+    @_synchronized
     def update_schema(self) -> bool:
         """
         Aktualizacja schematu bazy danych.
@@ -104,120 +468,30 @@ class DatabaseHandler:
             return False
             
         try:
-            # Odczytanie obecnej wersji bazy danych (tabela może nie istnieć przy pierwszym uruchomieniu)
-            try:
-                self.cursor.execute("SELECT version FROM schema_version")
-                current_version = self.cursor.fetchone()[0]
-            except sqlite3.OperationalError:
-                # Tabela nie istnieje, utwórz ją i ustaw wersję na 0
-                self.cursor.execute('''
-                CREATE TABLE schema_version (
-                    version INTEGER PRIMARY KEY,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-                ''')
-                self.cursor.execute("INSERT INTO schema_version (version) VALUES (0)")
-                current_version = 0
-                self.conn.commit()
+            # Wersja schematu przechowywana jest w nagłówku pliku bazy danych
+            self.cursor.execute("PRAGMA user_version")
+            current_version = self.cursor.fetchone()[0]
+            if current_version == 0:
+                # Bazy utworzone przed przejściem na user_version przechowują wersję w tabeli
+                current_version = self._legacy_schema_version()
+                if current_version:
+                    self.cursor.execute(f"PRAGMA user_version = {current_version}")
                 
             logger.info(f"Obecna wersja schematu bazy danych: {current_version}")
             
-            # Sekcje migracji - każda sekcja zwiększa wersję o 1
-            # Migracje są wykonywane tylko jeśli obecna wersja jest niższa niż numer migracji
-            
-            # Migracja #1: Dodanie tabeli trade_ideas_extended (jeśli jeszcze nie istnieje)
-            if current_version < 1:
-                logger.info("Wykonywanie migracji #1: Dodawanie tabeli trade_ideas_extended")
-                
-                self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trade_ideas_extended (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT NOT NULL,
-                    direction TEXT NOT NULL,
-                    entry_price REAL NOT NULL,
-                    stop_loss REAL NOT NULL,
-                    take_profit REAL NOT NULL,
-                    risk_percentage REAL,
-                    status TEXT DEFAULT 'PENDING',
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    valid_until TEXT,
-                    executed_at TEXT,
-                    ticket TEXT,
-                    rejection_reason TEXT,
-                    timeframe TEXT,
-                    strategy TEXT,
-                    source TEXT,
-                    technical_analysis TEXT,
-                    fundamental_analysis TEXT,
-                    additional_notes TEXT,
-                    risk_analysis TEXT,
-                    chart_image_path TEXT,
-                    author TEXT
-                )
-                ''')
-                
-                # Aktualizacja wersji
-                self.cursor.execute("UPDATE schema_version SET version = 1, updated_at = CURRENT_TIMESTAMP")
-                logger.info("Migracja #1 zakończona pomyślnie")
-                current_version = 1
+            # Migracje wykonywane są tylko jeśli obecna wersja jest niższa niż numer migracji.
+            # Każda migracja wraz z podniesieniem wersji jest jednym skryptem w jednej transakcji.
+            for version, description, script in SCHEMA_MIGRATIONS:
+                if current_version >= version:
+                    continue
                 
-            # Migracja #2: Dodanie tabeli account_history
-            if current_version < 2:
-                logger.info("Wykonywanie migracji #2: Dodawanie tabeli account_history")
-                
-                self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS account_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    balance REAL NOT NULL,
-                    equity REAL NOT NULL,
-                    margin REAL,
-                    margin_level REAL,
-                    profit_day REAL,
-                    profit_week REAL,
-                    profit_month REAL,
-                    profit_total REAL,
-                    timestamp TEXT NOT NULL,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                logger.info(f"Wykonywanie migracji #{version}: {description}")
+                self.cursor.executescript(
+                    f"BEGIN;\n{script}\nPRAGMA user_version = {version};\nCOMMIT;"
                 )
-                ''')
-                
-                # Aktualizacja wersji
-                self.cursor.execute("UPDATE schema_version SET version = 2, updated_at = CURRENT_TIMESTAMP")
-                logger.info("Migracja #2 zakończona pomyślnie")
-                current_version = 2
-                
-            # Migracja #3: Dodanie tabeli system_parameters
-            if current_version < 3:
-                logger.info("Wykonywanie migracji #3: Dodawanie tabeli system_parameters")
-                
-                self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS system_parameters (
-                    key TEXT PRIMARY KEY,
-                    value TEXT NOT NULL,
-                    description TEXT,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-                ''')
-                
-                # Wstawienie domyślnych parametrów
-                default_params = [
-                    ('risk_percentage', '1.0', 'Domyślny procent ryzyka na transakcję'),
-                    ('max_daily_risk', '5.0', 'Maksymalny dzienny procent ryzyka'),
-                    ('max_positions', '5', 'Maksymalna liczba otwartych pozycji'),
-                    ('default_timeframe', 'H1', 'Domyślny timeframe analizy'),
-                    ('trading_symbols', 'EURUSD,GBPUSD,USDJPY,USDCHF,AUDUSD', 'Lista par walutowych do analizy')
-                ]
-                
-                for param in default_params:
-                    self.cursor.execute('''
-                    INSERT OR IGNORE INTO system_parameters (key, value, description)
-                    VALUES (?, ?, ?)
-                    ''', param)
-                
-                # Aktualizacja wersji
-                self.cursor.execute("UPDATE schema_version SET version = 3, updated_at = CURRENT_TIMESTAMP")
-                logger.info("Migracja #3 zakończona pomyślnie")
+                logger.info(f"Migracja #{version} zakończona pomyślnie")
+                current_version = version
+                self._column_cache.clear()
                 
             # Zapisz zmiany
             self.conn.commit()
@@ -228,9 +502,22 @@ class DatabaseHandler:
             logger.error(f"Błąd podczas aktualizacji schematu bazy danych: {e}")
             self.conn.rollback()
             return False
-        finally:
-            self.disconnect()
     
+    def _legacy_schema_version(self) -> int:
+        """
+        Zwraca wersję schematu zapisaną w tabeli schema_version przez wcześniejsze wersje systemu.
+        
+        Returns:
+            int: Wersja schematu lub 0, jeśli tabela nie istnieje
+        """
+        try:
+            self.cursor.execute("SELECT version FROM schema_version")
+        except sqlite3.OperationalError:
+            return 0
+        row = self.cursor.fetchone()
+        return row[0] if row else 0
+    
+    @_synchronized
     def init_database(self) -> bool:
         """
         Inicjalizacja struktury bazy danych.
@@ -249,7 +536,7 @@ class DatabaseHandler:
                 symbol TEXT NOT NULL,
                 timeframe TEXT NOT NULL,
                 timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                analysis_data TEXT NOT NULL,
+                analysis_data TEXT NOT NULL CHECK (json_valid(analysis_data)),
                 created_at TEXT DEFAULT CURRENT_TIMESTAMP
             )
             ''')
@@ -294,17 +581,45 @@ class DatabaseHandler:
             )
             ''')
             
-            # Tabela z logami systemu
+            # Indeks dla filtrowania transakcji po zakresie dat
             self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS system_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                level TEXT NOT NULL,
-                module TEXT NOT NULL,
-                message TEXT NOT NULL,
-                timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            CREATE INDEX IF NOT EXISTS idx_trades_entry_time ON trades (entry_time)
+            ''')
+            
+            # Dzienne agregaty transakcji w podziale na symbole utrzymywane przez triggery
+            self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS trade_stats_daily (
+                symbol TEXT NOT NULL,
+                date TEXT NOT NULL,
+                trades INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                losses INTEGER NOT NULL,
+                pl_sum REAL NOT NULL,
+                pl_sqsum REAL NOT NULL,
+                gross_profit REAL NOT NULL,
+                gross_loss REAL NOT NULL,
+                max_profit REAL,
+                max_loss REAL,
+                PRIMARY KEY (symbol, date)
             )
             ''')
+            self._create_trade_stats_triggers()
+            
+            self.cursor.execute("SELECT COUNT(*) FROM trade_stats_daily")
+            if self.cursor.fetchone()[0] == 0:
+                self.cursor.execute(
+                    "INSERT INTO trade_stats_daily " + TRADE_STATS_DAILY_SELECT.format(where="")
+                )
+            
+            # Tabele z logami systemu
+            self._create_system_logs()
+            
+            # Tabele pomysłów handlowych dashboardu i komentarzy do nich
+            self.cursor.execute(TRADE_IDEAS_EXTENDED_TABLE)
+            self._create_trade_idea_comments()
+            
+            for statement in QUERY_INDEXES + TRADE_IDEAS_INDEXES:
+                self.cursor.execute(statement)
             
             self.conn.commit()
             logger.info("Struktura bazy danych została zainicjalizowana")
@@ -316,7 +631,159 @@ class DatabaseHandler:
             self.disconnect()
             return False
     
-    def insert_market_analysis(self, symbol: str, timeframe: str, analysis_data: Dict[str, Any]) -> int:
+    def _create_system_logs(self):
+        """
+        Tworzy tabele logów systemowych i widok system_logs.
+        
+        Logi z bazy utworzonej przed wprowadzeniem słowników (system_logs jako
+        tabela z tekstowymi kolumnami level i module) są przenoszone do nowych tabel.
+        """
+        self.cursor.execute("SELECT type FROM sqlite_master WHERE name = 'system_logs'")
+        row = self.cursor.fetchone()
+        legacy = row is not None and row[0] == 'table'
+        if legacy:
+            self.cursor.execute("ALTER TABLE system_logs RENAME TO system_logs_legacy")
+        
+        for statement in SYSTEM_LOGS_SCHEMA:
+            self.cursor.execute(statement)
+        
+        if legacy:
+            self.cursor.execute("INSERT OR IGNORE INTO log_levels (name) SELECT DISTINCT level FROM system_logs_legacy")
+            self.cursor.execute("INSERT OR IGNORE INTO log_modules (name) SELECT DISTINCT module FROM system_logs_legacy")
+            self.cursor.execute('''
+            INSERT INTO system_log_entries (id, level_id, module_id, message, timestamp, created_at)
+            SELECT s.id, l.id, m.id, s.message, s.timestamp, s.created_at
+            FROM system_logs_legacy s
+            JOIN log_levels l ON l.name = s.level
+            JOIN log_modules m ON m.name = s.module
+            ''')
+            self.cursor.execute("DROP TABLE system_logs_legacy")
+            logger.info("Przeniesiono logi systemowe do tabel ze słownikami poziomów i modułów")
+    
+    def _create_trade_idea_comments(self):
+        """
+        Tworzy tabelę komentarzy do pomysłów handlowych wraz z indeksem.
+        
+        Tabela z bazy utworzonej przed dodaniem ON DELETE CASCADE jest przebudowywana,
+        aby usunięcie pomysłu usuwało również jego komentarze.
+        """
+        self.cursor.execute("PRAGMA foreign_key_list(trade_idea_comments)")
+        legacy = any(row["on_delete"] != "CASCADE" for row in self.cursor.fetchall())
+        if legacy:
+            self.cursor.execute("ALTER TABLE trade_idea_comments RENAME TO trade_idea_comments_legacy")
+        
+        self.cursor.execute(TRADE_IDEA_COMMENTS_TABLE)
+        
+        if legacy:
+            # Komentarze usuniętych wcześniej pomysłów nie mają już rodzica i są pomijane
+            self.cursor.execute('''
+            INSERT INTO trade_idea_comments (id, trade_idea_id, content, author, created_at)
+            SELECT id, trade_idea_id, content, author, created_at
+            FROM trade_idea_comments_legacy
+            WHERE trade_idea_id IN (SELECT id FROM trade_ideas_extended)
+            ''')
+            self.cursor.execute("DROP TABLE trade_idea_comments_legacy")
+            self._column_cache.pop("trade_idea_comments", None)
+            logger.info("Przebudowano tabelę trade_idea_comments z ON DELETE CASCADE")
+        
+        self.cursor.execute(TRADE_IDEA_COMMENTS_INDEX)
+    
+    def _table_columns(self, table: str) -> frozenset:
+        """
+        Zwraca zbiór kolumn tabeli, odczytując PRAGMA table_info tylko przy pierwszym użyciu.
+        
+        Args:
+            table: Nazwa tabeli
+            
+        Returns:
+            Zbiór nazw kolumn
+        """
+        columns = self._column_cache.get(table)
+        if columns is None:
+            self.cursor.execute(f"PRAGMA table_info({table})")
+            columns = frozenset(column[1] for column in self.cursor.fetchall())
+            # Pusty wynik oznacza brak tabeli - nie jest buforowany
+            if columns:
+                self._column_cache[table] = columns
+        return columns
+    
+    def _lookup_id(self, table: str, name: str) -> int:
+        """
+        Zwraca identyfikator nazwy ze słownika (log_levels lub log_modules), dodając ją w razie potrzeby.
+        
+        Args:
+            table: Nazwa tabeli słownika
+            name: Nazwa poziomu lub modułu
+            
+        Returns:
+            Identyfikator nazwy
+        """
+        key = (table, name)
+        lookup_id = self._lookup_ids.get(key)
+        if lookup_id is None:
+            self.cursor.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            self.cursor.execute(f"SELECT id FROM {table} WHERE name = ?", (name,))
+            lookup_id = self._lookup_ids[key] = self.cursor.fetchone()[0]
+        return lookup_id
+    
+    def _create_trade_stats_triggers(self):
+        """Tworzy triggery odświeżające trade_stats_daily po zmianach w tabeli trades."""
+        self.cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_trades_stats_insert AFTER INSERT ON trades
+        BEGIN
+            {_trade_stats_refresh_sql("NEW")}
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_trades_stats_update AFTER UPDATE ON trades
+        BEGIN
+            {_trade_stats_refresh_sql("OLD")}
+            {_trade_stats_refresh_sql("NEW")}
+        END;
+        
+        CREATE TRIGGER IF NOT EXISTS trg_trades_stats_delete AFTER DELETE ON trades
+        BEGIN
+            {_trade_stats_refresh_sql("OLD")}
+        END;
+        ''')
+    
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        Kontekst transakcji obejmującej wiele zapisów zatwierdzanych jednym commitem.
+        
+        Metody insert_* wywoływane wewnątrz kontekstu powinny otrzymać commit=False.
+        Wyjątek zgłoszony w kontekście wycofuje wszystkie zapisy.
+        """
+        with self._lock:
+            if not self.connect():
+                raise sqlite3.OperationalError("Brak połączenia z bazą danych")
+            
+            self.cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield self
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+    
+    @contextlib.contextmanager
+    def bulk_writes(self):
+        """
+        Kontekst zapisu wielu transakcji lub komentarzy jednym commitem.
+        
+        mock_add_trade i add_trade_idea_comment wywołane wewnątrz kontekstu
+        pomijają własny commit, a błąd dowolnego zapisu wycofuje całą partię.
+        """
+        with self.transaction():
+            self._in_bulk = True
+            try:
+                yield self
+            finally:
+                self._in_bulk = False
+    
+    @_synchronized
+    def insert_market_analysis(self, symbol: str, timeframe: str, analysis_data: Dict[str, Any],
+                               commit: bool = True) -> int:
         """
         Zapisanie analizy rynkowej do bazy danych.
         
@@ -324,6 +791,7 @@ class DatabaseHandler:
             symbol: Symbol instrumentu
             timeframe: Timeframe analizy
             analysis_data: Słownik z danymi analizy
+            commit: Czy zatwierdzić zapis (False wewnątrz transaction())
             
         Returns:
             ID zapisanego rekordu lub -1 w przypadku błędu
@@ -338,28 +806,101 @@ class DatabaseHandler:
             
         try:
             # Konwersja danych analizy do formatu JSON
-            analysis_json = json.dumps(analysis_data, ensure_ascii=False)
+            analysis_json = _dump_json(analysis_data)
             
             # Wstawienie rekordu
-            self.cursor.execute('''
-            INSERT INTO market_analyses (symbol, timeframe, analysis_data)
-            VALUES (?, ?, ?)
-            ''', (symbol, timeframe, analysis_json))
+            self.cursor.execute(INSERT_MARKET_ANALYSIS_SQL, (symbol, timeframe, analysis_json))
             
-            self.conn.commit()
             record_id = self.cursor.lastrowid
+            if commit:
+                self.conn.commit()
             
             logger.info(f"Zapisano analizę rynkową dla {symbol} ({timeframe}), ID: {record_id}")
             return record_id
             
         except sqlite3.Error as e:
+            if not commit:
+                # Wycofanie całej transakcji należy do transaction()
+                raise
             logger.error(f"Błąd podczas zapisywania analizy rynkowej: {e}")
             self.conn.rollback()
             return -1
 
+    def submit_market_analysis(self, symbol: str, timeframe: str, analysis_data: Dict[str, Any]) -> Future:
+        """
+        Zleca zapisanie analizy rynkowej wątkowi zapisującemu w tle.
+        
+        Serializacja danych i zatwierdzenie transakcji odbywają się poza wątkiem
+        wywołującym, a analizy zgłoszone w krótkim odstępie czasu zapisywane są
+        w jednej transakcji.
+        
+        Args:
+            symbol: Symbol instrumentu
+            timeframe: Timeframe analizy
+            analysis_data: Słownik z danymi analizy
+            
+        Returns:
+            Future z ID zapisanego rekordu lub -1 w przypadku błędu
+        """
+        if not isinstance(symbol, str):
+            raise TypeError("Symbol musi być typu string")
+        if not isinstance(timeframe, str):
+            raise TypeError("Timeframe musi być typu string")
+        if not isinstance(analysis_data, dict):
+            raise TypeError("Analysis data musi być słownikiem")
+        
+        future = Future()
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="DatabaseWriter", daemon=True)
+                self._writer.start()
+            self._write_queue.put((symbol, timeframe, analysis_data, future))
+        return future
+    
+    def _write_loop(self):
+        """Pętla wątku zapisującego analizy z kolejki partiami (None kończy pracę)."""
+        while True:
+            batch = [self._write_queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            items = [item for item in batch if item is not None]
+            if items:
+                self._write_batch(items)
+            if len(items) < len(batch):
+                return
+    
+    def _write_batch(self, items: List[Tuple[str, str, Dict[str, Any], Future]]):
+        """Zapisuje partię analiz z kolejki w jednej transakcji i ustawia wyniki ich Future."""
+        try:
+            with self.transaction():
+                record_ids = [
+                    self.insert_market_analysis(symbol, timeframe, analysis_data, commit=False)
+                    for symbol, timeframe, analysis_data, _ in items
+                ]
+        except sqlite3.Error as e:
+            logger.error(f"Błąd podczas zapisywania analiz rynkowych w tle: {e}")
+            record_ids = [-1] * len(items)
+        
+        for (*_, future), record_id in zip(items, record_ids):
+            future.set_result(record_id)
+    
+    def _stop_writer(self):
+        """Zapisuje analizy oczekujące w kolejce i zatrzymuje wątek zapisujący."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._write_queue.put(None)
+        if writer is not None:
+            writer.join()
+    
+    @_synchronized
     def insert_trade_idea(self, analysis_id: int, symbol: str, direction: str,
                       entry_price: float, stop_loss: float, take_profit: float,
-                      risk_reward: float) -> int:
+                      risk_reward: float, commit: bool = True) -> int:
         """
         Zapisanie idei handlowej do bazy danych.
         
@@ -371,31 +912,36 @@ class DatabaseHandler:
             stop_loss: Poziom stop loss
             take_profit: Poziom take profit
             risk_reward: Stosunek zysku do ryzyka
+            commit: Czy zatwierdzić zapis (False wewnątrz transaction())
             
         Returns:
             ID zapisanego rekordu lub -1 w przypadku błędu
         """
         try:
             # Wstawienie rekordu
-            self.cursor.execute('''
-            INSERT INTO trade_ideas (analysis_id, symbol, direction, entry_price, stop_loss, take_profit, risk_reward)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (analysis_id, symbol, direction, entry_price, stop_loss, take_profit, risk_reward))
+            self.cursor.execute(INSERT_TRADE_IDEA_SQL,
+                                (analysis_id, symbol, direction, entry_price, stop_loss, take_profit, risk_reward))
             
-            self.conn.commit()
             record_id = self.cursor.lastrowid
+            if commit:
+                self.conn.commit()
             
             logger.info(f"Zapisano ideę handlową dla {symbol} ({direction}), ID: {record_id}")
             return record_id
             
         except sqlite3.Error as e:
+            if not commit:
+                # Wycofanie całej transakcji należy do transaction()
+                raise
             logger.error(f"Błąd podczas zapisywania idei handlowej: {e}")
             self.conn.rollback()
             return -1
 
+    @_synchronized
     def insert_trade(self, trade_idea_id: int, symbol: str, direction: str, 
                  entry_price: float, entry_time: str, stop_loss: float,
-                 take_profit: float, volume: float, comment: str = None) -> int:
+                 take_profit: float, volume: float, comment: str = None,
+                 commit: bool = True) -> int:
         """
         Zapisanie transakcji do bazy danych.
         
@@ -409,6 +955,7 @@ class DatabaseHandler:
             take_profit: Poziom take profit
             volume: Wielkość pozycji
             comment: Komentarz do transakcji
+            commit: Czy zatwierdzić zapis (False wewnątrz transaction())
             
         Returns:
             ID zapisanego rekordu lub -1 w przypadku błędu
@@ -418,22 +965,26 @@ class DatabaseHandler:
         
         try:
             # Wstawienie rekordu
-            self.cursor.execute('''
-            INSERT INTO trades (trade_idea_id, symbol, direction, entry_price, entry_time, stop_loss, take_profit, volume, status, comment)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (trade_idea_id, symbol, direction, entry_price, entry_time, stop_loss, take_profit, volume, 'open', comment))
+            self.cursor.execute(INSERT_TRADE_SQL,
+                                (trade_idea_id, symbol, direction, entry_price, entry_time,
+                                 stop_loss, take_profit, volume, 'open', comment))
             
-            self.conn.commit()
             record_id = self.cursor.lastrowid
+            if commit:
+                self.conn.commit()
             
             logger.info(f"Zapisano transakcję dla {symbol} ({direction}), ID: {record_id}")
             return record_id
             
         except sqlite3.Error as e:
+            if not commit:
+                # Wycofanie całej transakcji należy do transaction()
+                raise
             logger.error(f"Błąd podczas zapisywania transakcji: {e}")
             self.conn.rollback()
             return -1
 
+    @_synchronized
     def insert_log(self, level: str, module: str, message: str) -> int:
         """
         Zapisanie logu do bazy danych.
@@ -448,10 +999,8 @@ class DatabaseHandler:
         """
         try:
             # Wstawienie rekordu
-            self.cursor.execute('''
-            INSERT INTO system_logs (level, module, message)
-            VALUES (?, ?, ?)
-            ''', (level, module, message))
+            self.cursor.execute(INSERT_LOG_SQL, (self._lookup_id("log_levels", level),
+                                                 self._lookup_id("log_modules", module), message))
             
             self.conn.commit()
             record_id = self.cursor.lastrowid
@@ -462,8 +1011,73 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas zapisywania logu: {e}")
             self.conn.rollback()
+            # Wycofane mogły zostać także nowe wpisy słowników
+            self._lookup_ids.clear()
             return -1
     
+    @_synchronized
+    def insert_logs_batch(self, rows: List[Tuple[str, str, str]]) -> int:
+        """
+        Zapisanie wielu logów w jednej transakcji.
+        
+        Args:
+            rows: Lista krotek (poziom, moduł, treść)
+            
+        Returns:
+            Liczba zapisanych rekordów lub -1 w przypadku błędu
+        """
+        if not rows:
+            return 0
+        if not self.connect():
+            return -1
+        
+        try:
+            self.cursor.executemany(INSERT_LOG_SQL, [
+                (self._lookup_id("log_levels", level), self._lookup_id("log_modules", module), message)
+                for level, module, message in rows
+            ])
+            self.conn.commit()
+            return len(rows)
+            
+        except sqlite3.Error as e:
+            logger.error(f"Błąd podczas zapisywania partii logów: {e}")
+            self.conn.rollback()
+            # Wycofane mogły zostać także nowe wpisy słowników
+            self._lookup_ids.clear()
+            return -1
+    
+    @_synchronized
+    def insert_market_analyses_batch(self, rows: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+        """
+        Zapisanie wielu analiz rynkowych w jednej transakcji.
+        
+        Args:
+            rows: Lista krotek (symbol, timeframe, dane analizy)
+            
+        Returns:
+            Liczba zapisanych rekordów lub -1 w przypadku błędu
+        """
+        if not rows:
+            return 0
+        if not self.connect():
+            return -1
+        
+        try:
+            self.cursor.executemany(INSERT_MARKET_ANALYSIS_SQL, [
+                (symbol, timeframe, _dump_json(analysis_data))
+                for symbol, timeframe, analysis_data in rows
+            ])
+            self.conn.commit()
+            
+            logger.info(f"Zapisano {len(rows)} analiz rynkowych")
+            return len(rows)
+            
+        except sqlite3.Error as e:
+            logger.error(f"Błąd podczas zapisywania partii analiz rynkowych: {e}")
+            self.conn.rollback()
+            return -1
+    
+    @_synchronized
     def get_latest_analyses(self, symbol: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """
         Pobranie ostatnich analiz rynkowych.
@@ -497,22 +1111,56 @@ class DatabaseHandler:
                 LIMIT ?
                 ''', (limit,))
             
-            # Konwersja wyników do listy słowników
-            results = []
-            for row in self.cursor.fetchall():
-                data = dict(row)
-                # Konwersja JSON do słownika
-                data['analysis_data'] = json.loads(data['analysis_data'])
-                results.append(data)
-            
-            return results
+            # Konwersja wyników do listy słowników ze zdekodowanymi danymi analizy
+            return [
+                {**row, 'analysis_data': _load_json(row['analysis_data'])}
+                for row in self.cursor.fetchall()
+            ]
             
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas pobierania analiz: {e}")
             return []
-        finally:
-            self.disconnect()
     
+    @_synchronized
+    def get_latest_analysis_field(self, path: str, symbol: Optional[str] = None,
+                                  limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Pobranie jednego pola z ostatnich analiz rynkowych bez dekodowania całych danych.
+        
+        Pole wyciągane jest po stronie SQLite funkcją json_extract. Wartości skalarne
+        zwracane są bezpośrednio, obiekty i tablice jako tekst JSON.
+        
+        Args:
+            path: Ścieżka pola w danych analizy (np. "$.signal")
+            symbol: Symbol instrumentu (opcjonalnie)
+            limit: Maksymalna liczba rekordów
+            
+        Returns:
+            Lista słowników z kluczami id, symbol, timeframe, timestamp i value
+        """
+        if not self.connect():
+            return []
+        
+        try:
+            query = '''
+            SELECT id, symbol, timeframe, timestamp, json_extract(analysis_data, ?) AS value
+            FROM market_analyses
+            '''
+            params = [path]
+            if symbol:
+                query += " WHERE symbol = ?"
+                params.append(symbol)
+            query += " ORDER BY timestamp DESC LIMIT ?"
+            params.append(limit)
+            
+            self.cursor.execute(query, params)
+            return [dict(row) for row in self.cursor.fetchall()]
+            
+        except sqlite3.Error as e:
+            logger.error(f"Błąd podczas pobierania pola analiz: {e}")
+            return []
+    
+    @_synchronized
     def get_trade_ideas(self, symbol: Optional[str] = None, status: Optional[str] = None, 
                      limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -563,18 +1211,20 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas pobierania idei handlowych: {e}")
             return []
-        finally:
-            self.disconnect()
     
+    @_synchronized
     def get_trades(self, symbol: Optional[str] = None, status: Optional[str] = None, 
-               limit: int = 10) -> List[Dict[str, Any]]:
+               limit: Optional[int] = 10, start_date: Optional[str] = None,
+               end_date: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Pobranie transakcji.
         
         Args:
             symbol: Symbol instrumentu (opcjonalnie)
             status: Status transakcji (opcjonalnie)
-            limit: Maksymalna liczba rekordów
+            limit: Maksymalna liczba rekordów (None = bez limitu)
+            start_date: Początek zakresu czasu wejścia w formacie ISO (opcjonalnie)
+            end_date: Koniec zakresu czasu wejścia w formacie ISO (opcjonalnie)
             
         Returns:
             Lista słowników z danymi transakcji
@@ -597,67 +1247,127 @@ class DatabaseHandler:
             if status:
                 conditions.append("status = ?")
                 params.append(status)
+            if start_date:
+                conditions.append("entry_time >= ?")
+                params.append(start_date)
+            if end_date:
+                conditions.append("entry_time <= ?")
+                params.append(end_date)
             
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
-            query += " ORDER BY entry_time DESC LIMIT ?"
-            params.append(limit)
+            query += " ORDER BY entry_time DESC"
+            if limit is not None:
+                query += " LIMIT ?"
+                params.append(limit)
             
             self.cursor.execute(query, params)
             
-            # Konwersja wyników do listy słowników
-            results = []
-            for row in self.cursor.fetchall():
-                results.append(dict(row))
-            
-            return results
+            # Konwersja wyników (sqlite3.Row) do listy słowników
+            return [dict(row) for row in self.cursor.fetchall()]
             
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas pobierania transakcji: {e}")
             return []
-        finally:
-            self.disconnect()
     
-    def get_logs(self, level: Optional[str] = None, module: Optional[str] = None, 
-             limit: int = 100) -> List[Dict[str, Any]]:
+    @_synchronized
+    def get_performance_by_symbol(self) -> List[Dict[str, Any]]:
         """
-        Pobranie logów systemowych.
+        Pobranie liczby transakcji i łącznego wyniku w podziale na symbole.
+        
+        Returns:
+            Lista słowników z kluczami symbol, count i profit_loss
+        """
+        if not self.connect():
+            return []
+        
+        try:
+            self.cursor.execute('''
+            SELECT COALESCE(symbol, 'Unknown') AS symbol,
+                   COUNT(*) AS count,
+                   COALESCE(SUM(profit_loss), 0) AS profit_loss
+            FROM trades
+            GROUP BY symbol
+            ''')
+            
+            return [dict(row) for row in self.cursor.fetchall()]
+            
+        except sqlite3.Error as e:
+            logger.error(f"Błąd podczas pobierania wyników według symboli: {e}")
+            return []
+    
+    @_synchronized
+    def get_stats(self, start_date: Optional[str] = None,
+                  end_date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Pobranie zagregowanych statystyk transakcji z tabeli dziennych agregatów.
         
         Args:
-            level: Poziom logu (opcjonalnie)
-            module: Nazwa modułu (opcjonalnie)
-            limit: Maksymalna liczba rekordów
+            start_date: Pierwszy dzień zakresu w formacie YYYY-MM-DD (opcjonalnie)
+            end_date: Ostatni dzień zakresu w formacie YYYY-MM-DD (opcjonalnie)
             
         Returns:
-            Lista słowników z danymi logów
+            Słownik z kluczami total_trades, winning_trades, losing_trades,
+            total_profit, total_loss, largest_profit i largest_loss
         """
+        empty = {
+            'total_trades': 0, 'winning_trades': 0, 'losing_trades': 0,
+            'total_profit': 0.0, 'total_loss': 0.0,
+            'largest_profit': 0.0, 'largest_loss': 0.0
+        }
         if not self.connect():
-            return []
+            return empty
         
         try:
             query = '''
-            SELECT id, level, module, message, timestamp, created_at
-            FROM system_logs
+            SELECT COALESCE(SUM(trades), 0) AS total_trades,
+                   COALESCE(SUM(wins), 0) AS winning_trades,
+                   COALESCE(SUM(losses), 0) AS losing_trades,
+                   COALESCE(SUM(gross_profit), 0) AS total_profit,
+                   COALESCE(SUM(gross_loss), 0) AS total_loss,
+                   COALESCE(MAX(max_profit), 0) AS largest_profit,
+                   COALESCE(MAX(max_loss), 0) AS largest_loss
+            FROM trade_stats_daily
             '''
             params = []
-            
-            # Dodanie filtrów
             conditions = []
-            if level:
-                conditions.append("level = ?")
-                params.append(level)
-            if module:
-                conditions.append("module = ?")
-                params.append(module)
+            if start_date:
+                conditions.append("date >= ?")
+                params.append(start_date)
+            if end_date:
+                conditions.append("date <= ?")
+                params.append(end_date)
             
             if conditions:
                 query += " WHERE " + " AND ".join(conditions)
             
-            query += " ORDER BY timestamp DESC LIMIT ?"
-            params.append(limit)
-            
             self.cursor.execute(query, params)
+            return dict(self.cursor.fetchone())
+            
+        except sqlite3.Error as e:
+            logger.error(f"Błąd podczas pobierania statystyk transakcji: {e}")
+            return empty
+    
+    @_synchronized
+    def get_logs(self, level: Optional[str] = None, module: Optional[str] = None, 
+             limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Pobranie logów systemowych.
+        
+        Args:
+            level: Poziom logu (opcjonalnie)
+            module: Nazwa modułu (opcjonalnie)
+            limit: Maksymalna liczba rekordów
+            
+        Returns:
+            Lista słowników z danymi logów
+        """
+        if not self.connect():
+            return []
+        
+        try:
+            self.cursor.execute(*self._logs_query(level, module, limit))
             
             # Konwersja wyników do listy słowników
             results = []
@@ -669,9 +1379,70 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas pobierania logów: {e}")
             return []
+    
+    def iter_logs(self, level: Optional[str] = None, module: Optional[str] = None,
+                  limit: Optional[int] = None):
+        """
+        Strumieniowe pobieranie logów systemowych (np. do eksportu dużej liczby wpisów).
+        
+        Wiersze pobierane są porcjami po LOG_FETCH_SIZE, więc zużycie pamięci nie zależy
+        od liczby logów. Blokada połączenia zajmowana jest tylko na czas pobrania porcji.
+        
+        Args:
+            level: Poziom logu (opcjonalnie)
+            module: Nazwa modułu (opcjonalnie)
+            limit: Maksymalna liczba rekordów (None = wszystkie)
+            
+        Yields:
+            Słowniki z danymi logów, od najnowszego
+        """
+        with self._lock:
+            if not self.connect():
+                return
+            cursor = self.conn.cursor()
+            cursor.arraysize = LOG_FETCH_SIZE
+            cursor.execute(*self._logs_query(level, module, limit))
+        
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany()
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
         finally:
-            self.disconnect()
+            cursor.close()
+    
+    @staticmethod
+    def _logs_query(level: Optional[str], module: Optional[str],
+                    limit: Optional[int]) -> Tuple[str, List[Any]]:
+        """Buduje zapytanie o logi systemowe wraz z parametrami."""
+        query = '''
+        SELECT id, level, module, message, timestamp, created_at
+        FROM system_logs
+        '''
+        params = []
+        
+        # Dodanie filtrów
+        conditions = []
+        if level:
+            conditions.append("level = ?")
+            params.append(level)
+        if module:
+            conditions.append("module = ?")
+            params.append(module)
+        
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        
+        query += " ORDER BY timestamp DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return query, params
     
+    @_synchronized
     def get_statistics(self) -> Dict[str, Any]:
         """
         Pobranie statystyk z bazy danych.
@@ -683,19 +1454,11 @@ class DatabaseHandler:
             return {}
         
         try:
-            stats = {}
-            
-            # Liczba analiz
-            self.cursor.execute("SELECT COUNT(*) as count FROM market_analyses")
-            stats['analyses_count'] = self.cursor.fetchone()['count']
-            
-            # Liczba idei handlowych
-            self.cursor.execute("SELECT COUNT(*) as count FROM trade_ideas")
-            stats['trade_ideas_count'] = self.cursor.fetchone()['count']
-            
-            # Statystyki transakcji
+            # Liczby analiz i idei handlowych oraz statystyki transakcji w jednym zapytaniu
             self.cursor.execute('''
             SELECT 
+                (SELECT COUNT(*) FROM market_analyses) as analyses_count,
+                (SELECT COUNT(*) FROM trade_ideas) as trade_ideas_count,
                 COUNT(*) as total_trades,
                 SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END) as open_trades,
                 SUM(CASE WHEN status != 'open' THEN 1 ELSE 0 END) as closed_trades,
@@ -705,8 +1468,7 @@ class DatabaseHandler:
             FROM trades
             ''')
             
-            trade_stats = dict(self.cursor.fetchone())
-            stats.update(trade_stats)
+            stats = dict(self.cursor.fetchone())
             
             # Statystyki per symbol
             self.cursor.execute('''
@@ -730,9 +1492,8 @@ class DatabaseHandler:
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas pobierania statystyk: {e}")
             return {}
-        finally:
-            self.disconnect()
     
+    @_synchronized
     def clear_database(self) -> bool:
         """
         Czyści zawartość bazy danych (używać tylko w środowisku testowym!).
@@ -744,22 +1505,40 @@ class DatabaseHandler:
             return False
         
         try:
-            # Usunięcie danych z tabel
-            tables = ['trades', 'trade_ideas', 'market_analyses', 'system_logs']
-            for table in tables:
-                self.cursor.execute(f"DELETE FROM {table}")
-            
+            # Usunięcie tabel zamiast DELETE wiersz po wierszu - triggery agregatów
+            # na trades przeliczałyby trade_stats_daily dla każdego usuwanego wiersza.
+            # Klucze obce można wyłączyć tylko poza transakcją.
             self.conn.commit()
-            logger.warning("Zawartość bazy danych została wyczyszczona")
-            return True
-            
+            self.cursor.execute("PRAGMA foreign_keys = OFF")
+            self.cursor.execute("BEGIN IMMEDIATE")
+            self.cursor.execute("DROP VIEW IF EXISTS system_logs")
+            for table in ('trades', 'trade_stats_daily', 'trade_ideas', 'market_analyses',
+                          'system_log_entries', 'log_levels', 'log_modules'):
+                self.cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.commit()
+            self._lookup_ids.clear()
+            self._column_cache.clear()
         except sqlite3.Error as e:
             logger.error(f"Błąd podczas czyszczenia bazy danych: {e}")
             self.conn.rollback()
             return False
         finally:
-            self.disconnect()
+            self.cursor.execute("PRAGMA foreign_keys = ON")
+        
+        # Odtworzenie pustych tabel wraz z indeksami i triggerami
+        if not self.init_database():
+            return False
+        
+        try:
+            # Zwolnienie stron zajmowanych przez usunięte dane
+            self.cursor.execute("VACUUM")
+        except sqlite3.Error as e:
+            logger.warning(f"Nie udało się odzyskać miejsca w bazie danych: {e}")
+        
+        logger.warning("Zawartość bazy danych została wyczyszczona")
+        return True
     
+    @_synchronized
     def add_trade_idea(self, trade_idea_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Dodaje nowy pomysł handlowy do bazy danych.
@@ -771,66 +1550,30 @@ class DatabaseHandler:
             Dict[str, Any]: Wynik operacji z ID nowego pomysłu lub błędem
         """
         try:
-            # Sprawdź czy tabela istnieje, jeśli nie - utwórz
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trade_ideas_extended (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    symbol TEXT NOT NULL,
-                    direction TEXT NOT NULL,
-                    entry_price REAL NOT NULL,
-                    stop_loss REAL NOT NULL,
-                    take_profit REAL NOT NULL,
-                    risk_percentage REAL,
-                    status TEXT DEFAULT 'PENDING',
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL,
-                    valid_until TEXT,
-                    executed_at TEXT,
-                    ticket TEXT,
-                    rejection_reason TEXT,
-                    timeframe TEXT,
-                    strategy TEXT,
-                    source TEXT,
-                    technical_analysis TEXT,
-                    fundamental_analysis TEXT,
-                    additional_notes TEXT,
-                    risk_analysis TEXT,
-                    chart_image_path TEXT,
-                    author TEXT
-                )
-            ''')
-            
-            # Dodaj pole created_at i updated_at jeśli nie ma
-            now = datetime.datetime.now().isoformat()
-            if "created_at" not in trade_idea_data:
-                trade_idea_data["created_at"] = now
-            if "updated_at" not in trade_idea_data:
-                trade_idea_data["updated_at"] = now
             if "status" not in trade_idea_data:
                 trade_idea_data["status"] = "PENDING"
                 
-            # Odrzuć pola, które nie istnieją w tabeli
-            self.cursor.execute("PRAGMA table_info(trade_ideas_extended)")
-            table_columns = [column[1] for column in self.cursor.fetchall()]
-            
-            # Przygotuj dane do wstawienia
-            filtered_data = {k: v for k, v in trade_idea_data.items() if k in table_columns}
+            # Kolumny tabeli w stałej kolejności - pola spoza tabeli są pomijane
+            columns = sorted(self._table_columns("trade_ideas_extended").intersection(trade_idea_data))
+            values = [trade_idea_data[column] for column in columns]
+            placeholders = ["?"] * len(columns)
             
-            # Przygotuj zapytanie SQL
-            columns = ", ".join(filtered_data.keys())
-            placeholders = ", ".join(["?" for _ in filtered_data.keys()])
-            values = tuple(filtered_data.values())
+            # Brakujące znaczniki czasu wylicza SQLite podczas wstawiania rekordu
+            for column in ("created_at", "updated_at"):
+                if column not in trade_idea_data:
+                    columns.append(column)
+                    placeholders.append(SQL_LOCAL_TIMESTAMP)
             
             self.cursor.execute(f'''
-                INSERT INTO trade_ideas_extended ({columns})
-                VALUES ({placeholders})
+                INSERT INTO trade_ideas_extended ({", ".join(columns)})
+                VALUES ({", ".join(placeholders)})
             ''', values)
             
             # Pobierz ID nowego rekordu
             idea_id = self.cursor.lastrowid
             self.conn.commit()
             
-            logger.info(f"Dodano nowy pomysł handlowy o ID: {idea_id}")
+            logger.info("Dodano nowy pomysł handlowy o ID: %s", idea_id)
             return {
                 "success": True,
                 "id": idea_id,
@@ -845,6 +1588,56 @@ class DatabaseHandler:
                 "error": str(e)
             }
             
+    @_synchronized
+    def add_trade_ideas(self, trade_ideas: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Dodaje wiele pomysłów handlowych jednym przygotowanym zapytaniem executemany.
+        
+        Args:
+            trade_ideas: Lista danych nowych pomysłów handlowych
+            
+        Returns:
+            Dict[str, Any]: Wynik operacji z listą ID nowych pomysłów lub błędem
+        """
+        if not trade_ideas:
+            return {"success": True, "ids": []}
+            
+        try:
+            # Suma pól wszystkich pomysłów ograniczona do kolumn tabeli, w stałej kolejności
+            fields = {"status", "created_at", "updated_at"}.union(*trade_ideas)
+            columns = sorted(self._table_columns("trade_ideas_extended") & fields)
+            
+            # Brakujące znaczniki czasu wylicza SQLite dla każdego wiersza
+            placeholders = [f"COALESCE(?, {SQL_LOCAL_TIMESTAMP})" if column in ("created_at", "updated_at") else "?"
+                            for column in columns]
+            rows = [[idea.get(column) for column in columns]
+                    for idea in ({"status": "PENDING", **idea} for idea in trade_ideas)]
+            
+            self.cursor.executemany(f'''
+                INSERT INTO trade_ideas_extended ({", ".join(columns)})
+                VALUES ({", ".join(placeholders)})
+            ''', rows)
+            
+            # Zapis odbywa się pod blokadą w jednej transakcji, więc ID są kolejne
+            last_id = self.cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.conn.commit()
+            
+            logger.info("Dodano %s pomysłów handlowych", len(rows))
+            return {
+                "success": True,
+                "ids": list(range(last_id - len(rows) + 1, last_id + 1)),
+                "message": "Pomysły handlowe dodane pomyślnie"
+            }
+            
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"Błąd podczas dodawania pomysłów handlowych: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
+            
+    @_synchronized
     def update_trade_idea(self, idea_id: int, update_data: Dict[str, Any]) -> bool:
         """
         Aktualizuje pomysł handlowy w bazie danych.
@@ -854,31 +1647,42 @@ class DatabaseHandler:
             update_data: Dane do aktualizacji
             
         Returns:
-            bool: True jeśli aktualizacja się powiodła, False w przeciwnym razie
+            bool: True jeśli aktualizacja się powiodła (lub dane się nie zmieniły), False w przeciwnym razie
         """
+        if not update_data:
+            return True
+            
         try:
+            # Wiersz zapisywany jest tylko wtedy, gdy któreś z pól ma inną wartość
+            changed_columns, changed_values = _sorted_fields(update_data)
+            changed_clause = " OR ".join([f"{key} IS NOT ?" for key in changed_columns])
+            
             # Dodaj pole updated_at
             if "updated_at" not in update_data:
                 update_data["updated_at"] = datetime.datetime.now().isoformat()
                 
             # Przygotuj zapytanie SQL
-            set_clause = ", ".join([f"{key} = ?" for key in update_data.keys()])
-            values = list(update_data.values())
+            columns, values = _sorted_fields(update_data)
+            set_clause = ", ".join([f"{key} = ?" for key in columns])
             values.append(idea_id)  # Dla warunku WHERE
             
             self.cursor.execute(f'''
                 UPDATE trade_ideas_extended 
                 SET {set_clause}
-                WHERE id = ?
-            ''', values)
+                WHERE id = ? AND ({changed_clause})
+            ''', values + changed_values)
             
             # Sprawdź, czy rekord został zaktualizowany
             if self.cursor.rowcount == 0:
-                logger.warning(f"Nie znaleziono pomysłu handlowego o ID: {idea_id}")
-                return False
+                self.cursor.execute("SELECT 1 FROM trade_ideas_extended WHERE id = ?", (idea_id,))
+                if self.cursor.fetchone() is None:
+                    logger.warning("Nie znaleziono pomysłu handlowego o ID: %s", idea_id)
+                    return False
+                logger.debug("Pomysł handlowy o ID: %s nie zmienił się - pominięto zapis", idea_id)
+                return True
                 
             self.conn.commit()
-            logger.info(f"Zaktualizowano pomysł handlowy o ID: {idea_id}")
+            logger.info("Zaktualizowano pomysł handlowy o ID: %s", idea_id)
             return True
             
         except Exception as e:
@@ -886,6 +1690,7 @@ class DatabaseHandler:
             logger.error(f"Błąd podczas aktualizacji pomysłu handlowego: {e}")
             return False
             
+    @_synchronized
     def delete_trade_idea(self, idea_id: int) -> bool:
         """
         Usuwa pomysł handlowy i powiązane komentarze z bazy danych.
@@ -897,13 +1702,7 @@ class DatabaseHandler:
             bool: True jeśli usunięcie się powiodło, False w przeciwnym razie
         """
         try:
-            # Usuń powiązane komentarze
-            self.cursor.execute('''
-                DELETE FROM trade_idea_comments
-                WHERE trade_idea_id = ?
-            ''', (idea_id,))
-            
-            # Usuń pomysł handlowy
+            # Usuń pomysł handlowy (komentarze usuwa ON DELETE CASCADE)
             self.cursor.execute('''
                 DELETE FROM trade_ideas_extended
                 WHERE id = ?
@@ -923,6 +1722,7 @@ class DatabaseHandler:
             logger.error(f"Błąd podczas usuwania pomysłu handlowego: {e}")
             return False
             
+    @_synchronized
     def get_trade_idea(self, idea_id: int) -> Optional[Dict[str, Any]]:
         """
         Pobiera szczegóły pomysłu handlowego.
@@ -945,52 +1745,54 @@ class DatabaseHandler:
                 return None
                 
             # Konwersja do słownika
-            columns = [column[0] for column in self.cursor.description]
-            trade_idea = {columns[i]: result[i] for i in range(len(columns))}
-            
-            return trade_idea
+            return dict(result)
             
         except Exception as e:
             logger.error(f"Błąd podczas pobierania pomysłu handlowego: {e}")
             return None
             
+    @_synchronized
     def get_trade_ideas_paginated(
         self,
-        page: int = 1,
+        cursor: Optional[str] = None,
         items_per_page: int = 10,
         filters: Dict[str, Any] = None,
         sort_by: str = "created_at",
-        sort_order: str = "DESC"
+        sort_order: str = "DESC",
+        backwards: bool = False
     ) -> Dict[str, Any]:
         """
         Pobiera stronicowaną listę pomysłów handlowych z możliwością filtrowania i sortowania.
         
+        Stronicowanie odbywa się kursorem (keyset) po parze (sort_by, id), dzięki czemu
+        baza nie musi przeglądać pominiętych wierszy jak przy OFFSET.
+        
         Args:
-            page: Numer strony (domyślnie 1)
+            cursor: Kursor zwrócony w poprzednim wyniku (None = pierwsza strona)
             items_per_page: Liczba elementów na stronę (domyślnie 10)
             filters: Filtry do zastosowania (np. {'status': 'PENDING', 'symbol': 'EURUSD'})
             sort_by: Pole do sortowania (domyślnie 'created_at')
             sort_order: Kolejność sortowania - ASC lub DESC (domyślnie DESC)
+            backwards: Czy pobrać stronę poprzedzającą kursor (domyślnie następną)
             
         Returns:
-            Dict[str, Any]: Wynik zapytania zawierający listę pomysłów i metadane
+            Dict[str, Any]: Wynik zapytania zawierający listę pomysłów (sqlite3.Row) i metadane
         """
         try:
             # Walidacja parametrów
-            if page < 1:
-                page = 1
             if items_per_page < 1:
                 items_per_page = 10
             if sort_order not in ["ASC", "DESC"]:
                 sort_order = "DESC"
+            if sort_by not in TRADE_IDEAS_SORT_COLUMNS:
+                sort_by = "created_at"
                 
             # Przygotowanie klauzuli WHERE
-            where_clause = ""
+            conditions = []
             params = []
             
             if filters:
                 # Buduj klauzulę WHERE na podstawie filtrów
-                conditions = []
                 for key, value in filters.items():
                     if key == "date_range" and isinstance(value, dict):
                         # Obsługa filtrowania po zakresie dat
@@ -1009,42 +1811,73 @@ class DatabaseHandler:
                         # Standardowe filtrowanie
                         conditions.append(f"{key} = ?")
                         params.append(value)
-                
-                if conditions:
-                    where_clause = "WHERE " + " AND ".join(conditions)
-            
-            # Pobierz całkowitą liczbę pasujących rekordów
-            count_query = f"SELECT COUNT(*) FROM trade_ideas_extended {where_clause}"
-            self.cursor.execute(count_query, params)
-            total_count = self.cursor.fetchone()[0]
             
-            # Obliczanie offsetu dla stronicowania
-            offset = (page - 1) * items_per_page
-            
-            # Pobierz dane z paginacją
+            filter_conditions = list(conditions)
+            filter_params = list(params)
+            
+            # Kierunek przeglądania - strona wstecz to odwrócone sortowanie od kursora
+            descending = (sort_order == "DESC") != backwards
+            query_order = "DESC" if descending else "ASC"
+            
+            if cursor:
+                cursor_value, cursor_id = _decode_cursor(cursor, sort_by, sort_order)
+                comparison = "<" if descending else ">"
+                if cursor_value is None:
+                    # Porównanie z NULL nigdy nie jest prawdziwe - NULL w SQLite jest najmniejszy,
+                    # więc malejąco pozostają tylko dalsze NULL, a rosnąco także wszystkie wartości
+                    if descending:
+                        conditions.append(f"({sort_by} IS NULL AND id < ?)")
+                    else:
+                        conditions.append(f"({sort_by} IS NOT NULL OR id > ?)")
+                    params.append(cursor_id)
+                elif descending and sort_by not in TRADE_IDEAS_NOT_NULL_SORT_COLUMNS:
+                    # Wiersze z NULL następują malejąco po wszystkich wartościach
+                    conditions.append(f"(({sort_by}, id) < (?, ?) OR {sort_by} IS NULL)")
+                    params.extend([cursor_value, cursor_id])
+                else:
+                    conditions.append(f"({sort_by}, id) {comparison} (?, ?)")
+                    params.extend([cursor_value, cursor_id])
+            
+            where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+            
+            # Pobierz o jeden rekord więcej, aby sprawdzić czy istnieje kolejna strona
             main_query = f'''
                 SELECT * FROM trade_ideas_extended
                 {where_clause}
-                ORDER BY {sort_by} {sort_order}
-                LIMIT ? OFFSET ?
+                ORDER BY {sort_by} {query_order}, id {query_order}
+                LIMIT ?
             '''
-            self.cursor.execute(main_query, params + [items_per_page, offset])
+            self.cursor.execute(main_query, params + [items_per_page + 1])
             
-            # Konwersja wyników do listy słowników
-            columns = [column[0] for column in self.cursor.description]
-            results = []
-            for row in self.cursor.fetchall():
-                results.append({columns[i]: row[i] for i in range(len(columns))})
+            # Wiersze strony zwracane są jako sqlite3.Row (dostęp po nazwie kolumny, bez kopiowania
+            # do słowników); dodatkowy rekord tylko sygnalizuje kolejną stronę
+            results = self.cursor.fetchmany(items_per_page)
+            has_more = self.cursor.fetchone() is not None
             
-            # Obliczanie metadanych stronicowania
+            if backwards:
+                results.reverse()
+                has_next, has_prev = cursor is not None, has_more
+            else:
+                has_next, has_prev = has_more, cursor is not None
+            
+            next_cursor = _encode_cursor(sort_by, sort_order, results[-1][sort_by], results[-1]["id"]) if results and has_next else None
+            prev_cursor = _encode_cursor(sort_by, sort_order, results[0][sort_by], results[0]["id"]) if results and has_prev else None
+            
+            if cursor is None and not has_more:
+                # Pierwsza strona bez następnych zawiera wszystkie rekordy - COUNT(*) jest zbędny
+                total_count = len(results)
+            else:
+                # Przybliżona liczba rekordów - buforowana, aby nie skanować tabeli przy każdej stronie
+                total_count = self._get_cached_count("trade_ideas_extended", filter_conditions, filter_params)
             total_pages = (total_count + items_per_page - 1) // items_per_page  # Zaokrąglanie w górę
             
             return {
                 "success": True,
                 "data": results,
                 "pagination": {
-                    "page": page,
                     "items_per_page": items_per_page,
+                    "next_cursor": next_cursor,
+                    "prev_cursor": prev_cursor,
                     "total_items": total_count,
                     "total_pages": total_pages
                 }
@@ -1057,13 +1890,40 @@ class DatabaseHandler:
                 "error": str(e),
                 "data": [],
                 "pagination": {
-                    "page": page,
                     "items_per_page": items_per_page,
+                    "next_cursor": None,
+                    "prev_cursor": None,
                     "total_items": 0,
                     "total_pages": 0
                 }
             }
+    
+    def _get_cached_count(self, table: str, conditions: List[str], params: List[Any]) -> int:
+        """
+        Zwraca liczbę rekordów spełniających warunki, buforowaną przez COUNT_CACHE_TTL sekund.
+        
+        Args:
+            table: Nazwa tabeli
+            conditions: Warunki klauzuli WHERE
+            params: Parametry warunków
             
+        Returns:
+            int: Liczba rekordów (może być nieaktualna o maksymalnie COUNT_CACHE_TTL sekund)
+        """
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+        key = (table, where_clause, tuple(params))
+        now = time.monotonic()
+        
+        cached = self._count_cache.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        
+        self.cursor.execute(f"SELECT COUNT(*) FROM {table} {where_clause}", params)
+        count = self.cursor.fetchone()[0]
+        self._count_cache[key] = (now + COUNT_CACHE_TTL, count)
+        return count
+            
+    @_synchronized
     def get_trade_ideas_stats(self) -> Dict[str, Any]:
         """
         Pobiera statystyki pomysłów handlowych.
@@ -1072,46 +1932,28 @@ class DatabaseHandler:
             Dict[str, Any]: Statystyki pomysłów handlowych
         """
         try:
-            # Statystyki według statusu
-            self.cursor.execute('''
-                SELECT status, COUNT(*) as count
-                FROM trade_ideas_extended
-                GROUP BY status
-            ''')
-            status_stats = {row[0]: row[1] for row in self.cursor.fetchall()}
-            
-            # Statystyki według symbolu
-            self.cursor.execute('''
-                SELECT symbol, COUNT(*) as count
-                FROM trade_ideas_extended
-                GROUP BY symbol
-                ORDER BY count DESC
-                LIMIT 10
-            ''')
-            symbol_stats = {row[0]: row[1] for row in self.cursor.fetchall()}
-            
-            # Statystyki według kierunku
+            # Jedno przejście po tabeli - liczniki dla każdego wymiaru sumowane z grup
             self.cursor.execute('''
-                SELECT direction, COUNT(*) as count
+                SELECT status, symbol, direction, source, COUNT(*) as count
                 FROM trade_ideas_extended
-                GROUP BY direction
+                GROUP BY status, symbol, direction, source
             ''')
-            direction_stats = {row[0]: row[1] for row in self.cursor.fetchall()}
-            
-            # Statystyki według source
-            self.cursor.execute('''
-                SELECT source, COUNT(*) as count
-                FROM trade_ideas_extended
-                WHERE source IS NOT NULL
-                GROUP BY source
-                ORDER BY count DESC
-                LIMIT 10
-            ''')
-            source_stats = {row[0]: row[1] for row in self.cursor.fetchall()}
-            
-            # Pobierz całkowitą liczbę pomysłów
-            self.cursor.execute('SELECT COUNT(*) FROM trade_ideas_extended')
-            total_count = self.cursor.fetchone()[0]
+            by_status = collections.Counter()
+            by_symbol = collections.Counter()
+            by_direction = collections.Counter()
+            by_source = collections.Counter()
+            for status, symbol, direction, source, count in self.cursor.fetchall():
+                by_status[status] += count
+                by_symbol[symbol] += count
+                by_direction[direction] += count
+                if source is not None:
+                    by_source[source] += count
+            
+            status_stats = dict(by_status)
+            symbol_stats = dict(by_symbol.most_common(10))
+            direction_stats = dict(by_direction)
+            source_stats = dict(by_source.most_common(10))
+            total_count = sum(by_status.values())
             
             return {
                 "success": True,
@@ -1129,7 +1971,8 @@ class DatabaseHandler:
                 "error": str(e)
             }
             
-    def get_trades_by_idea_id(self, idea_id: int) -> List[Dict[str, Any]]:
+    @_synchronized
+    def get_trades_by_idea_id(self, idea_id: int) -> List[sqlite3.Row]:
         """
         Pobiera listę transakcji związanych z danym pomysłem handlowym.
         
@@ -1137,7 +1980,7 @@ class DatabaseHandler:
             idea_id: ID pomysłu handlowego
             
         Returns:
-            List[Dict[str, Any]]: Lista transakcji
+            List[sqlite3.Row]: Lista transakcji (wiersze z dostępem po nazwie kolumny)
         """
         try:
             # Sprawdź, czy tabela trades istnieje
@@ -1147,25 +1990,20 @@ class DatabaseHandler:
                 return []
             
             # Pobierz transakcje powiązane z pomysłem handlowym
-            # Zakładamy, że pole comment w tabeli trades może zawierać "LLM_TradeIdea_{idea_id}"
-            self.cursor.execute('''
+            # (komentarz "LLM_TradeIdea_{idea_id}", wyszukiwany przez indeks idx_trades_comment_idea)
+            self.cursor.execute(f'''
                 SELECT * FROM trades
-                WHERE comment LIKE ?
-                ORDER BY open_time DESC
-            ''', (f'%LLM_TradeIdea_{idea_id}%',))
-            
-            # Konwersja wyników do listy słowników
-            columns = [column[0] for column in self.cursor.description]
-            trades = []
-            for row in self.cursor.fetchall():
-                trades.append({columns[i]: row[i] for i in range(len(columns))})
+                WHERE {SQL_COMMENT_IDEA_ID} = ? AND comment LIKE ?
+                ORDER BY entry_time DESC
+            ''', (idea_id, f'{TRADE_IDEA_COMMENT_PREFIX}%'))
             
-            return trades
+            return self.cursor.fetchall()
             
         except Exception as e:
             logger.error(f"Błąd podczas pobierania transakcji dla pomysłu handlowego: {e}")
             return []
             
+    @_synchronized
     def add_trade_idea_comment(self, comment_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Dodaje komentarz do pomysłu handlowego.
@@ -1180,45 +2018,33 @@ class DatabaseHandler:
             return {"success": False, "error": "Nie można połączyć z bazą danych"}
             
         try:
-            # Sprawdź czy tabela istnieje, jeśli nie - utwórz
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trade_idea_comments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    trade_idea_id INTEGER NOT NULL,
-                    content TEXT NOT NULL,
-                    author TEXT,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (trade_idea_id) REFERENCES trade_ideas_extended (id)
-                )
-            ''')
-            
             # Dodaj pole created_at jeśli nie ma
             now = datetime.datetime.now().isoformat()
             if "created_at" not in comment_data:
                 comment_data["created_at"] = now
                 
             # Odrzuć pola, które nie istnieją w tabeli
-            self.cursor.execute("PRAGMA table_info(trade_idea_comments)")
-            table_columns = [column[1] for column in self.cursor.fetchall()]
+            table_columns = self._table_columns("trade_idea_comments")
             
             # Przygotuj dane do wstawienia
             filtered_data = {k: v for k, v in comment_data.items() if k in table_columns}
             
             # Przygotuj zapytanie SQL
-            columns = ", ".join(filtered_data.keys())
-            placeholders = ", ".join(["?" for _ in filtered_data.keys()])
-            values = tuple(filtered_data.values())
+            columns, values = _sorted_fields(filtered_data)
+            placeholders = ", ".join(["?" for _ in columns])
             
             self.cursor.execute(f'''
-                INSERT INTO trade_idea_comments ({columns})
+                INSERT INTO trade_idea_comments ({", ".join(columns)})
                 VALUES ({placeholders})
             ''', values)
             
             # Pobierz ID nowego rekordu
             comment_id = self.cursor.lastrowid
-            self.conn.commit()
+            if not self._in_bulk:
+                self.conn.commit()
             
-            logger.info(f"Dodano nowy komentarz o ID: {comment_id} do pomysłu handlowego o ID: {comment_data['trade_idea_id']}")
+            logger.info("Dodano nowy komentarz o ID: %s do pomysłu handlowego o ID: %s",
+                        comment_id, comment_data['trade_idea_id'])
             return {
                 "success": True,
                 "id": comment_id,
@@ -1226,15 +2052,76 @@ class DatabaseHandler:
             }
             
         except Exception as e:
+            if self._in_bulk:
+                raise
             self.conn.rollback()
             logger.error(f"Błąd podczas dodawania komentarza: {e}")
             return {
                 "success": False,
                 "error": str(e)
             }
-        finally:
-            self.disconnect()
             
+    def _insert_many(self, table: str, records: List[Dict[str, Any]]) -> range:
+        """
+        Wstawia wiele rekordów jednym przygotowanym zapytaniem executemany.
+        
+        Kolumny to suma kluczy wszystkich rekordów ograniczona do kolumn tabeli;
+        brakujące wartości zapisywane są jako NULL.
+        
+        Args:
+            table: Nazwa tabeli
+            records: Lista słowników z danymi rekordów
+            
+        Returns:
+            Zakres ID wstawionych rekordów
+        """
+        table_columns = self._table_columns(table)
+        columns = sorted({k for record in records for k in record} & table_columns)
+        rows = [tuple(record.get(c) for c in columns) for record in records]
+        
+        self.cursor.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            rows
+        )
+        # Zapis odbywa się pod blokadą w jednej transakcji, więc ID są kolejne
+        last_id = self.cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return range(last_id - len(rows) + 1, last_id + 1)
+    
+    @_synchronized
+    def add_trade_idea_comments(self, comments: List[Dict[str, Any]]) -> range:
+        """
+        Dodaje wiele komentarzy do pomysłów handlowych w jednej transakcji.
+        
+        Args:
+            comments: Lista danych komentarzy (trade_idea_id, content, author, itd.)
+            
+        Returns:
+            range: Zakres ID nowych komentarzy (pusty w przypadku błędu)
+        """
+        if not comments:
+            return range(0)
+        if not self.connect():
+            return range(0)
+        
+        try:
+            now = datetime.datetime.now().isoformat()
+            comment_ids = self._insert_many("trade_idea_comments", [
+                {"created_at": now, **comment} for comment in comments
+            ])
+            if not self._in_bulk:
+                self.conn.commit()
+            
+            logger.info("Dodano %s komentarzy do pomysłów handlowych", len(comment_ids))
+            return comment_ids
+            
+        except Exception as e:
+            if self._in_bulk:
+                raise
+            self.conn.rollback()
+            logger.error(f"Błąd podczas dodawania komentarzy: {e}")
+            return range(0)
+    
+    @_synchronized
     def mock_add_trade(self, trade_data: Dict[str, Any]) -> int:
         """
         Dodaje transakcję bezpośrednio do bazy danych - metoda pomocnicza dla testów.
@@ -1249,31 +2136,8 @@ class DatabaseHandler:
             return -1
             
         try:
-            # Upewnij się, że tabela istnieje
-            self.cursor.execute('''
-                CREATE TABLE IF NOT EXISTS trades (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    trade_idea_id INTEGER,
-                    symbol TEXT NOT NULL,
-                    direction TEXT NOT NULL,
-                    entry_price REAL NOT NULL,
-                    entry_time TEXT NOT NULL,
-                    exit_price REAL,
-                    exit_time TEXT,
-                    stop_loss REAL,
-                    take_profit REAL,
-                    profit_loss REAL,
-                    status TEXT NOT NULL,
-                    volume REAL NOT NULL,
-                    comment TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (trade_idea_id) REFERENCES trade_ideas (id)
-                )
-            ''')
-            
             # Przygotowanie podstawowych danych
-            from datetime import datetime
-            now = datetime.now().isoformat()
+            now = datetime.datetime.now().isoformat()
             if 'created_at' not in trade_data:
                 trade_data['created_at'] = now
                 
@@ -1281,12 +2145,7 @@ class DatabaseHandler:
                 trade_data['status'] = 'OPEN'
                 
             # Tworzenie pól i wartości dla zapytania
-            fields = []
-            values = []
-            
-            for key, value in trade_data.items():
-                fields.append(key)
-                values.append(value)
+            fields, values = _sorted_fields(trade_data)
                 
             # Tworzenie zapytania SQL
             placeholders = ', '.join(['?' for _ in fields])
@@ -1297,18 +2156,54 @@ class DatabaseHandler:
             # Wykonanie zapytania
             self.cursor.execute(query, values)
             trade_id = self.cursor.lastrowid
-            self.conn.commit()
+            if not self._in_bulk:
+                self.conn.commit()
             
-            logger.info(f"Dodano transakcję testową z ID: {trade_id}")
+            logger.info("Dodano transakcję testową z ID: %s", trade_id)
             return trade_id
             
         except Exception as e:
+            if self._in_bulk:
+                raise
             logger.error(f"Błąd podczas dodawania transakcji testowej: {e}")
             self.conn.rollback()
             return -1
-        finally:
-            self.disconnect()
 
+    @_synchronized
+    def mock_add_trades(self, trades: List[Dict[str, Any]]) -> range:
+        """
+        Dodaje wiele transakcji bezpośrednio do bazy danych - metoda pomocnicza dla testów.
+        
+        Args:
+            trades: Lista danych transakcji
+            
+        Returns:
+            range: Zakres ID nowych transakcji (pusty w przypadku błędu)
+        """
+        if not trades:
+            return range(0)
+        if not self.connect():
+            return range(0)
+        
+        try:
+            now = datetime.datetime.now().isoformat()
+            trade_ids = self._insert_many("trades", [
+                {"created_at": now, "status": "OPEN", **trade} for trade in trades
+            ])
+            if not self._in_bulk:
+                self.conn.commit()
+            
+            logger.info("Dodano %s transakcji testowych", len(trade_ids))
+            return trade_ids
+            
+        except Exception as e:
+            if self._in_bulk:
+                raise
+            logger.error(f"Błąd podczas dodawania transakcji testowych: {e}")
+            self.conn.rollback()
+            return range(0)
+
+    @_synchronized
     def update_trade(self, trade_id: int, update_data: Dict[str, Any]) -> bool:
         """
         Aktualizuje dane transakcji w bazie danych.
@@ -1325,8 +2220,8 @@ class DatabaseHandler:
         
         try:
             # Przygotuj zapytanie SQL
-            set_clause = ", ".join([f"{key} = ?" for key in update_data.keys()])
-            values = list(update_data.values())
+            columns, values = _sorted_fields(update_data)
+            set_clause = ", ".join([f"{key} = ?" for key in columns])
             values.append(trade_id)  # Dla warunku WHERE
             
             self.cursor.execute(f'''
@@ -1337,11 +2232,11 @@ class DatabaseHandler:
             
             # Sprawdź, czy rekord został zaktualizowany
             if self.cursor.rowcount == 0:
-                logger.warning(f"Nie znaleziono transakcji o ID: {trade_id}")
+                logger.warning("Nie znaleziono transakcji o ID: %s", trade_id)
                 return False
                 
             self.conn.commit()
-            logger.info(f"Zaktualizowano transakcję o ID: {trade_id}")
+            logger.info("Zaktualizowano transakcję o ID: %s", trade_id)
             return True
             
         except sqlite3.Error as e:
@@ -10,13 +10,19 @@ Ten moduł odpowiada za:
 
 import os
 import sys
-import time
+import copy
 import json
 import signal
 import logging
+import threading
 import argparse
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - bez niego używany jest standardowy moduł json
+    orjson = None
+
 # Dodaj główny katalog projektu do ścieżki importu
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -38,8 +44,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger("database_service")
 
-# Flaga zatrzymania dla obsługi wyjątków
-stop_flag = False
+# Zdarzenie zatrzymania ustawiane przez obsługę sygnałów
+stop_event = threading.Event()
+
+# Sparsowane pliki konfiguracyjne: (ścieżka, czas modyfikacji w ns) -> konfiguracja
+_CONFIG_CACHE = {}
+
+
+def parse_config(raw):
+    """Parsuje zawartość pliku konfiguracyjnego JSON podaną jako bajty."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
 
 
 def load_config(env: str):
@@ -52,18 +68,24 @@ def load_config(env: str):
     Returns:
         Słownik z konfiguracją
     """
-    config_path = os.path.join(CONFIG_DIR, f"config_{env}.json")
+    config_path = Path(CONFIG_DIR) / f"config_{env}.json"
     
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                logger.info(f"Załadowano konfigurację z: {config_path}")
-                return config
-        except Exception as e:
-            logger.error(f"Błąd ładowania konfiguracji: {e}")
-    else:
+    try:
+        # Plik parsowany jest ponownie tylko po zmianie jego czasu modyfikacji
+        key = (config_path, config_path.stat().st_mtime_ns)
+        if key not in _CONFIG_CACHE:
+            config = parse_config(config_path.read_bytes())
+            for stale_key in [k for k in _CONFIG_CACHE if k[0] == config_path]:
+                del _CONFIG_CACHE[stale_key]
+            _CONFIG_CACHE[key] = config
+            logger.info(f"Załadowano konfigurację z: {config_path}")
+        
+        # Kopia chroni bufor przed modyfikacjami wprowadzanymi przez wywołującego
+        return copy.deepcopy(_CONFIG_CACHE[key])
+    except FileNotFoundError:
         logger.warning(f"Nie znaleziono pliku konfiguracyjnego: {config_path}")
+    except Exception as e:
+        logger.error(f"Błąd ładowania konfiguracji: {e}")
     
     # Zwracamy podstawową konfigurację
     return {
@@ -82,8 +104,6 @@ def run_database_service(config, args):
         config: Konfiguracja
         args: Argumenty wiersza poleceń
     """
-    global stop_flag
-    
     # Ustaw poziom logowania
     if args.debug:
         logger.setLevel(logging.DEBUG)
@@ -102,13 +122,14 @@ def run_database_service(config, args):
         db_handler = DatabaseHandler(db_url, auto_init=True)
         logger.info(f"Baza danych zainicjalizowana: {db_url}")
         
-        # Główna pętla serwisu
-        while not stop_flag:
-            # W przyszłości tutaj może być logika obsługi żądań
-            # w wersji multiprocesorowej
-            time.sleep(1)
+        # Główna pętla serwisu - proces śpi do otrzymania sygnału zatrzymania.
+        # W przyszłości tutaj może być logika obsługi żądań w wersji multiprocesorowej.
+        stop_event.wait()
         
         logger.info("Zatrzymanie serwisu bazodanowego...")
+        
+        # Połączenie jest utrzymywane przez cały czas pracy serwisu - zamknij je przy zatrzymaniu
+        db_handler.close()
     
     except Exception as e:
         logger.error(f"Błąd podczas uruchamiania serwisu bazodanowego: {e}")
@@ -123,9 +144,8 @@ def signal_handler(signum, frame):
         signum: Numer sygnału
         frame: Bieżąca ramka stosu
     """
-    global stop_flag
     logger.info(f"Otrzymano sygnał {signum}, zatrzymywanie serwisu...")
-    stop_flag = True
+    stop_event.set()
 
 
 def main():
@@ -11,9 +11,10 @@ import sys
 import json
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Any, Optional, List, Union, Tuple
 from datetime import datetime
-import traceback
 
 # Dodanie katalogu głównego projektu do ścieżki, aby umożliwić importy
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -26,6 +27,12 @@ from LLM_Engine.llm_engine import LLMEngine
 # Konfiguracja loggera
 logger = logging.getLogger(__name__)
 
+# Maksymalna liczba symboli analizowanych równocześnie przez silnik LLM
+MAX_ANALYSIS_WORKERS = 8
+
+# Minimalny odstęp (w sekundach) między logowaniem pełnych śladów stosu błędów
+EXCEPTION_LOG_INTERVAL = 1.0
+
 class AgentConnector:
     """
     Klasa AgentConnector zarządza komunikacją między systemem analizy LLM
@@ -63,6 +70,12 @@ class AgentConnector:
         self.last_update_time = 0
         self.active_symbols = []
         self.running = False
+        # Budzi pętlę główną natychmiast po wywołaniu stop()
+        self._stop_event = threading.Event()
+        # Czas ostatniego zalogowania śladu stosu (ograniczanie logów przy serii błędów)
+        self._last_exc_log = float("-inf")
+        # Pula wątków dla zapytań do LLM, tworzona przy pierwszej analizie
+        self._pool = None
         
         # Statystyki
         self.stats = {
@@ -112,6 +125,9 @@ class AgentConnector:
     
     def disconnect(self):
         """Zakończenie połączenia z Expert Advisor."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
         if self.zmq_client:
             self.zmq_client.disconnect()
         logger.info("Rozłączono z Expert Advisor")
@@ -125,26 +141,30 @@ class AgentConnector:
         
         logger.info("Uruchamianie agenta łączącego...")
         self.running = True
+        self._stop_event.clear()
         self.stats["start_time"] = datetime.now().isoformat()
         
+        # Pierwsza analiza od razu, kolejne co update_interval - pętla śpi do terminu
+        # kolejnej aktualizacji zamiast budzić się co chwilę
+        next_deadline = time.monotonic()
+        
         try:
             while self.running:
                 try:
-                    # Sprawdzenie, czy czas na aktualizację analizy
-                    current_time = time.time()
-                    if current_time - self.last_update_time >= self.update_interval:
-                        self._update_analysis()
-                        self.last_update_time = current_time
+                    if self._stop_event.wait(max(0.0, next_deadline - time.monotonic())):
+                        break
                     
-                    # Krótka pauza, aby nie obciążać CPU
-                    time.sleep(0.1)
+                    self._update_analysis()
+                    self.last_update_time = time.time()
+                    # Po zbyt długiej analizie kolejna startuje od razu, bez nadrabiania pominiętych terminów
+                    next_deadline = max(next_deadline + self.update_interval, time.monotonic())
                     
-                except Exception as e:
+                except Exception:
                     self.stats["errors"] += 1
-                    logger.error(f"Błąd w pętli głównej: {e}")
-                    logger.error(traceback.format_exc())
+                    self._log_exception("Błąd w pętli głównej")
                     # Krótkie opóźnienie przed ponowną próbą
-                    time.sleep(5)
+                    self._stop_event.wait(5)
+                    next_deadline = time.monotonic()
                     
         except KeyboardInterrupt:
             logger.info("Przerwano działanie agenta przez użytkownika")
@@ -155,6 +175,7 @@ class AgentConnector:
         """Zatrzymanie działania agenta."""
         logger.info("Zatrzymywanie agenta łączącego...")
         self.running = False
+        self._stop_event.set()
     
     def _update_analysis(self):
         """
@@ -162,27 +183,53 @@ class AgentConnector:
         """
         logger.info("Aktualizacja analizy rynku...")
         
+        # Dane dla wszystkich symboli jednym zapytaniem; bez wsparcia EA - osobno dla każdego symbolu
+        batch = None
+        if self.zmq_client.supports_batch and self.active_symbols:
+            batch = self.zmq_client.get_market_data_batch(self.active_symbols)
+        
+        # Sockety ZeroMQ nie są bezpieczne wątkowo - dane pobierane są w bieżącym wątku
+        market_data_by_symbol = {}
         for symbol in self.active_symbols:
             try:
                 # Pobranie danych rynkowych dla symbolu
-                market_data = self._get_market_data(symbol)
+                if batch is not None:
+                    market_data = batch.get(symbol)
+                else:
+                    market_data = self._get_market_data(symbol)
                 if not market_data:
                     logger.warning(f"Brak danych rynkowych dla {symbol}")
                     continue
+                market_data_by_symbol[symbol] = market_data
                 
-                # Analiza danych przez silnik LLM
-                analysis_result = self.llm_engine.analyze_market(market_data)
-                
-                if not analysis_result:
-                    logger.warning(f"Nie udało się przeprowadzić analizy dla {symbol}")
-                    continue
-                    
-                # Generowanie idei handlowej na podstawie analizy
-                trade_idea = self.llm_engine.generate_trade_idea(market_data, analysis_result)
-                
-                if not trade_idea:
-                    logger.warning(f"Nie udało się wygenerować idei handlowej dla {symbol}")
+            except Exception:
+                self.stats["errors"] += 1
+                self._log_exception("Błąd podczas pobierania danych dla symbolu %s", symbol)
+        
+        if not market_data_by_symbol:
+            return
+        
+        # Zapytania do LLM dla wszystkich symboli równolegle - czas cyklu zależy od
+        # najwolniejszej analizy, a nie od ich sumy
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=min(MAX_ANALYSIS_WORKERS, len(self.active_symbols)),
+                thread_name_prefix="llm-analysis"
+            )
+        futures = {
+            self._pool.submit(self._analyze_symbol, symbol, market_data): symbol
+            for symbol, market_data in market_data_by_symbol.items()
+        }
+        
+        # Wysyłanie sygnałów i zapis do bazy danych w bieżącym wątku, w kolejności ukończenia analiz
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                result = future.result()
+                if result is None:
                     continue
+                analysis_result, trade_idea = result
+                market_data = market_data_by_symbol[symbol]
                 
                 # Sprawdzenie, czy mamy sygnał handlowy
                 if trade_idea.get("direction") in ["buy", "sell"]:
@@ -194,10 +241,56 @@ class AgentConnector:
                 # Zapisanie wyników analizy w bazie danych
                 self._save_analysis_to_db(symbol, market_data, analysis_result, trade_idea)
                 
-            except Exception as e:
+            except Exception:
                 self.stats["errors"] += 1
-                logger.error(f"Błąd podczas analizy symbolu {symbol}: {e}")
-                logger.error(traceback.format_exc())
+                self._log_exception("Błąd podczas analizy symbolu %s", symbol)
+    
+    def _log_exception(self, message: str, *args):
+        """
+        Zalogowanie obsługiwanego wyjątku.
+        
+        Pełny ślad stosu logowany jest co najwyżej raz na EXCEPTION_LOG_INTERVAL sekund -
+        przy serii błędów (np. po rozłączeniu EA) pozostałe wyjątki logowane są jednym wierszem.
+        
+        Args:
+            message: Komunikat w formacie %-style
+            args: Argumenty komunikatu
+        """
+        now = time.monotonic()
+        if now - self._last_exc_log >= EXCEPTION_LOG_INTERVAL:
+            self._last_exc_log = now
+            logger.exception(message, *args)
+        else:
+            logger.error(message + ": %s", *args, sys.exc_info()[1])
+    
+    def _analyze_symbol(self, symbol: str, market_data: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """
+        Analiza danych rynkowych symbolu i generowanie idei handlowej przez silnik LLM.
+        
+        Wywoływana w puli wątków - nie korzysta z socketów ZeroMQ ani z bazy danych.
+        
+        Args:
+            symbol: Symbol instrumentu
+            market_data: Dane rynkowe symbolu
+            
+        Returns:
+            Krotka (wynik analizy, idea handlowa) lub None, jeśli analiza się nie powiodła
+        """
+        # Analiza danych przez silnik LLM
+        analysis_result = self.llm_engine.analyze_market(market_data)
+        
+        if not analysis_result:
+            logger.warning(f"Nie udało się przeprowadzić analizy dla {symbol}")
+            return None
+            
+        # Generowanie idei handlowej na podstawie analizy
+        trade_idea = self.llm_engine.generate_trade_idea(market_data, analysis_result)
+        
+        if not trade_idea:
+            logger.warning(f"Nie udało się wygenerować idei handlowej dla {symbol}")
+            return None
+            
+        return analysis_result, trade_idea
     
     def _get_market_data(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
@@ -217,11 +310,12 @@ class AgentConnector:
                 "timestamp": datetime.now().isoformat()
             }
             
-            # Wysłanie zapytania
-            self.zmq_client.req_socket.send_json(request)
-            
-            # Odebranie odpowiedzi
-            reply = self.zmq_client.req_socket.recv_json()
+            # Wysłanie zapytania i oczekiwanie na odpowiedź z ograniczonym czasem,
+            # aby zawieszony EA nie blokował analizy pozostałych symboli
+            reply = self.zmq_client.request(request)
+            if reply is None:
+                logger.error(f"Brak danych rynkowych dla {symbol}: {self.zmq_client.get_last_error()}")
+                return None
             
             if reply.get("type") == "market_data" and reply.get("symbol") == symbol:
                 return reply
@@ -9,4 +9,11 @@ Ten moduł zawiera komponenty odpowiedzialne za:
 
 """
 
-__version__ = "0.1.0" 
\ No newline at end of file
+__version__ = "0.1.0" 
+
+# Import modułu wskaźników kompiluje jądra numba (jawne sygnatury) już przy starcie,
+# dzięki czemu pierwszy cykl analizy agenta nie czeka na kompilację JIT
+try:
+    from LLM_Engine import advanced_indicators  # noqa: F401
+except ImportError:  # brak numpy/pandas - moduł zostanie zaimportowany dopiero przy użyciu
+    pass
@@ -3,20 +3,294 @@ Moduł zawierający zaawansowane wskaźniki techniczne dla analiz rynkowych.
 Rozszerza podstawowy moduł technical_indicators.py o bardziej złożone wskaźniki.
 """
 
+import threading
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Union, Optional, Tuple, Any
 from LLM_Engine.technical_indicators import TechnicalIndicators
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba jest opcjonalna - bez niej wskaźniki liczone są przez pandas
+    njit = None
+    prange = range
+
+
+# Jądra obliczeniowe przechodzące raz po tablicach NumPy. Numba kompiluje tylko funkcje
+# zdefiniowane na poziomie modułu, dlatego znajdują się one poza klasą.
+
+def _true_range(high, low, close, out):
+    """
+    Zapisuje do out True Range każdego punktu (dla pierwszego punktu: high - low).
+    
+    Składniki NaN są pomijane jak w np.fmax - TR jest NaN tylko wtedy, gdy NaN są wszystkie.
+    """
+    out[0] = high[0] - low[0]
+    for i in range(1, len(high)):
+        tr = high[i] - low[i]
+        gap = abs(high[i] - close[i - 1])
+        if tr != tr or gap > tr:
+            tr = gap
+        gap = abs(low[i] - close[i - 1])
+        if tr != tr or gap > tr:
+            tr = gap
+        out[i] = tr
+
+
+def _ewma(values, alpha, out):
+    """
+    Zapisuje do out wykładniczą średnią kroczącą (odpowiednik ewm(adjust=False).mean()).
+    
+    Brakujące wartości są pomijane jak w pandas: średnia przenoszona jest przez NaN,
+    a waga poprzedniej średniej maleje z każdym pominiętym punktem.
+    """
+    smoothed = values[0]
+    weight = 1.0
+    out[0] = smoothed
+    for i in range(1, len(values)):
+        value = values[i]
+        if smoothed == smoothed:
+            weight *= 1.0 - alpha
+            if value == value:
+                smoothed = (weight * smoothed + alpha * value) / (weight + alpha)
+                weight = 1.0
+        elif value == value:
+            smoothed = value
+        out[i] = smoothed
+
+
+def _adx(high, low, atr, alpha, adx, plus_di, minus_di):
+    """
+    Zapisuje ADX, DI+ i DI- w jednym przejściu, wygładzając +DM, -DM i DX
+    średnimi wykładniczymi przechowywanymi w zmiennych skalarnych. Wygładzony
+    TR odczytywany jest z gotowych wartości ATR.
+    
+    Wyniki odpowiadają obliczeniom pandas (ewm(adjust=False) pomijające NaN w DX);
+    punkty przed pierwszą wartością ADX mają wartość NaN. Brakująca cena daje zerowe
+    +DM i -DM (porównania z NaN są fałszywe), a ATR z _true_range i _ewma pomija NaN,
+    więc pojedyncza przerwa w danych nie unieważnia DI i ADX do końca serii.
+    """
+    plus_s = 0.0
+    minus_s = 0.0
+    adx_s = np.nan
+    adx_weight = 1.0
+    adx[0] = plus_di[0] = minus_di[0] = np.nan
+    
+    for i in range(1, len(high)):
+        up = high[i] - high[i - 1]
+        low_diff = low[i] - low[i - 1]
+        down = abs(low_diff)
+        plus_dm = up if up > down and up > 0 else 0.0
+        minus_dm = down if down > up and low_diff < 0 else 0.0
+        tr_s = atr[i]
+        
+        plus_s += alpha * (plus_dm - plus_s)
+        minus_s += alpha * (minus_dm - minus_s)
+        pdi = 100.0 * plus_s / tr_s
+        mdi = 100.0 * minus_s / tr_s
+        dx = 100.0 * abs(pdi - mdi) / (pdi + mdi)
+        
+        # Średnia DX jak w pandas: brakujące DX (0/0) zmniejszają wagę poprzedniej średniej
+        if adx_s == adx_s:
+            adx_weight *= 1.0 - alpha
+            if dx == dx:
+                adx_s = (adx_weight * adx_s + alpha * dx) / (adx_weight + alpha)
+                adx_weight = 1.0
+        elif dx == dx:
+            adx_s = dx
+        
+        if adx_s == adx_s:
+            adx[i], plus_di[i], minus_di[i] = adx_s, pdi, mdi
+        else:
+            adx[i] = plus_di[i] = minus_di[i] = np.nan
+
+
+def _rolling_range(high, low, window, highest, lowest):
+    """
+    Zapisuje kroczące maksimum high i minimum low w oknie window (odpowiednik
+    rolling(window).max()/min()), utrzymując indeksy kandydatów w kolejkach monotonicznych.
+    
+    Każdy indeks trafia do kolejki i opuszcza ją co najwyżej raz, więc koszt jest liniowy
+    niezależnie od długości okna. Okna niepełne lub zawierające NaN mają wartość NaN.
+    """
+    n = len(high)
+    max_queue = np.empty(n, np.int64)
+    min_queue = np.empty(n, np.int64)
+    max_head = max_tail = min_head = min_tail = 0
+    last_nan_high = last_nan_low = -window
+    
+    for i in range(n):
+        value = high[i]
+        if value == value:
+            while max_tail > max_head and high[max_queue[max_tail - 1]] <= value:
+                max_tail -= 1
+            max_queue[max_tail] = i
+            max_tail += 1
+        else:
+            last_nan_high = i
+        if max_tail > max_head and max_queue[max_head] <= i - window:
+            max_head += 1
+        
+        value = low[i]
+        if value == value:
+            while min_tail > min_head and low[min_queue[min_tail - 1]] >= value:
+                min_tail -= 1
+            min_queue[min_tail] = i
+            min_tail += 1
+        else:
+            last_nan_low = i
+        if min_tail > min_head and min_queue[min_head] <= i - window:
+            min_head += 1
+        
+        if i < window - 1 or i - last_nan_high < window:
+            highest[i] = np.nan
+        else:
+            highest[i] = high[max_queue[max_head]]
+        if i < window - 1 or i - last_nan_low < window:
+            lowest[i] = np.nan
+        else:
+            lowest[i] = low[min_queue[min_head]]
+
+
+def _ichimoku_ranges(high, low, periods, highest, lowest):
+    """
+    Zapisuje do kolejnych wierszy highest i lowest kroczące ekstrema dla każdego okresu
+    z periods. Okresy są od siebie niezależne, więc liczone są równolegle.
+    """
+    for row in prange(len(periods)):
+        _rolling_range(high, low, periods[row], highest[row], lowest[row])
+
+
+if njit is not None:
+    from numba import types
+    
+    # Jawne sygnatury powodują kompilację przy imporcie modułu zamiast przy pierwszym
+    # wywołaniu; cache=True zapisuje skompilowany kod w __pycache__ między uruchomieniami.
+    # Wejścia deklarowane są jako tylko do odczytu, aby przyjmować widoki z pandas.
+    _in = types.Array(types.float64, 1, 'A', readonly=True)
+    _out = types.float64[:]
+    
+    # Bez fastmath - jądra rozpoznają NaN (przerwy w danych z MT5), a dzielenie 0/0 ma dawać NaN jak w NumPy
+    _true_range = njit(types.void(_in, _in, _in, _out), cache=True)(_true_range)
+    _ewma = njit(types.void(_in, types.float64, _out), cache=True)(_ewma)
+    _adx = njit(types.void(_in, _in, _in, types.float64, _out, _out, _out),
+                cache=True, error_model='numpy')(_adx)
+    _rolling_range = njit(types.void(_in, _in, types.int64, _out, _out), cache=True)(_rolling_range)
+    _ichimoku_ranges = njit(types.void(_in, _in, types.int64[:], types.float64[:, :], types.float64[:, :]),
+                            cache=True, parallel=True)(_ichimoku_ranges)
+
+
 class AdvancedIndicators(TechnicalIndicators):
     """
     Klasa zawierająca zaawansowane wskaźniki techniczne używane w analizie rynków finansowych.
     Dziedziczy po klasie TechnicalIndicators.
     """
     
+    # Poziomy zniesienia Fibonacciego i ich etykiety
+    _FIB_RATIOS = np.array([0.0, 0.236, 0.382, 0.5, 0.618, 0.786, 1.0])
+    _FIB_LABELS = ('0.0', '0.236', '0.382', '0.5', '0.618', '0.786', '1.0')
+    
+    # Liczba ostatnio obliczonych wyników ATR przechowywanych do ponownego użycia
+    ATR_CACHE_SIZE = 8
+    
     def __init__(self):
         """Inicjalizacja klasy AdvancedIndicators."""
         super().__init__()
+        # Wyniki ATR: (id serii high, low, close, okres) -> (serie, sygnatura danych, wartości ATR)
+        self._atr_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._atr_cache_lock = threading.Lock()
+    
+    def clear_atr_cache(self) -> None:
+        """
+        Czyści zapamiętane wyniki ATR.
+        
+        Nadpisanie ostatniej świecy jest wykrywane automatycznie; po modyfikacji
+        wcześniejszych punktów serii w miejscu należy wyczyścić pamięć podręczną.
+        """
+        with self._atr_cache_lock:
+            self._atr_cache.clear()
+    
+    def _cached_atr(self, high_series: pd.Series, low_series: pd.Series, close_series: pd.Series,
+                    period: int) -> np.ndarray:
+        """
+        Zwraca wartości ATR, korzystając z wyniku obliczonego wcześniej dla tych samych serii.
+        
+        Dzięki temu ATR nie jest liczony ponownie, gdy w jednej analizie wywoływane są
+        zarówno calculate_atr, jak i calculate_adx. Pamięć podręczna przechowuje odwołania
+        do serii, więc ich identyfikatory nie mogą zostać ponownie przydzielone innym obiektom.
+        Wynik jest używany tylko, gdy zgadza się długość serii i ich ostatnie wartości
+        (np. po dopisaniu lub nadpisaniu bieżącej świecy ATR jest liczony ponownie).
+        """
+        high = self._values(high_series)
+        low = self._values(low_series)
+        close = self._values(close_series)
+        key = (id(high_series), id(low_series), id(close_series), period)
+        # Porównanie bajtów zamiast liczb, aby NaN w ostatniej świecy nie wykluczał trafienia
+        signature = (len(close), high[-1:].tobytes(), low[-1:].tobytes(), close[-1:].tobytes())
+        with self._atr_cache_lock:
+            entry = self._atr_cache.get(key)
+            if entry is not None and entry[1] == signature:
+                self._atr_cache.move_to_end(key)
+                return entry[2]
+        
+        atr = self._atr_values(high, low, close, period)
+        
+        with self._atr_cache_lock:
+            self._atr_cache[key] = ((high_series, low_series, close_series), signature, atr)
+            self._atr_cache.move_to_end(key)
+            while len(self._atr_cache) > self.ATR_CACHE_SIZE:
+                self._atr_cache.popitem(last=False)
+        return atr
+    
+    # Metody przyjmują i zwracają serie pandas, ale obliczenia wykonują na tablicach NumPy:
+    # serie są zamieniane na tablice raz na wejściu, a wyniki opakowywane w serie raz na wyjściu.
+    
+    @staticmethod
+    def _values(series: pd.Series) -> np.ndarray:
+        """Zwraca wartości serii jako ciągłą tablicę float64 (bez kopiowania, jeśli to możliwe)."""
+        return np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+    
+    @staticmethod
+    def _diff(values: np.ndarray) -> np.ndarray:
+        """Różnice kolejnych wartości tablicy (odpowiednik Series.diff), NaN dla pierwszego punktu."""
+        diff = np.empty_like(values)
+        diff[0] = np.nan
+        np.subtract(values[1:], values[:-1], out=diff[1:])
+        return diff
+    
+    @staticmethod
+    def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+        """Przesuwa tablicę o periods pozycji (odpowiednik Series.shift), uzupełniając NaN."""
+        shifted = np.full_like(values, np.nan)
+        if periods >= 0:
+            shifted[periods:] = values[:len(values) - periods]
+        else:
+            shifted[:periods] = values[-periods:]
+        return shifted
+    
+    @staticmethod
+    def _ewm(values: np.ndarray, period: int) -> np.ndarray:
+        """Wykładnicza średnia krocząca tablicy (ewm(span=period, adjust=False).mean())."""
+        if njit is not None:
+            smoothed = np.empty_like(values)
+            _ewma(values, 2.0 / (period + 1), smoothed)
+            return smoothed
+        return pd.Series(values).ewm(span=period, adjust=False).mean().to_numpy()
+    
+    def _atr_values(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+        """Oblicza ATR na tablicach NumPy (bez walidacji danych wejściowych)."""
+        true_range = np.empty_like(high)
+        if njit is not None:
+            _true_range(high, low, close, true_range)
+        else:
+            # Dla pierwszego punktu brak poprzedniego zamknięcia - TR to high - low;
+            # fmax pomija NaN jak max(axis=1) w pandas
+            np.subtract(high, low, out=true_range)
+            np.fmax(true_range[1:], np.abs(high[1:] - close[:-1]), out=true_range[1:])
+            np.fmax(true_range[1:], np.abs(low[1:] - close[:-1]), out=true_range[1:])
+        return self._ewm(true_range, period)
     
     def calculate_atr(
         self, 
@@ -62,21 +336,10 @@ class AdvancedIndicators(TechnicalIndicators):
         if period <= 0:
             raise ValueError("Okres musi być większy od zera")
         
-        # Obliczenie True Range
-        high_low = high_series - low_series
-        high_close = np.abs(high_series - close_series.shift(1))
-        low_close = np.abs(low_series - close_series.shift(1))
-        
-        # Utworzenie ramki danych zawierającej wszystkie trzy wartości
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        
-        # Wybór maksymalnej wartości dla każdego wiersza
-        true_range = ranges.max(axis=1)
-        
-        # Obliczenie ATR jako wykładniczej średniej kroczącej z True Range
-        atr = true_range.ewm(span=period, adjust=False).mean()
-        
-        return atr
+        # True Range i jego wykładnicza średnia krocząca, bez tymczasowej ramki danych;
+        # kopia chroni zapamiętany wynik przed modyfikacją zwróconej serii
+        atr = self._cached_atr(high_series, low_series, close_series, period)
+        return pd.Series(atr.copy(), index=close_series.index)
     
     def calculate_adx(
         self, 
@@ -119,43 +382,78 @@ class AdvancedIndicators(TechnicalIndicators):
         if len(high_series) <= 2 * period:
             return adx_result, plus_di_result, minus_di_result
         
-        # Obliczenie ATR
-        atr = self.calculate_atr(high_series, low_series, close_series, period)
-        
-        # Obliczenie +DM i -DM (Directional Movement)
-        high_diff = high_series.diff()
-        low_diff = low_series.diff()
-        
-        plus_dm = high_diff.copy()
-        minus_dm = low_diff.copy().abs()
-        
-        # Zastosowanie warunków dla +DM
-        condition1 = high_diff > low_diff.abs()
-        condition2 = high_diff > 0
-        plus_dm = plus_dm.where(condition1 & condition2, 0)
-        
-        # Zastosowanie warunków dla -DM
-        condition1 = low_diff.abs() > high_diff
-        condition2 = low_diff < 0
-        minus_dm = minus_dm.where(condition1 & condition2, 0)
-        
-        # Obliczenie +DI i -DI
-        plus_di = 100 * (plus_dm.ewm(span=period, adjust=False).mean() / atr)
-        minus_di = 100 * (minus_dm.ewm(span=period, adjust=False).mean() / atr)
+        high = self._values(high_series)
+        low = self._values(low_series)
+        close = self._values(close_series)
+        index = close_series.index
+        
+        # Obliczenie ATR (wspólne z wcześniejszym wywołaniem calculate_atr dla tych samych serii)
+        atr = self._cached_atr(high_series, low_series, close_series, period)
+        
+        if njit is not None:
+            # Pozostała część potoku ADX w jednym skompilowanym przejściu
+            adx = np.empty(len(close))
+            plus_di = np.empty_like(adx)
+            minus_di = np.empty_like(adx)
+            _adx(high, low, atr, 2.0 / (period + 1), adx, plus_di, minus_di)
+            return pd.Series(adx, index=index), pd.Series(plus_di, index=index), pd.Series(minus_di, index=index)
+        
+        # Obliczenie +DM i -DM (Directional Movement); dla pierwszego punktu brak zmiany
+        high_diff = self._diff(high)
+        low_diff = self._diff(low)
+        low_diff_abs = np.abs(low_diff)
+        
+        # Porównania z NaN są fałszywe, więc pierwszy punkt otrzymuje 0 jak w pandas.
+        # |Δlow| >= 0, więc warunek Δhigh > |Δlow| obejmuje już Δhigh > 0
+        plus_dm = np.where(high_diff > low_diff_abs, high_diff, 0.0)
+        minus_mask = np.greater(low_diff_abs, high_diff)
+        minus_mask &= low_diff < 0
+        minus_dm = np.where(minus_mask, low_diff_abs, 0.0)
+        
+        # Obliczenia w miejscu; dzielenie 0/0 daje NaN jak w pandas, bez ostrzeżeń
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Obliczenie +DI i -DI
+            plus_di = np.divide(self._ewm(plus_dm, period), atr)
+            plus_di *= 100.0
+            minus_di = np.divide(self._ewm(minus_dm, period), atr)
+            minus_di *= 100.0
+            
+            # Obliczenie DX (Directional Index)
+            dx = np.subtract(plus_di, minus_di)
+            np.abs(dx, out=dx)
+            np.divide(dx, plus_di + minus_di, out=dx)
+            dx *= 100.0
         
-        # Obliczenie DX (Directional Index)
-        dx = 100 * (np.abs(plus_di - minus_di) / (plus_di + minus_di))
+        # Obliczenie ADX - średnia pandas pomija brakujące wartości DX
+        adx = pd.Series(dx, index=index).ewm(span=period, adjust=False).mean()
         
-        # Obliczenie ADX
-        adx_calc = dx.ewm(span=period, adjust=False).mean()
+        # DI+ i DI- tylko tam, gdzie ADX ma wartość
+        invalid = np.isnan(adx.to_numpy())
+        plus_di[invalid] = np.nan
+        minus_di[invalid] = np.nan
         
-        # Przypisanie obliczonych wartości do wynikowych serii
-        valid_indices = ~np.isnan(adx_calc)
-        adx_result.loc[valid_indices] = adx_calc.loc[valid_indices]
-        plus_di_result.loc[valid_indices] = plus_di.loc[valid_indices]
-        minus_di_result.loc[valid_indices] = minus_di.loc[valid_indices]
+        return adx, pd.Series(plus_di, index=index), pd.Series(minus_di, index=index)
+    
+    def _rolling_range(self, high: np.ndarray, low: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Oblicza kroczące maksimum cen najwyższych i minimum cen najniższych.
         
-        return adx_result, plus_di_result, minus_di_result
+        Args:
+            high: Tablica cen najwyższych
+            low: Tablica cen najniższych
+            period: Długość okna
+            
+        Returns:
+            Krotka tablic (najwyższe maksimum, najniższe minimum)
+        """
+        if njit is not None:
+            highest = np.empty(len(high))
+            lowest = np.empty_like(highest)
+            _rolling_range(high, low, period, highest, lowest)
+            return highest, lowest
+        
+        return (pd.Series(high).rolling(window=period).max().to_numpy(),
+                pd.Series(low).rolling(window=period).min().to_numpy())
     
     def calculate_stochastic(self, high: pd.Series, low: pd.Series, close: pd.Series, 
                            k_period: int = 14, d_period: int = 3) -> Tuple[pd.Series, pd.Series]:
@@ -172,10 +470,14 @@ class AdvancedIndicators(TechnicalIndicators):
         Returns:
             Krotka (%K, %D)
         """
-        lowest_low = low.rolling(window=k_period).min()
-        highest_high = high.rolling(window=k_period).max()
+        highest_high, lowest_low = self._rolling_range(self._values(high), self._values(low), k_period)
         
-        k = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k = self._values(close) - lowest_low
+            k /= highest_high - lowest_low
+            k *= 100.0
+        
+        k = pd.Series(k, index=close.index)
         d = k.rolling(window=d_period).mean()
         
         return k, d
@@ -197,30 +499,41 @@ class AdvancedIndicators(TechnicalIndicators):
         Returns:
             Słownik z komponentami Ichimoku
         """
-        # Tenkan-sen (Conversion Line)
-        tenkan_sen = (high.rolling(window=tenkan_period).max() + 
-                      low.rolling(window=tenkan_period).min()) / 2
-        
-        # Kijun-sen (Base Line)
-        kijun_sen = (high.rolling(window=kijun_period).max() + 
-                     low.rolling(window=kijun_period).min()) / 2
+        high_values = self._values(high)
+        low_values = self._values(low)
+        
+        # Kroczące ekstrema dla okresów Tenkan, Kijun i Senkou Span B - po jednym wierszu na okres
+        periods = np.array([tenkan_period, kijun_period, senkou_span_b_period], dtype=np.int64)
+        highest_high = np.empty((len(periods), len(high_values)))
+        lowest_low = np.empty_like(highest_high)
+        if njit is not None:
+            _ichimoku_ranges(high_values, low_values, periods, highest_high, lowest_low)
+        else:
+            for row, period in enumerate(periods):
+                highest_high[row], lowest_low[row] = self._rolling_range(high_values, low_values, period)
+        
+        # Środki zakresów jedną operacją: Tenkan-sen (Conversion Line), Kijun-sen (Base Line)
+        # i podstawa Senkou Span B
+        highest_high += lowest_low
+        highest_high /= 2
+        tenkan_sen, kijun_sen, span_b_midpoint = highest_high
         
         # Senkou Span A (Leading Span A)
-        senkou_span_a = ((tenkan_sen + kijun_sen) / 2).shift(kijun_period)
+        senkou_span_a = self._shift((tenkan_sen + kijun_sen) / 2, kijun_period)
         
         # Senkou Span B (Leading Span B)
-        senkou_span_b = ((high.rolling(window=senkou_span_b_period).max() + 
-                          low.rolling(window=senkou_span_b_period).min()) / 2).shift(kijun_period)
+        senkou_span_b = self._shift(span_b_midpoint, kijun_period)
         
         # Chikou Span (Lagging Span)
-        chikou_span = close.shift(-kijun_period)
+        chikou_span = self._shift(self._values(close), -kijun_period)
         
+        index = close.index
         return {
-            'tenkan_sen': tenkan_sen,
-            'kijun_sen': kijun_sen,
-            'senkou_span_a': senkou_span_a,
-            'senkou_span_b': senkou_span_b,
-            'chikou_span': chikou_span
+            'tenkan_sen': pd.Series(tenkan_sen, index=index),
+            'kijun_sen': pd.Series(kijun_sen, index=index),
+            'senkou_span_a': pd.Series(senkou_span_a, index=index),
+            'senkou_span_b': pd.Series(senkou_span_b, index=index),
+            'chikou_span': pd.Series(chikou_span, index=index)
         }
     
     def calculate_fibonacci_retracement(self, high: float, low: float) -> Dict[str, float]:
@@ -234,16 +547,27 @@ class AdvancedIndicators(TechnicalIndicators):
         Returns:
             Słownik z poziomami zniesienia
         """
-        diff = high - low
+        levels = low + (high - low) * self._FIB_RATIOS
+        # Poziom 1.0 to dokładnie szczyt, bez błędu zaokrąglenia
+        levels[-1] = high
         
-        levels = {
-            '0.0': low,
-            '0.236': low + diff * 0.236,
-            '0.382': low + diff * 0.382,
-            '0.5': low + diff * 0.5,
-            '0.618': low + diff * 0.618,
-            '0.786': low + diff * 0.786,
-            '1.0': high
-        }
+        return dict(zip(self._FIB_LABELS, levels.tolist()))
+    
+    def calculate_fibonacci_retracement_batch(self, highs: np.ndarray, lows: np.ndarray) -> np.ndarray:
+        """
+        Oblicza poziomy zniesienia Fibonacciego dla wielu par szczyt-dołek naraz.
+        
+        Args:
+            highs: Wartości szczytów
+            lows: Wartości dołków
+            
+        Returns:
+            Tablica o kształcie (n, 7) z poziomami w kolejności _FIB_LABELS
+        """
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
+        
+        levels = lows[:, None] + (highs - lows)[:, None] * self._FIB_RATIOS
+        levels[:, -1] = highs
         
-        return levels 
\ No newline at end of file
+        return levels
@@ -9,13 +9,82 @@ Ten moduł odpowiada za:
 
 import os
 import json
+import mmap
+import sqlite3
 import time
 import logging
 import hashlib
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Union
 
+try:
+    import xxhash
+except ImportError:  # xxhash jest opcjonalny - bez niego klucze haszowane są przez MD5
+    xxhash = None
+
+try:
+    import orjson
+except ImportError:  # orjson jest opcjonalny - bez niego używany jest standardowy moduł json
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Indeks czasów zapisu plików cache - sprawdzanie wieku i czyszczenie bez stat na każdym pliku
+CACHE_INDEX_FILE = "cache_index.sqlite"
+
+# Minimalny odstęp (w sekundach) między kolejnymi usunięciami przestarzałych plików
+CACHE_CLEANUP_INTERVAL = 3600
+
+# Rozmiar pliku (w bajtach), od którego plik cache jest mapowany do pamięci zamiast wczytywany
+MMAP_THRESHOLD = 64 * 1024
+
+
+def _hash_key(key: str) -> str:
+    """
+    Zwraca nazwę pliku cache (bez rozszerzenia) dla klucza.
+    
+    Klucz nie wymaga haszu kryptograficznego, więc przy dostępnym xxhash używany jest
+    szybszy XXH3-128. Prefiks wersji oddziela jego pliki od starszych plików MD5.
+    """
+    encoded = key.encode('utf-8')
+    if xxhash is not None:
+        return f"v2_{xxhash.xxh3_128_hexdigest(encoded)}"
+    return hashlib.md5(encoded).hexdigest()
+
+
+def _dumps(data: Dict[str, Any]) -> bytes:
+    """Serializuje dane cache do zwartego JSON (bez wcięć) w postaci bajtów."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(raw) -> Dict[str, Any]:
+    """
+    Parsuje zawartość pliku cache podaną jako bajty lub bufor (np. widok mapowanego pliku).
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(bytes(raw))
+
+
+def _read_file(f) -> Dict[str, Any]:
+    """
+    Wczytuje i parsuje otwarty plik cache.
+    
+    Duże pliki są mapowane do pamięci i parsowane bezpośrednio z mapowania,
+    bez kopiowania całej zawartości do obiektu bytes.
+    """
+    if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+        return _loads(f.read())
+        
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # Widok musi zostać zwolniony przed zamknięciem mapowania
+        with memoryview(mapped) as view:
+            return _loads(view)
+
+
 class CacheManager:
     """
     Klasa zarządzająca cache'owaniem zapytań i odpowiedzi modelu LLM.
@@ -24,7 +93,8 @@ class CacheManager:
     ponownego generowania odpowiedzi na te same zapytania.
     """
     
-    def __init__(self, cache_dir: str, enabled: bool = True, max_age_seconds: int = 86400):
+    def __init__(self, cache_dir: str, enabled: bool = True, max_age_seconds: int = 86400,
+                 memory_size: int = 512):
         """
         Inicjalizuje menedżera cache.
         
@@ -32,56 +102,87 @@ class CacheManager:
             cache_dir: Ścieżka do katalogu przechowującego pliki cache
             enabled: Czy cache jest włączony
             max_age_seconds: Maksymalny wiek plików cache w sekundach (domyślnie 24h)
+            memory_size: Liczba ostatnio używanych wpisów trzymanych w pamięci (domyślnie 512)
         """
         self.cache_dir = cache_dir
         self.enabled = enabled
         self.max_age_seconds = max_age_seconds
         
+        # Pamięć podręczna LRU przed plikami: nazwa pliku -> (czas zapisu, odczytane dane)
+        self._mem: "OrderedDict[str, tuple]" = OrderedDict()
+        self._mem_max = memory_size
+        self._mem_lock = threading.Lock()
+        
+        self._index = None
+        self._index_lock = threading.Lock()
+        # Czyszczenie starego cache odbywa się leniwie przy pierwszej operacji, a potem okresowo
+        self._next_cleanup = 0.0
+        
         if self.enabled:
             os.makedirs(self.cache_dir, exist_ok=True)
+            self._open_index()
             logger.info(f"Zainicjalizowano cache w katalogu {self.cache_dir}")
-            
-            # Czyszczenie starego cache przy inicjalizacji
-            self._clean_old_cache()
     
     def get(self, key: str) -> Optional[Dict[str, Any]]:
         """
         Pobiera dane z cache na podstawie klucza.
         
+        Zwracany obiekt jest współdzielony z pamięcią podręczną (bez kopiowania, którego
+        koszt byłby porównywalny z parsowaniem pliku) - wywołujący nie może go modyfikować.
+        
         Args:
             key: Klucz identyfikujący zapytanie
             
         Returns:
-            Optional[Dict[str, Any]]: Znalezione dane lub None jeśli nie znaleziono
+            Optional[Dict[str, Any]]: Znalezione dane (tylko do odczytu) lub None jeśli nie znaleziono
         """
         if not self.enabled:
             return None
             
+        self._maybe_clean_old_cache()
         cache_file = self._get_cache_file_path(key)
         
-        if not os.path.exists(cache_file):
+        # Najpierw pamięć podręczna - bez operacji na plikach i ponownego parsowania JSON
+        with self._mem_lock:
+            entry = self._mem.get(cache_file)
+            if entry is not None:
+                if time.time() - entry[0] <= self.max_age_seconds:
+                    self._mem.move_to_end(cache_file)
+                    return entry[1]
+                # Przestarzały wpis - plik zostanie usunięty poniżej
+                del self._mem[cache_file]
+        
+        # Czas zapisu z indeksu zamiast stat na pliku
+        file_name = os.path.basename(cache_file)
+        mtime = self._index_mtime(file_name)
+        if mtime is None:
             return None
             
         try:
             # Sprawdzenie wieku pliku
-            file_age = time.time() - os.path.getmtime(cache_file)
+            file_age = time.time() - mtime
             if file_age > self.max_age_seconds:
                 logger.debug(f"Plik cache {cache_file} jest zbyt stary ({file_age:.1f}s), usuwanie...")
-                os.remove(cache_file)
+                self._remove_file(cache_file)
                 return None
                 
             # Odczyt danych
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                cached_data = json.load(f)
+            with open(cache_file, 'rb') as f:
+                cached_data = _read_file(f)
                 
+            self._remember(cache_file, mtime, cached_data)
             logger.debug(f"Znaleziono dane w cache dla klucza {key}")
             return cached_data
             
+        except FileNotFoundError:
+            # Plik usunięty poza menedżerem - wpis w indeksie jest nieaktualny
+            self._remove_file(cache_file)
+            return None
+            
         except Exception as e:
             logger.warning(f"Błąd podczas odczytu cache: {str(e)}")
             # W przypadku błędu, lepiej usunąć uszkodzony plik
-            if os.path.exists(cache_file):
-                os.remove(cache_file)
+            self._remove_file(cache_file)
             return None
     
     def set(self, key: str, data: Dict[str, Any]) -> bool:
@@ -98,17 +199,39 @@ class CacheManager:
         if not self.enabled:
             return False
             
+        self._maybe_clean_old_cache()
         cache_file = self._get_cache_file_path(key)
         
+        # Zapis do pliku tymczasowego i atomowa podmiana - przerwany zapis nie zostawia
+        # uszkodzonego pliku cache, a odczyt widzi zawsze starą lub nową, pełną zawartość
+        temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            payload = _dumps(data)
+            with open(temp_file, 'wb') as f:
+                f.write(payload)
+            os.replace(temp_file, cache_file)
                 
+            stored_at = time.time()
+            with self._index_lock:
+                self._index.execute(
+                    "INSERT OR REPLACE INTO cache_index (file_name, mtime) VALUES (?, ?)",
+                    (os.path.basename(cache_file), stored_at)
+                )
+                self._index.commit()
+            # W pamięci zapamiętywane są dane odczytane z zapisanej treści, a nie obiekt
+            # wywołującego - jego późniejsze zmiany nie wpływają na cache, a typy są takie
+            # same jak przy odczycie z pliku
+            self._remember(cache_file, stored_at, _loads(payload))
             logger.debug(f"Zapisano dane do cache dla klucza {key}")
             return True
             
         except Exception as e:
             logger.warning(f"Błąd podczas zapisu do cache: {str(e)}")
+            try:
+                os.remove(temp_file)
+            except OSError:
+                pass
             return False
     
     def invalidate(self, key: str) -> bool:
@@ -126,11 +249,12 @@ class CacheManager:
             
         cache_file = self._get_cache_file_path(key)
         
-        if not os.path.exists(cache_file):
-            return False
-            
+        with self._mem_lock:
+            self._mem.pop(cache_file, None)
+        
         try:
-            os.remove(cache_file)
+            if not self._remove_file(cache_file):
+                return False
             logger.debug(f"Usunięto dane z cache dla klucza {key}")
             return True
             
@@ -148,7 +272,13 @@ class CacheManager:
         if not self.enabled:
             return False
             
+        with self._mem_lock:
+            self._mem.clear()
+            
         try:
+            with self._index_lock:
+                self._index.execute("DELETE FROM cache_index")
+                self._index.commit()
             for file_name in os.listdir(self.cache_dir):
                 if file_name.endswith('.json'):
                     file_path = os.path.join(self.cache_dir, file_name)
@@ -161,6 +291,108 @@ class CacheManager:
             logger.warning(f"Błąd podczas czyszczenia cache: {str(e)}")
             return False
     
+    def close(self) -> None:
+        """Zamyka połączenie z indeksem plików cache."""
+        with self._index_lock:
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+    
+    def _open_index(self) -> None:
+        """
+        Otwiera indeks czasów zapisu plików cache, tworząc go w razie potrzeby.
+        
+        Nowy indeks jest jednorazowo wypełniany czasami modyfikacji plików
+        zapisanych przed jego utworzeniem.
+        """
+        index_path = os.path.join(self.cache_dir, CACHE_INDEX_FILE)
+        # Połączenie współdzielone między wątkami, dostęp chroniony przez _index_lock
+        self._index = sqlite3.connect(index_path, check_same_thread=False)
+        # Indeks jest pomocniczy - WAL bez synchronizacji przy każdym zatwierdzeniu wystarcza
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("PRAGMA synchronous=NORMAL")
+        
+        with self._index_lock:
+            exists = self._index.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cache_index'"
+            ).fetchone()
+            if exists:
+                return
+                
+            self._index.execute(
+                "CREATE TABLE cache_index (file_name TEXT PRIMARY KEY, mtime REAL NOT NULL)"
+            )
+            self._index.execute("CREATE INDEX idx_cache_index_mtime ON cache_index (mtime)")
+            rows = []
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith('.json'):
+                    try:
+                        rows.append((file_name, os.path.getmtime(os.path.join(self.cache_dir, file_name))))
+                    except OSError:
+                        continue
+            self._index.executemany("INSERT INTO cache_index (file_name, mtime) VALUES (?, ?)", rows)
+            self._index.commit()
+    
+    def _index_mtime(self, file_name: str) -> Optional[float]:
+        """
+        Zwraca czas zapisu pliku cache z indeksu.
+        
+        Args:
+            file_name: Nazwa pliku cache
+            
+        Returns:
+            Optional[float]: Czas zapisu lub None, jeśli pliku nie ma w indeksie
+        """
+        with self._index_lock:
+            row = self._index.execute(
+                "SELECT mtime FROM cache_index WHERE file_name = ?", (file_name,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _remove_file(self, cache_file: str) -> bool:
+        """
+        Usuwa plik cache wraz z jego wpisem w indeksie.
+        
+        Args:
+            cache_file: Ścieżka do pliku cache
+            
+        Returns:
+            bool: True jeśli plik istniał i został usunięty
+        """
+        with self._index_lock:
+            self._index.execute(
+                "DELETE FROM cache_index WHERE file_name = ?", (os.path.basename(cache_file),)
+            )
+            self._index.commit()
+        try:
+            os.remove(cache_file)
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def _maybe_clean_old_cache(self) -> None:
+        """Uruchamia czyszczenie starego cache, jeśli minął odstęp od poprzedniego."""
+        if time.time() >= self._next_cleanup:
+            self._clean_old_cache()
+    
+    def _remember(self, cache_file: str, stored_at: float, data: Dict[str, Any]) -> None:
+        """
+        Dodaje wpis do pamięci podręcznej, usuwając najdawniej używane wpisy ponad limit.
+        
+        Args:
+            cache_file: Ścieżka do pliku cache (klucz wpisu)
+            stored_at: Czas zapisu danych (do kontroli wieku wpisu)
+            data: Dane do zapamiętania
+        """
+        if self._mem_max <= 0:
+            return
+            
+        with self._mem_lock:
+            self._mem[cache_file] = (stored_at, data)
+            self._mem.move_to_end(cache_file)
+            while len(self._mem) > self._mem_max:
+                self._mem.popitem(last=False)
+    
     def _get_cache_file_path(self, key: str) -> str:
         """
         Generuje ścieżkę do pliku cache na podstawie klucza.
@@ -172,25 +404,32 @@ class CacheManager:
             str: Ścieżka do pliku cache
         """
         # Haszowanie klucza, aby uniknąć problemów z nazwami plików
-        hashed_key = hashlib.md5(key.encode('utf-8')).hexdigest()
+        hashed_key = _hash_key(key)
         return os.path.join(self.cache_dir, f"{hashed_key}.json")
     
     def _clean_old_cache(self) -> None:
         """
-        Czyści stare pliki cache.
+        Czyści stare pliki cache wskazane przez indeks, bez przeglądania katalogu.
         """
+        current_time = time.time()
+        self._next_cleanup = current_time + CACHE_CLEANUP_INTERVAL
+        cutoff = current_time - self.max_age_seconds
+        
         try:
-            current_time = time.time()
-            count = 0
+            with self._index_lock:
+                expired = [row[0] for row in self._index.execute(
+                    "SELECT file_name FROM cache_index WHERE mtime < ?", (cutoff,)
+                )]
+                self._index.execute("DELETE FROM cache_index WHERE mtime < ?", (cutoff,))
+                self._index.commit()
             
-            for file_name in os.listdir(self.cache_dir):
-                if file_name.endswith('.json'):
-                    file_path = os.path.join(self.cache_dir, file_name)
-                    file_age = current_time - os.path.getmtime(file_path)
-                    
-                    if file_age > self.max_age_seconds:
-                        os.remove(file_path)
-                        count += 1
+            count = 0
+            for file_name in expired:
+                try:
+                    os.remove(os.path.join(self.cache_dir, file_name))
+                    count += 1
+                except FileNotFoundError:
+                    continue
                         
             if count > 0:
                 logger.info(f"Usunięto {count} przestarzałych plików cache")
@@ -0,0 +1,155 @@
+"""
+Testy dla modułu cache_manager.py przechowującego wyniki zapytań LLM.
+"""
+
+import os
+import sys
+import hashlib
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Dodanie ścieżki głównego katalogu projektu do PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from LLM_Engine import cache_manager
+from LLM_Engine.cache_manager import CacheManager
+
+
+class TestCacheManager(unittest.TestCase):
+    """Testy dla klasy CacheManager."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = CacheManager(self.temp_dir.name)
+
+    def tearDown(self):
+        self.cache.close()
+        self.temp_dir.cleanup()
+
+    def test_set_and_get(self):
+        """Test zapisu i odczytu danych z cache."""
+        self.assertTrue(self.cache.set("klucz", {"wynik": 1}))
+        self.assertEqual(self.cache.get("klucz"), {"wynik": 1})
+        self.assertIsNone(self.cache.get("inny klucz"))
+
+    def test_invalidate(self):
+        """Test usuwania danych z cache."""
+        self.cache.set("klucz", {"wynik": 1})
+        self.assertTrue(self.cache.invalidate("klucz"))
+        self.assertIsNone(self.cache.get("klucz"))
+        self.assertFalse(self.cache.invalidate("klucz"))
+
+    def test_file_is_compact_json(self):
+        """Test zapisu danych jako zwartego JSON bez wcięć, także bez orjson."""
+        data = {"analiza": "wzrost", "poziomy": [1.1, 1.2]}
+        with patch.object(cache_manager, "orjson", None):
+            self.cache.set("klucz", data)
+        with open(self.cache._get_cache_file_path("klucz"), "rb") as f:
+            raw = f.read()
+
+        self.assertNotIn(b"\n", raw)
+        self.assertEqual(cache_manager._loads(raw), data)
+
+    def test_large_files_read_through_mmap(self):
+        """Test odczytu dużych plików przez mapowanie pamięci."""
+        data = {"odpowiedz": "x" * (2 * cache_manager.MMAP_THRESHOLD)}
+        self.cache.set("json", data)
+
+        fresh_cache = CacheManager(self.temp_dir.name)
+        self.addCleanup(fresh_cache.close)
+        with patch("LLM_Engine.cache_manager.mmap.mmap", wraps=cache_manager.mmap.mmap) as mock_mmap:
+            self.assertEqual(fresh_cache.get("json"), data)
+        mock_mmap.assert_called_once()
+
+    def test_failed_write_keeps_previous_file(self):
+        """Test zachowania poprzedniej zawartości pliku, gdy zapis się nie powiedzie."""
+        self.cache.set("klucz", {"wynik": 1})
+        with patch("LLM_Engine.cache_manager.os.replace", side_effect=OSError("dysk pełny")):
+            self.assertFalse(self.cache.set("klucz", {"wynik": 2}))
+
+        fresh_cache = CacheManager(self.temp_dir.name)
+        self.addCleanup(fresh_cache.close)
+        self.assertEqual(fresh_cache.get("klucz"), {"wynik": 1})
+        self.assertFalse([name for name in os.listdir(self.temp_dir.name) if name.endswith(".tmp")])
+
+    def test_memory_hit_skips_disk(self):
+        """Test odczytu powtarzanego klucza z pamięci bez otwierania pliku i bez kopiowania."""
+        data = {"wynik": [1, 2]}
+        self.cache.set("klucz", data)
+        # Zmiana obiektu przekazanego do set nie wpływa na zapamiętane dane
+        data["wynik"].append(3)
+        with patch("builtins.open") as mock_open:
+            first = self.cache.get("klucz")
+            self.assertEqual(first, {"wynik": [1, 2]})
+            self.assertIs(self.cache.get("klucz"), first)
+        mock_open.assert_not_called()
+
+    def test_memory_evicts_least_recently_used(self):
+        """Test usuwania z pamięci najdawniej używanych wpisów ponad limit."""
+        cache = CacheManager(self.temp_dir.name, memory_size=2)
+        self.addCleanup(cache.close)
+        for key in ("a", "b"):
+            cache.set(key, {"klucz": key})
+        cache.get("a")
+        cache.set("c", {"klucz": "c"})
+
+        remembered = set(cache._mem)
+        self.assertEqual(remembered, {cache._get_cache_file_path(key) for key in ("a", "c")})
+        # Wpis usunięty z pamięci nadal jest dostępny z dysku
+        self.assertEqual(cache.get("b"), {"klucz": "b"})
+
+    def test_memory_respects_max_age(self):
+        """Test pomijania przestarzałych wpisów pamięci podręcznej."""
+        self.cache.set("klucz", {"wynik": 1})
+        self.cache.max_age_seconds = -1
+        self.assertIsNone(self.cache.get("klucz"))
+        self.assertEqual(len(self.cache._mem), 0)
+
+    def test_clear_empties_memory(self):
+        """Test czyszczenia pamięci podręcznej razem z plikami."""
+        self.cache.set("klucz", {"wynik": 1})
+        self.assertTrue(self.cache.clear())
+        self.assertIsNone(self.cache.get("klucz"))
+
+    def test_clean_old_cache_uses_index(self):
+        """Test usuwania przestarzałych plików na podstawie indeksu, bez przeglądania katalogu."""
+        self.cache.set("stary", {"wynik": 1})
+        self.cache.set("nowy", {"wynik": 2})
+        self.cache._index.execute(
+            "UPDATE cache_index SET mtime = 0 WHERE file_name = ?",
+            (os.path.basename(self.cache._get_cache_file_path("stary")),)
+        )
+
+        with patch("os.listdir") as mock_listdir:
+            self.cache._clean_old_cache()
+        mock_listdir.assert_not_called()
+
+        self.assertFalse(os.path.exists(self.cache._get_cache_file_path("stary")))
+        self.assertTrue(os.path.exists(self.cache._get_cache_file_path("nowy")))
+
+    def test_index_created_for_existing_files(self):
+        """Test jednorazowego indeksowania plików zapisanych przed utworzeniem indeksu."""
+        self.cache.set("klucz", {"wynik": 1})
+        self.cache.close()
+        os.remove(os.path.join(self.temp_dir.name, cache_manager.CACHE_INDEX_FILE))
+
+        self.cache = CacheManager(self.temp_dir.name)
+        self.assertEqual(self.cache.get("klucz"), {"wynik": 1})
+
+    def test_md5_fallback_without_xxhash(self):
+        """Test haszowania kluczy przez MD5, gdy xxhash nie jest dostępny."""
+        with patch.object(cache_manager, "xxhash", None):
+            path = self.cache._get_cache_file_path("klucz")
+        expected = hashlib.md5("klucz".encode("utf-8")).hexdigest()
+        self.assertEqual(os.path.basename(path), f"{expected}.json")
+
+    @unittest.skipIf(cache_manager.xxhash is None, "xxhash nie jest zainstalowany")
+    def test_xxhash_file_names_are_versioned(self):
+        """Test prefiksu wersji w nazwach plików haszowanych przez xxhash."""
+        path = self.cache._get_cache_file_path("klucz")
+        self.assertTrue(os.path.basename(path).startswith("v2_"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,7 +15,9 @@ import json
 # Dodaj ścieżkę główną projektu do sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from Dashboard.dashboard import app
+from Dashboard.dashboard import (
+    app, init_app, invalidate_trade_ideas_cache, get_trades_df, jobs, run_trade_idea_job, MAX_TRACKED_JOBS
+)
 from Database.database import DatabaseHandler
 from tests.test_base_template import BASE_TEMPLATE
 
@@ -33,6 +35,8 @@ class TestDashboard(unittest.TestCase):
         # Mockowanie bazy danych
         self.mock_db_patcher = patch('Dashboard.dashboard.db_handler')
         self.mock_db = self.mock_db_patcher.start()
+        invalidate_trade_ideas_cache()
+        get_trades_df.cache_clear()
         
         # Mockowanie szablonów
         self.mock_template_patcher = patch('flask.templating._render')
@@ -57,14 +61,32 @@ class TestDashboard(unittest.TestCase):
         
     def test_statistics_page(self):
         """Test dostępu do strony statystyk."""
-        # Mockowanie get_trades
-        self.mock_db.get_trades.return_value = []
+        # Mockowanie get_stats
+        self.mock_db.get_stats.return_value = {
+            'total_trades': 0, 'winning_trades': 0, 'losing_trades': 0,
+            'total_profit': 0.0, 'total_loss': 0.0,
+            'largest_profit': 0.0, 'largest_loss': 0.0
+        }
         
         # Wykonanie zapytania
         response = self.client.get('/statistics')
         
         # Weryfikacja
         self.assertEqual(response.status_code, 200)
+        self.mock_db.get_stats.assert_called_once()
+    
+    def test_statistics_page_date_range(self):
+        """Test przekazania zakresu dat ze strony statystyk do bazy danych."""
+        self.mock_db.get_stats.return_value = {
+            'total_trades': 0, 'winning_trades': 0, 'losing_trades': 0,
+            'total_profit': 0.0, 'total_loss': 0.0,
+            'largest_profit': 0.0, 'largest_loss': 0.0
+        }
+        
+        response = self.client.get('/statistics?start_date=2023-01-01&end_date=2023-01-31')
+        
+        self.assertEqual(response.status_code, 200)
+        self.mock_db.get_stats.assert_called_once_with(start_date='2023-01-01', end_date='2023-01-31')
     
     def test_market_analysis_page(self):
         """Test dostępu do strony analiz rynkowych."""
@@ -80,7 +102,17 @@ class TestDashboard(unittest.TestCase):
     def test_trade_ideas_page(self):
         """Test dostępu do strony pomysłów handlowych."""
         # Mockowanie get_trade_ideas_paginated i get_trade_ideas_stats
-        self.mock_db.get_trade_ideas_paginated.return_value = (0, [])
+        self.mock_db.get_trade_ideas_paginated.return_value = {
+            'success': True,
+            'data': [],
+            'pagination': {
+                'items_per_page': 20,
+                'next_cursor': None,
+                'prev_cursor': None,
+                'total_items': 0,
+                'total_pages': 0
+            }
+        }
         self.mock_db.get_trade_ideas_stats.return_value = {
             'total': 0,
             'pending': 0,
@@ -179,6 +211,96 @@ class TestDashboard(unittest.TestCase):
         self.assertIn('equity', data[0])
         self.assertEqual(data[0]['equity'], 1100)
         
+    @patch('Dashboard.dashboard.mt5_executor')
+    def test_execute_trade_idea_queues_job(self, mock_executor):
+        """Test przekazania pomysłu handlowego do wykonania w tle."""
+        self.mock_db.get_trade_idea.return_value = {'id': 1, 'status': 'PENDING'}
+        
+        response = self.client.get('/execute_trade_idea/1')
+        
+        self.assertEqual(response.status_code, 302)
+        self.mock_db.update_trade_idea.assert_called_once_with(1, {'status': 'QUEUED'})
+        mock_executor.submit.assert_called_once()
+        
+        # Stan zadania jest dostępny przez API
+        job_id = mock_executor.submit.call_args[0][1]
+        job_response = self.client.get(f'/api/job/{job_id}')
+        self.assertEqual(job_response.status_code, 200)
+        self.assertEqual(json.loads(job_response.data)['status'], 'QUEUED')
+    
+    @patch('Dashboard.dashboard.mt5_executor')
+    def test_job_eviction_keeps_unfinished_jobs(self, mock_executor):
+        """Test usuwania z rejestru wyłącznie zakończonych zadań."""
+        self.addCleanup(jobs.clear)
+        jobs.clear()
+        for index in range(MAX_TRACKED_JOBS):
+            jobs[f'job{index}'] = {'id': f'job{index}', 'status': 'QUEUED' if index == 0 else 'EXECUTED'}
+        self.mock_db.get_trade_idea.return_value = {'id': 1, 'status': 'PENDING'}
+        
+        self.client.get('/execute_trade_idea/1')
+        
+        self.assertEqual(len(jobs), MAX_TRACKED_JOBS)
+        self.assertIn('job0', jobs)
+        self.assertNotIn('job1', jobs)
+    
+    @patch('Dashboard.dashboard.mt5_executor')
+    def test_job_eviction_below_limit_keeps_all_jobs(self, mock_executor):
+        """Test pozostawienia zakończonych zadań, gdy rejestr nie przekracza limitu."""
+        self.addCleanup(jobs.clear)
+        jobs.clear()
+        for index in range(60):
+            jobs[f'job{index}'] = {'id': f'job{index}', 'status': 'EXECUTED'}
+        self.mock_db.get_trade_idea.return_value = {'id': 1, 'status': 'PENDING'}
+        
+        self.client.get('/execute_trade_idea/1')
+        
+        self.assertEqual(len(jobs), 61)
+        self.assertIn('job0', jobs)
+    
+    def test_job_status_written_when_job_evicted(self):
+        """Test zapisu stanu końcowego pomysłu, gdy zadania nie ma już w rejestrze."""
+        order_processor = MagicMock()
+        order_processor.process_trade_idea.return_value = {'success': True}
+        
+        run_trade_idea_job('usuniete', 1, {'id': 1}, order_processor)
+        
+        self.mock_db.update_trade_idea.assert_called_with(1, {'status': 'EXECUTED'})
+    
+    def test_job_status_written_when_executing_update_fails(self):
+        """Test odrzucenia pomysłu, gdy nie udało się zapisać stanu EXECUTING."""
+        self.addCleanup(jobs.clear)
+        jobs['zadanie'] = {'id': 'zadanie', 'status': 'QUEUED', 'error': None}
+        self.mock_db.update_trade_idea.side_effect = [Exception('baza zablokowana'), True]
+        
+        run_trade_idea_job('zadanie', 1, {'id': 1}, MagicMock())
+        
+        self.assertEqual(jobs['zadanie']['status'], 'REJECTED')
+        self.mock_db.update_trade_idea.assert_called_with(
+            1, {'status': 'REJECTED', 'rejection_reason': 'baza zablokowana'})
+    
+    def test_job_status_not_found(self):
+        """Test API stanu zadania dla nieistniejącego zadania."""
+        response = self.client.get('/api/job/unknown')
+        self.assertEqual(response.status_code, 404)
+        
+    def test_mt5_services_registered_once(self):
+        """Test jednokrotnej rejestracji usług MT5 w aplikacji."""
+        services = app.extensions['mt5']
+        
+        self.assertIs(init_app(app), services)
+        self.assertIs(services.order_processor.mt5_connector, services.connector)
+        self.assertIs(services.risk_manager.mt5_connector, services.connector)
+        
+    def test_chart_image_accel_redirect(self):
+        """Test przekazania wysyłki wykresu do nginx przez X-Accel-Redirect."""
+        with patch.dict(app.config, {'CHARTS_ACCEL_PREFIX': '/protected_charts/'}):
+            response = self.client.get('/charts/abc123.png')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-Accel-Redirect'], '/protected_charts/abc123.png')
+        self.assertEqual(response.mimetype, 'image/png')
+        self.assertEqual(response.data, b'')
+        
     def test_add_trade_idea_form(self):
         """Test formularza dodawania pomysłu handlowego."""
         # Wykonanie zapytania GET
@@ -16,7 +16,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from Dashboard.dashboard import (
     status_badge_filter,
     status_label_filter,
-    datetime_filter
+    datetime_filter,
+    parse_iso_datetime
 )
 
 
@@ -57,6 +58,16 @@ class TestDashboardFilters(unittest.TestCase):
         self.assertEqual(datetime_filter(iso_str, '%Y-%m-%d'), '2023-05-15')
         self.assertEqual(datetime_filter(iso_str, '%H:%M'), '14:30')
 
+    def test_parse_iso_datetime_cached(self):
+        """Test buforowania wyników parsowania znaczników czasu."""
+        parse_iso_datetime.cache_clear()
+        first = parse_iso_datetime('2023-05-15T14:30:00Z')
+        second = parse_iso_datetime('2023-05-15T14:30:00Z')
+        
+        self.assertIs(first, second)
+        self.assertEqual(first, datetime(2023, 5, 15, 14, 30, tzinfo=timezone.utc))
+        self.assertEqual(parse_iso_datetime.cache_info().hits, 1)
+
     def test_datetime_filter_with_none(self):
         """Test filtra datetime_filter z None."""
         # Testowanie z None
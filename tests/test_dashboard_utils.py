@@ -5,11 +5,16 @@ Ten moduł zawiera testy sprawdzające poprawność działania funkcji pomocnicz
 używanych w aplikacji dashboardu.
 """
 
+import io
 import os
+import json
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
+import pandas as pd
+from werkzeug.datastructures import FileStorage, MultiDict
 
 # Dodaj ścieżkę główną projektu do sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,7 +22,16 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from Dashboard.dashboard import (
     calculate_statistics,
     calculate_equity_curve,
-    allowed_file
+    allowed_file,
+    save_chart_image,
+    parse_idea_form,
+    chart_thumbnail_name,
+    remove_chart_image,
+    stream_json_array,
+    app,
+    ttl_cache,
+    cached_page,
+    lttb_downsample
 )
 
 
@@ -125,6 +139,142 @@ class TestDashboardUtils(unittest.TestCase):
         self.assertIn('date', curve[1])
         self.assertIn('date', curve[2])
 
+    def test_calculate_equity_curve_from_dataframe(self):
+        """Test krzywej kapitału dla ramki danych z kolumną exit_time z bazy danych."""
+        trades = pd.DataFrame([
+            {'exit_time': '2023-01-02T10:00:00', 'profit_loss': -50.0},
+            {'exit_time': '2023-01-01T10:00:00', 'profit_loss': 100.0},
+            {'exit_time': None, 'profit_loss': None}
+        ])
+        
+        curve = calculate_equity_curve(trades)
+        
+        self.assertEqual([point['equity'] for point in curve], [1100, 1050])
+        self.assertEqual(curve[0]['date'], '2023-01-01T10:00:00')
+        self.assertEqual(calculate_equity_curve(pd.DataFrame()), [])
+
+    def test_parse_idea_form(self):
+        """Test przetwarzania formularza pomysłu handlowego."""
+        form = MultiDict({
+            'symbol': 'EURUSD',
+            'direction': 'SELL',
+            'entry_price': '1.1000',
+            'stop_loss': '1.1050',
+            'take_profit': '1.0900',
+            'valid_until': '2023-05-15T14:30'
+        })
+        
+        idea_data = parse_idea_form(form, MultiDict())
+        
+        self.assertEqual(idea_data['symbol'], 'EURUSD')
+        self.assertEqual(idea_data['entry_price'], 1.1)
+        self.assertEqual(idea_data['risk_percentage'], 1.0)
+        self.assertEqual(idea_data['risk_reward_ratio'], 2.0)
+        self.assertEqual(idea_data['valid_until'], '2023-05-15T14:30:00')
+        self.assertEqual(idea_data['notes'], '')
+        self.assertIsNone(idea_data['chart_image'])
+        
+        # Przy edycji bez nowego pliku zachowany jest dotychczasowy wykres
+        idea_data = parse_idea_form(form, MultiDict(), existing={'chart_image': 'abc.png'})
+        self.assertEqual(idea_data['chart_image'], 'abc.png')
+
+    def test_save_chart_image(self):
+        """Test zapisu wykresu pod unikalną nazwą bez plików tymczasowych."""
+        with tempfile.TemporaryDirectory() as upload_dir:
+            with patch.dict(app.config, {'UPLOAD_FOLDER': upload_dir}), \
+                    patch('Dashboard.dashboard.thumbnail_executor'):
+                file = FileStorage(stream=io.BytesIO(b'image'), filename='../My Chart.PNG')
+                filename = save_chart_image(file)
+            
+            self.assertRegex(filename, r'^[0-9a-f]{32}\.png$')
+            self.assertEqual(os.listdir(upload_dir), [filename])
+            with open(os.path.join(upload_dir, filename), 'rb') as f:
+                self.assertEqual(f.read(), b'image')
+
+    def test_remove_chart_image(self):
+        """Test usuwania wykresu razem z miniaturą."""
+        self.assertEqual(chart_thumbnail_name('abc.png'), 'abc_thumb.jpg')
+        
+        with tempfile.TemporaryDirectory() as upload_dir:
+            for name in ('abc.png', 'abc_thumb.jpg', 'other.png'):
+                open(os.path.join(upload_dir, name), 'wb').close()
+            
+            with patch.dict(app.config, {'UPLOAD_FOLDER': upload_dir}):
+                remove_chart_image('abc.png')
+                remove_chart_image('missing.png')  # Brak pliku nie powoduje błędu
+            
+            self.assertEqual(os.listdir(upload_dir), ['other.png'])
+
+    def test_stream_json_array(self):
+        """Test strumieniowego generowania tablicy JSON."""
+        items = [{'date': '2023-01-01', 'equity': 1100.0}, {'date': '2023-01-02', 'equity': 1050.0}]
+        
+        self.assertEqual(json.loads(''.join(stream_json_array(items))), items)
+        self.assertEqual(''.join(stream_json_array([])), '[]')
+
+    def test_ttl_cache(self):
+        """Test dekoratora ttl_cache buforującego wyniki funkcji."""
+        calls = []
+        
+        @ttl_cache(ttl=60)
+        def fetch(value):
+            calls.append(value)
+            return value * 2
+        
+        self.assertEqual(fetch(2), 4)
+        self.assertEqual(fetch(2), 4)
+        self.assertEqual(calls, [2])
+        
+        # Inny argument to osobny wpis
+        self.assertEqual(fetch(3), 6)
+        self.assertEqual(calls, [2, 3])
+        
+        # Po wyczyszczeniu bufora funkcja jest wywoływana ponownie
+        fetch.cache_clear()
+        fetch(2)
+        self.assertEqual(calls, [2, 3, 2])
+        
+        # Wpis wygasa po upływie ttl
+        with patch('Dashboard.dashboard.time.monotonic', return_value=10**9):
+            fetch(2)
+        self.assertEqual(calls, [2, 3, 2, 2])
+
+    def test_cached_page(self):
+        """Test buforowania wyrenderowanych stron według ścieżki i parametrów."""
+        calls = []
+        
+        @cached_page(ttl=60)
+        def view():
+            calls.append(1)
+            return f'page {len(calls)}'
+        
+        with app.test_request_context('/page?symbol=EURUSD'):
+            self.assertEqual(view(), 'page 1')
+            self.assertEqual(view(), 'page 1')
+        with app.test_request_context('/page?symbol=GBPUSD'):
+            self.assertEqual(view(), 'page 2')
+        
+        view.cache_clear()
+        with app.test_request_context('/page?symbol=EURUSD'):
+            self.assertEqual(view(), 'page 3')
+
+    def test_lttb_downsample(self):
+        """Test redukcji liczby punktów krzywej algorytmem LTTB."""
+        values = [0, 1, 0, 5, 0, 1, 0, 1, 0, -4, 0, 1]
+        
+        indices = lttb_downsample(values, 5)
+        
+        self.assertEqual(len(indices), 5)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], len(values) - 1)
+        self.assertTrue(all(a < b for a, b in zip(indices, indices[1:])))
+        # Ekstrema powinny zostać zachowane
+        self.assertIn(3, indices)
+        self.assertIn(9, indices)
+        
+        # Krótsze serie nie są redukowane
+        self.assertEqual(list(lttb_downsample(values, 20)), list(range(len(values))))
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -12,13 +12,16 @@ import logging
 from datetime import datetime
 import sqlite3
 from pathlib import Path
+import tempfile
 import unittest
+from unittest.mock import patch
 
 # Dodajemy główny katalog projektu do ścieżki importów
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Import modułu Database
-from Database.database import DatabaseHandler
+from Database.database import (DatabaseHandler, SQL_COMMENT_IDEA_ID, TRADE_IDEAS_EXTENDED_TABLE,
+                               TRADE_IDEA_COMMENTS_TABLE)
 
 # Konfiguracja loggera
 logging.basicConfig(level=logging.INFO,
@@ -47,14 +50,15 @@ class TestDatabaseHandler(unittest.TestCase):
             'market_analyses',
             'trade_ideas',
             'trades',
-            'system_logs'
+            'system_logs',
+            'trade_ideas_extended'
         ]
         
         self.db.connect()
         self.cursor = self.db.cursor
         
-        # Pobierz listę wszystkich tabel
-        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        # Pobierz listę wszystkich tabel (system_logs jest widokiem)
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")
         existing_tables = [row[0] for row in self.cursor.fetchall()]
         
         # Sprawdź czy wszystkie wymagane tabele istnieją
@@ -95,6 +99,41 @@ class TestDatabaseHandler(unittest.TestCase):
         self.assertEqual(result['analysis_data']['trend'], 'bullish')
         self.assertEqual(result['analysis_data']['strength'], 0.8)
 
+    def test_submit_market_analysis(self):
+        """Test zapisu analiz rynkowych przez wątek w tle."""
+        futures = [self.db.submit_market_analysis('EURUSD', 'H1', {'n': i}) for i in range(3)]
+        record_ids = [future.result(timeout=5) for future in futures]
+        
+        self.assertTrue(all(record_id > 0 for record_id in record_ids))
+        self.assertEqual(len(set(record_ids)), 3)
+        self.assertEqual(len(self.db.get_latest_analyses(symbol='EURUSD')), 3)
+        
+        with self.assertRaises(TypeError):
+            self.db.submit_market_analysis('EURUSD', 'H1', 'nie słownik')
+        
+        # Zamknięcie handlera zapisuje oczekujące analizy i zatrzymuje wątek
+        future = self.db.submit_market_analysis('GBPUSD', 'H4', {})
+        self.db.close()
+        self.assertGreater(future.result(timeout=0), 0)
+        self.assertIsNone(self.db._writer)
+
+    def test_latest_analysis_field(self):
+        """Test pobierania pojedynczego pola analizy funkcjami JSON SQLite."""
+        self.db.insert_market_analysis('EURUSD', 'H1', {'signal': 'buy', 'levels': {'support': 1.09}})
+        self.db.insert_market_analysis('GBPUSD', 'H1', {'signal': 'sell'})
+        
+        results = self.db.get_latest_analysis_field('$.signal', symbol='EURUSD')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['value'], 'buy')
+        self.assertEqual(
+            self.db.get_latest_analysis_field('$.levels.support', symbol='EURUSD')[0]['value'], 1.09)
+        
+        # Kolumna analysis_data przyjmuje wyłącznie poprawny JSON
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.cursor.execute(
+                "INSERT INTO market_analyses (symbol, timeframe, analysis_data) VALUES ('X', 'H1', '{x')")
+        self.db.conn.rollback()
+
     def test_trade_idea(self):
         """Test zapisu i odczytu pomysłu na handel."""
         # Najpierw zapisujemy analizę
@@ -162,6 +201,489 @@ class TestDatabaseHandler(unittest.TestCase):
         self.assertEqual(result['direction'], 'buy')
         self.assertEqual(result['entry_price'], 1.1000)
 
+    def test_trades_date_range(self):
+        """Test filtrowania transakcji po zakresie dat po stronie SQL."""
+        for day in (1, 10, 20):
+            self.db.insert_trade(
+                trade_idea_id=None,
+                symbol='EURUSD',
+                direction='buy',
+                entry_price=1.1000,
+                entry_time=datetime(2024, 1, day, 12, 0).isoformat(),
+                stop_loss=1.0950,
+                take_profit=1.1100,
+                volume=0.1
+            )
+        
+        results = self.db.get_trades(
+            limit=None,
+            start_date=datetime(2024, 1, 5).isoformat(),
+            end_date=datetime(2024, 1, 15).isoformat()
+        )
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0]['entry_time'].startswith('2024-01-10'))
+
+    def test_trade_ideas_indexes(self):
+        """Test indeksów używanych przy filtrowaniu i sortowaniu pomysłów handlowych."""
+        self.db.add_trade_idea({
+            'symbol': 'EURUSD',
+            'direction': 'BUY',
+            'entry_price': 1.1000,
+            'stop_loss': 1.0950,
+            'take_profit': 1.1100
+        })
+        
+        self.db.cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'trade_ideas_extended'")
+        indexes = {row[0] for row in self.db.cursor.fetchall()}
+        self.assertTrue({'idx_ti_created', 'idx_ti_status_created', 'idx_ti_symbol_created',
+                         'idx_ti_source_created'} <= indexes)
+        
+        self.db.cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM trade_ideas_extended WHERE status = ? ORDER BY created_at DESC",
+            ('PENDING',))
+        plan = ' '.join(row[3] for row in self.db.cursor.fetchall())
+        self.assertIn('idx_ti_status_created', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+        
+        self.db.cursor.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM trade_idea_comments WHERE trade_idea_id = ?", (1,))
+        plan = ' '.join(row[3] for row in self.db.cursor.fetchall())
+        self.assertIn('idx_tic_idea', plan)
+
+    def test_add_trade_idea_timestamps(self):
+        """Test uzupełniania znaczników czasu pomysłu handlowego przez bazę danych."""
+        before = datetime.now().replace(microsecond=0).isoformat()
+        result = self.db.add_trade_idea({
+            'symbol': 'EURUSD',
+            'direction': 'BUY',
+            'entry_price': 1.1000,
+            'stop_loss': 1.0950,
+            'take_profit': 1.1100,
+            'updated_at': '2024-01-01T00:00:00'
+        })
+        
+        idea = self.db.get_trade_idea(result['id'])
+        self.assertGreaterEqual(idea['created_at'], before)
+        self.assertEqual(datetime.fromisoformat(idea['created_at']).date(), datetime.now().date())
+        self.assertEqual(idea['updated_at'], '2024-01-01T00:00:00')
+        self.assertEqual(idea['status'], 'PENDING')
+
+    def test_add_trade_ideas_batch(self):
+        """Test zapisu wielu pomysłów handlowych jednym zapytaniem."""
+        base = {'direction': 'BUY', 'entry_price': 1.1, 'stop_loss': 1.09, 'take_profit': 1.12}
+        result = self.db.add_trade_ideas([
+            dict(base, symbol='EURUSD'),
+            dict(base, symbol='GBPUSD', status='EXECUTED', created_at='2024-01-01T00:00:00',
+                 unknown_field='x'),
+        ])
+        self.assertTrue(result['success'])
+        self.assertEqual(len(result['ids']), 2)
+        
+        first, second = (self.db.get_trade_idea(idea_id) for idea_id in result['ids'])
+        self.assertEqual((first['symbol'], first['status']), ('EURUSD', 'PENDING'))
+        self.assertEqual(datetime.fromisoformat(first['created_at']).date(), datetime.now().date())
+        self.assertEqual((second['status'], second['created_at']), ('EXECUTED', '2024-01-01T00:00:00'))
+        self.assertIsNotNone(second['updated_at'])
+        
+        self.assertFalse(self.db.add_trade_ideas([{'symbol': 'EURUSD'}])['success'])
+
+    def test_table_columns_cached(self):
+        """Test jednokrotnego odczytu kolumn tabeli przy kolejnych wstawieniach."""
+        idea = {'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1,
+                'stop_loss': 1.09, 'take_profit': 1.12, 'unknown_field': 'x'}
+        self.assertTrue(self.db.add_trade_idea(dict(idea))['success'])
+        self.assertIn('symbol', self.db._column_cache['trade_ideas_extended'])
+        
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            self.assertTrue(self.db.add_trade_idea(dict(idea))['success'])
+        finally:
+            self.db.conn.set_trace_callback(None)
+        self.assertFalse([sql for sql in statements if 'table_info' in sql])
+
+    def test_insert_sql_independent_of_key_order(self):
+        """Test identycznego tekstu zapytania dla pól podanych w różnej kolejności."""
+        idea = {'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1,
+                'stop_loss': 1.09, 'take_profit': 1.12}
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            self.db.add_trade_idea(dict(idea))
+            self.db.add_trade_idea(dict(reversed(list(idea.items()))))
+        finally:
+            self.db.conn.set_trace_callback(None)
+        inserts = [sql for sql in statements if 'INSERT INTO trade_ideas_extended' in sql]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(inserts[0], inserts[1])
+
+    def test_query_indexes(self):
+        """Test użycia indeksów przez zapytania filtrujące metod get_*."""
+        self.db.cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM system_logs WHERE level = ? AND module = ? "
+            "ORDER BY timestamp DESC LIMIT 10", ('INFO', 'test')
+        )
+        plan = " ".join(row[-1] for row in self.db.cursor.fetchall())
+        self.assertIn("idx_logs_level_module_ts", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        
+        self.db.cursor.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM market_analyses WHERE symbol = ? "
+            "ORDER BY timestamp DESC LIMIT 10", ('EURUSD',)
+        )
+        plan = " ".join(row[-1] for row in self.db.cursor.fetchall())
+        self.assertIn("idx_ma_symbol_ts", plan)
+
+    def test_trade_ideas_keyset_pagination(self):
+        """Test stronicowania pomysłów handlowych kursorem."""
+        for day in range(1, 6):
+            self.db.add_trade_idea({
+                'symbol': 'EURUSD',
+                'direction': 'BUY',
+                'entry_price': 1.1000,
+                'stop_loss': 1.0950,
+                'take_profit': 1.1100,
+                'created_at': datetime(2024, 1, day).isoformat()
+            })
+        
+        first = self.db.get_trade_ideas_paginated(items_per_page=2)
+        self.assertTrue(first['success'])
+        self.assertEqual([idea['id'] for idea in first['data']], [5, 4])
+        self.assertIsInstance(first['data'][0], sqlite3.Row)
+        self.assertIsNone(first['pagination']['prev_cursor'])
+        self.assertEqual(first['pagination']['total_items'], 5)
+        self.assertEqual(first['pagination']['total_pages'], 3)
+        
+        second = self.db.get_trade_ideas_paginated(
+            cursor=first['pagination']['next_cursor'], items_per_page=2)
+        self.assertEqual([idea['id'] for idea in second['data']], [3, 2])
+        
+        last = self.db.get_trade_ideas_paginated(
+            cursor=second['pagination']['next_cursor'], items_per_page=2)
+        self.assertEqual([idea['id'] for idea in last['data']], [1])
+        self.assertIsNone(last['pagination']['next_cursor'])
+        
+        # Powrót do poprzedniej strony
+        previous = self.db.get_trade_ideas_paginated(
+            cursor=last['pagination']['prev_cursor'], items_per_page=2, backwards=True)
+        self.assertEqual([idea['id'] for idea in previous['data']], [3, 2])
+        self.assertIsNotNone(previous['pagination']['prev_cursor'])
+        
+        # Nieznana kolumna sortowania zastępowana jest domyślną created_at
+        unknown = self.db.get_trade_ideas_paginated(items_per_page=2, sort_by="id; DROP TABLE trades")
+        self.assertTrue(unknown['success'])
+        self.assertEqual([idea['id'] for idea in unknown['data']], [5, 4])
+
+    def test_trade_ideas_pagination_across_null_values(self):
+        """Test stronicowania kursorem po kolumnie zawierającej wartości NULL w obu kierunkach."""
+        valid_until = [None, '2024-02-01', None, '2024-01-01', None]
+        for value in valid_until:
+            self.db.add_trade_idea({
+                'symbol': 'EURUSD',
+                'direction': 'BUY',
+                'entry_price': 1.1000,
+                'stop_loss': 1.0950,
+                'take_profit': 1.1100,
+                'valid_until': value
+            })
+        
+        # SQLite sortuje NULL jako najmniejsze: rosnąco na początku, malejąco na końcu
+        expected = {'ASC': [1, 3, 5, 4, 2], 'DESC': [2, 4, 5, 3, 1]}
+        for order, ids in expected.items():
+            pages = [self.db.get_trade_ideas_paginated(items_per_page=2, sort_by='valid_until', sort_order=order)]
+            while pages[-1]['pagination']['next_cursor']:
+                pages.append(self.db.get_trade_ideas_paginated(
+                    cursor=pages[-1]['pagination']['next_cursor'], items_per_page=2,
+                    sort_by='valid_until', sort_order=order))
+            self.assertEqual([idea['id'] for page in pages for idea in page['data']], ids, order)
+            
+            # Powrót wstecz od ostatniej strony przechodzi przez te same wiersze
+            previous = self.db.get_trade_ideas_paginated(
+                cursor=pages[-1]['pagination']['prev_cursor'], items_per_page=2,
+                sort_by='valid_until', sort_order=order, backwards=True)
+            self.assertEqual([idea['id'] for idea in previous['data']], ids[2:4], order)
+
+    def test_trade_ideas_cursor_rejected_for_other_sort(self):
+        """Test odrzucenia kursora utworzonego dla innej kolumny lub kierunku sortowania."""
+        for day in range(1, 4):
+            self.db.add_trade_idea({
+                'symbol': 'EURUSD',
+                'direction': 'BUY',
+                'entry_price': 1.1000,
+                'stop_loss': 1.0950,
+                'take_profit': 1.1100,
+                'created_at': datetime(2024, 1, day).isoformat()
+            })
+        
+        first = self.db.get_trade_ideas_paginated(items_per_page=2)
+        for sort_by, order in (('symbol', 'DESC'), ('created_at', 'ASC')):
+            result = self.db.get_trade_ideas_paginated(
+                cursor=first['pagination']['next_cursor'], items_per_page=2,
+                sort_by=sort_by, sort_order=order)
+            self.assertFalse(result['success'])
+            self.assertEqual(result['data'], [])
+
+    def test_trade_ideas_single_page_skips_count(self):
+        """Test pominięcia zapytania COUNT(*), gdy wszystkie pomysły mieszczą się na pierwszej stronie."""
+        for symbol in ('EURUSD', 'GBPUSD'):
+            self.db.add_trade_idea({'symbol': symbol, 'direction': 'BUY', 'entry_price': 1.1,
+                                    'stop_loss': 1.09, 'take_profit': 1.12})
+        
+        with patch.object(self.db, '_get_cached_count') as cached_count:
+            result = self.db.get_trade_ideas_paginated(items_per_page=10, filters={'symbol': 'EURUSD'})
+        cached_count.assert_not_called()
+        self.assertEqual(result['pagination']['total_items'], 1)
+        self.assertEqual(result['pagination']['total_pages'], 1)
+
+    def test_performance_by_symbol(self):
+        """Test agregacji wyników transakcji według symboli."""
+        for symbol, profit_loss in (('EURUSD', 100.0), ('EURUSD', -40.0), ('GBPUSD', 25.0)):
+            trade_id = self.db.insert_trade(
+                trade_idea_id=None,
+                symbol=symbol,
+                direction='buy',
+                entry_price=1.1000,
+                entry_time=datetime.now().isoformat(),
+                stop_loss=1.0950,
+                take_profit=1.1100,
+                volume=0.1
+            )
+            self.db.update_trade(trade_id, {'profit_loss': profit_loss})
+        
+        results = {row['symbol']: row for row in self.db.get_performance_by_symbol()}
+        self.assertEqual(results['EURUSD']['count'], 2)
+        self.assertAlmostEqual(results['EURUSD']['profit_loss'], 60.0)
+        self.assertEqual(results['GBPUSD']['count'], 1)
+        self.assertAlmostEqual(results['GBPUSD']['profit_loss'], 25.0)
+
+    def test_trade_stats_daily(self):
+        """Test utrzymywania dziennych agregatów transakcji przez triggery."""
+        trade_ids = []
+        for symbol, profit_loss in (('EURUSD', 100.0), ('EURUSD', -40.0), ('GBPUSD', 25.0)):
+            trade_id = self.db.insert_trade(
+                trade_idea_id=None,
+                symbol=symbol,
+                direction='buy',
+                entry_price=1.1000,
+                entry_time=datetime.now().isoformat(),
+                stop_loss=1.0950,
+                take_profit=1.1100,
+                volume=0.1
+            )
+            self.db.update_trade(trade_id, {'profit_loss': profit_loss})
+            trade_ids.append(trade_id)
+        
+        # Zmiana wyniku transakcji przelicza agregaty jej dnia
+        self.db.update_trade(trade_ids[0], {'profit_loss': 10.0})
+        
+        today = datetime.now().strftime('%Y-%m-%d')
+        stats = self.db.get_stats(start_date=today, end_date=today)
+        self.assertEqual(stats['total_trades'], 3)
+        self.assertEqual(stats['winning_trades'], 2)
+        self.assertEqual(stats['losing_trades'], 1)
+        self.assertAlmostEqual(stats['total_profit'], 35.0)
+        self.assertAlmostEqual(stats['total_loss'], 40.0)
+        self.assertAlmostEqual(stats['largest_profit'], 25.0)
+        self.assertAlmostEqual(stats['largest_loss'], 40.0)
+
+    def test_update_schema_user_version(self):
+        """Test zapisu wersji schematu w PRAGMA user_version."""
+        self.assertTrue(self.db.update_schema())
+        self.db.cursor.execute("PRAGMA user_version")
+        self.assertEqual(self.db.cursor.fetchone()[0], 4)
+        self.db.cursor.execute("SELECT name FROM sqlite_master WHERE name = 'schema_version'")
+        self.assertIsNone(self.db.cursor.fetchone())
+        
+        self.db.cursor.execute("SELECT COUNT(*) FROM system_parameters")
+        self.assertEqual(self.db.cursor.fetchone()[0], 5)
+        
+        # Ponowne wywołanie nie wykonuje migracji
+        self.assertTrue(self.db.update_schema())
+
+    def test_update_schema_legacy_version_table(self):
+        """Test przejęcia wersji z tabeli schema_version starszych baz danych."""
+        self.db.cursor.execute("CREATE TABLE schema_version (version INTEGER PRIMARY KEY)")
+        self.db.cursor.execute("INSERT INTO schema_version (version) VALUES (4)")
+        self.db.conn.commit()
+        
+        self.assertTrue(self.db.update_schema())
+        self.db.cursor.execute("PRAGMA user_version")
+        self.assertEqual(self.db.cursor.fetchone()[0], 4)
+        # Migracje nie zostały wykonane ponownie
+        self.db.cursor.execute("SELECT name FROM sqlite_master WHERE name = 'system_parameters'")
+        self.assertIsNone(self.db.cursor.fetchone())
+
+    def test_connection_pool(self):
+        """Test ponownego użycia połączeń z puli."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = DatabaseHandler(f"sqlite:///{temp_dir}/pool.db", auto_init=False, pool_size=2)
+            self.assertEqual(db.db_path, f"{temp_dir}/pool.db")
+            self.assertEqual(db.warm(5), 2)
+            
+            self.assertTrue(db.connect())
+            conn = db.conn
+            db.disconnect()
+            self.assertTrue(db.connect())
+            self.assertIs(db.conn, conn)
+            db.disconnect()
+
+    def test_connection_persists_between_queries(self):
+        """Test utrzymania jednego połączenia między zapytaniami."""
+        conn = self.db.conn
+        self.db.get_logs()
+        self.db.get_trades()
+        self.assertIs(self.db.conn, conn)
+        
+        # Zapis po odczycie korzysta z tego samego połączenia
+        self.assertGreater(self.db.insert_log('INFO', 'test', 'po odczycie'), 0)
+        
+        self.db.close()
+        self.assertIsNone(self.db.conn)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_connection_pragmas(self):
+        """Test ustawień połączenia z plikową bazą danych."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = DatabaseHandler(os.path.join(temp_dir, "pragmas.db"), auto_init=False)
+            self.assertTrue(db.connect())
+            
+            pragma = lambda name: db.conn.execute(f"PRAGMA {name}").fetchone()[0]
+            self.assertEqual(pragma("journal_mode"), "wal")
+            self.assertEqual(pragma("synchronous"), 1)
+            self.assertEqual(pragma("foreign_keys"), 1)
+            self.assertEqual(pragma("cache_size"), -64000)
+            self.assertEqual(pragma("temp_store"), 2)
+            self.assertEqual(pragma("mmap_size"), 268435456)
+            db.disconnect()
+            
+            # Połączenia przygotowane w puli otrzymują te same ustawienia
+            pooled = DatabaseHandler(os.path.join(temp_dir, "pragmas.db"), auto_init=False, pool_size=1)
+            self.assertEqual(pooled.warm(1), 1)
+            self.assertTrue(pooled.connect())
+            self.assertEqual(pooled.conn.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+            pooled.close()
+            db.close()
+
+    def test_transaction(self):
+        """Test zapisu analizy, idei i transakcji w jednej transakcji bazy danych."""
+        with self.db.transaction():
+            analysis_id = self.db.insert_market_analysis('EURUSD', 'H1', {'trend': 'up'}, commit=False)
+            idea_id = self.db.insert_trade_idea(analysis_id, 'EURUSD', 'buy', 1.1, 1.09, 1.12, 2.0,
+                                                commit=False)
+            self.db.insert_trade(idea_id, 'EURUSD', 'buy', 1.1, datetime.now().isoformat(),
+                                 1.09, 1.12, 0.1, commit=False)
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertEqual(len(self.db.get_trades()), 1)
+        
+        # Błąd w kontekście wycofuje wszystkie zapisy
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db.transaction():
+                self.db.insert_market_analysis('GBPUSD', 'H1', {}, commit=False)
+                self.db.insert_trade(None, None, 'buy', 1.1, datetime.now().isoformat(),
+                                     1.09, 1.12, 0.1, commit=False)
+        self.assertEqual(self.db.get_latest_analyses(symbol='GBPUSD'), [])
+
+    def test_bulk_writes(self):
+        """Test zapisu wielu transakcji testowych jednym commitem."""
+        trade = {'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1,
+                 'entry_time': datetime.now().isoformat(), 'volume': 0.1}
+        with self.db.bulk_writes():
+            ids = [self.db.mock_add_trade(dict(trade)) for _ in range(3)]
+            self.assertTrue(self.db.conn.in_transaction)
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertEqual(len(set(ids)), 3)
+        self.assertEqual(len(self.db.get_trades()), 3)
+        
+        # Błąd jednego zapisu wycofuje całą partię
+        with self.assertRaises(sqlite3.IntegrityError):
+            with self.db.bulk_writes():
+                self.db.mock_add_trade(dict(trade))
+                self.db.mock_add_trade({'symbol': 'EURUSD'})
+        self.assertFalse(self.db._in_bulk)
+        self.assertEqual(len(self.db.get_trades()), 3)
+
+    def test_batch_trades_and_comments(self):
+        """Test zapisu wielu transakcji testowych i komentarzy jednym zapytaniem."""
+        now = datetime.now().isoformat()
+        trade_ids = self.db.mock_add_trades([
+            {'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1, 'entry_time': now, 'volume': 0.1},
+            {'symbol': 'GBPUSD', 'direction': 'SELL', 'entry_price': 1.3, 'entry_time': now, 'volume': 0.2,
+             'comment': 'test', 'unknown_field': 'x'},
+        ])
+        self.assertEqual(len(trade_ids), 2)
+        trades = {trade['id']: trade for trade in self.db.get_trades()}
+        self.assertEqual(sorted(trades), list(trade_ids))
+        self.assertEqual(trades[trade_ids[0]]['status'], 'OPEN')
+        self.assertIsNone(trades[trade_ids[0]]['comment'])
+        self.assertEqual(trades[trade_ids[1]]['comment'], 'test')
+        
+        idea_id = self.db.add_trade_idea({'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1,
+                                          'stop_loss': 1.09, 'take_profit': 1.12})['id']
+        comment_ids = self.db.add_trade_idea_comments([
+            {'trade_idea_id': idea_id, 'content': 'a'},
+            {'trade_idea_id': idea_id, 'content': 'b', 'author': 'tester'},
+        ])
+        self.assertEqual(list(comment_ids), [1, 2])
+        
+        # Błąd wycofuje całą partię
+        self.assertEqual(self.db.mock_add_trades([{'symbol': 'EURUSD'}]), range(0))
+        self.assertEqual(len(self.db.get_trades()), 2)
+
+    def test_trades_by_idea_id(self):
+        """Test wyszukiwania transakcji pomysłu handlowego po komentarzu przez indeks."""
+        base = {'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1, 'volume': 0.1}
+        self.db.mock_add_trades([
+            dict(base, entry_time='2024-01-01T10:00:00', comment='LLM_TradeIdea_1'),
+            dict(base, entry_time='2024-01-02T10:00:00', comment='LLM_TradeIdea_1[sl]'),
+            dict(base, entry_time='2024-01-03T10:00:00', comment='LLM_TradeIdea_12'),
+            dict(base, entry_time='2024-01-04T10:00:00', comment='1'),
+        ])
+        
+        trades = self.db.get_trades_by_idea_id(1)
+        self.assertEqual([t['comment'] for t in trades], ['LLM_TradeIdea_1[sl]', 'LLM_TradeIdea_1'])
+        
+        self.db.cursor.execute(
+            f"EXPLAIN QUERY PLAN SELECT * FROM trades WHERE {SQL_COMMENT_IDEA_ID} = ? "
+            "ORDER BY entry_time DESC", (1,))
+        plan = ' '.join(row[3] for row in self.db.cursor.fetchall())
+        self.assertIn('idx_trades_comment_idea', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_update_trade_idea_skips_unchanged(self):
+        """Test pomijania zapisu pomysłu handlowego, gdy dane się nie zmieniają."""
+        idea_id = self.db.add_trade_idea({'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1,
+                                          'stop_loss': 1.09, 'take_profit': 1.12,
+                                          'updated_at': '2024-01-01T00:00:00'})['id']
+        
+        self.assertTrue(self.db.update_trade_idea(idea_id, {}))
+        self.assertTrue(self.db.update_trade_idea(idea_id, {'status': 'PENDING'}))
+        self.assertEqual(self.db.get_trade_idea(idea_id)['updated_at'], '2024-01-01T00:00:00')
+        
+        self.assertTrue(self.db.update_trade_idea(idea_id, {'status': 'EXECUTED'}))
+        idea = self.db.get_trade_idea(idea_id)
+        self.assertEqual(idea['status'], 'EXECUTED')
+        self.assertNotEqual(idea['updated_at'], '2024-01-01T00:00:00')
+        
+        self.assertFalse(self.db.update_trade_idea(idea_id + 1, {'status': 'EXECUTED'}))
+
+    def test_trade_ideas_stats(self):
+        """Test statystyk pomysłów handlowych według wymiarów."""
+        base = {'direction': 'BUY', 'entry_price': 1.1, 'stop_loss': 1.09, 'take_profit': 1.12}
+        for symbol, status, source in (('EURUSD', 'PENDING', 'llm'), ('EURUSD', 'EXECUTED', None),
+                                       ('GBPUSD', 'PENDING', 'llm')):
+            self.db.add_trade_idea(dict(base, symbol=symbol, status=status, source=source))
+        self.db.add_trade_idea(dict(base, symbol='USDJPY', direction='SELL'))
+        
+        stats = self.db.get_trade_ideas_stats()
+        self.assertTrue(stats['success'])
+        self.assertEqual(stats['total_count'], 4)
+        self.assertEqual(stats['by_status'], {'PENDING': 3, 'EXECUTED': 1})
+        self.assertEqual(stats['by_symbol'], {'EURUSD': 2, 'GBPUSD': 1, 'USDJPY': 1})
+        self.assertEqual(stats['by_direction'], {'BUY': 3, 'SELL': 1})
+        self.assertEqual(stats['by_source'], {'llm': 2})
+
     def test_logs(self):
         """Test zapisu i odczytu logów."""
         # Zapis logu
@@ -180,6 +702,103 @@ class TestDatabaseHandler(unittest.TestCase):
         self.assertEqual(result['module'], 'test')
         self.assertEqual(result['message'], 'Test log')
 
+    def test_iter_logs(self):
+        """Test strumieniowego pobierania logów porcjami."""
+        self.db.insert_logs_batch([('INFO', 'export', f'log {i}') for i in range(25)])
+        self.db.insert_log('ERROR', 'other', 'inny')
+        
+        with patch('Database.database.LOG_FETCH_SIZE', 10):
+            logs = self.db.iter_logs(module='export')
+            first = next(logs)
+            # Inne zapytania mogą być wykonywane w trakcie iteracji
+            self.assertEqual(len(self.db.get_logs(level='ERROR')), 1)
+            rest = list(logs)
+        
+        self.assertEqual(first['module'], 'export')
+        self.assertEqual(len(rest) + 1, 25)
+        self.assertEqual(len(list(self.db.iter_logs(limit=5))), 5)
+
+    def test_logs_lookup_tables(self):
+        """Test przechowywania poziomów i modułów logów jako identyfikatorów słowników."""
+        self.db.insert_log('INFO', 'engine', 'a')
+        self.db.insert_logs_batch([('INFO', 'engine', 'b'), ('ERROR', 'mt5', 'c')])
+        
+        self.db.cursor.execute("SELECT COUNT(*) FROM log_levels")
+        self.assertEqual(self.db.cursor.fetchone()[0], 2)
+        self.db.cursor.execute("SELECT COUNT(*) FROM log_modules")
+        self.assertEqual(self.db.cursor.fetchone()[0], 2)
+        messages = [log['message'] for log in self.db.get_logs(level='INFO', module='engine')]
+        self.assertEqual(sorted(messages), ['a', 'b'])
+        self.assertEqual(self.db.get_logs(level='ERROR')[0]['module'], 'mt5')
+
+    def test_legacy_system_logs_migrated(self):
+        """Test przeniesienia logów z dawnej tabeli system_logs."""
+        db = DatabaseHandler(":memory:", auto_init=False)
+        self.assertTrue(db.connect())
+        db.cursor.execute('''
+        CREATE TABLE system_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            level TEXT NOT NULL,
+            module TEXT NOT NULL,
+            message TEXT NOT NULL,
+            timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+        db.cursor.execute("INSERT INTO system_logs (level, module, message) VALUES ('WARNING', 'old', 'stary log')")
+        db.conn.commit()
+        
+        self.assertTrue(db.init_database())
+        logs = db.get_logs()
+        self.assertEqual(len(logs), 1)
+        self.assertEqual((logs[0]['level'], logs[0]['module'], logs[0]['message']),
+                         ('WARNING', 'old', 'stary log'))
+        db.close()
+
+    def test_delete_trade_idea_cascades_comments(self):
+        """Test usuwania komentarzy razem z pomysłem handlowym."""
+        idea_id = self.db.add_trade_idea({'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1,
+                                          'stop_loss': 1.09, 'take_profit': 1.12})['id']
+        self.db.add_trade_idea_comments([{'trade_idea_id': idea_id, 'content': 'a'},
+                                         {'trade_idea_id': idea_id, 'content': 'b'}])
+        
+        self.assertTrue(self.db.delete_trade_idea(idea_id))
+        self.db.cursor.execute("SELECT COUNT(*) FROM trade_idea_comments")
+        self.assertEqual(self.db.cursor.fetchone()[0], 0)
+        self.assertFalse(self.db.delete_trade_idea(idea_id))
+
+    def test_legacy_trade_idea_comments_rebuilt(self):
+        """Test przebudowy dawnej tabeli komentarzy bez ON DELETE CASCADE."""
+        db = DatabaseHandler(":memory:", auto_init=False)
+        self.assertTrue(db.connect())
+        db.cursor.execute(TRADE_IDEAS_EXTENDED_TABLE)
+        db.cursor.execute(TRADE_IDEA_COMMENTS_TABLE.replace(" ON DELETE CASCADE", ""))
+        db.conn.commit()
+        idea_id = db.add_trade_idea({'symbol': 'EURUSD', 'direction': 'BUY', 'entry_price': 1.1,
+                                     'stop_loss': 1.09, 'take_profit': 1.12})['id']
+        db.add_trade_idea_comment({'trade_idea_id': idea_id, 'content': 'stary komentarz'})
+        
+        self.assertTrue(db.init_database())
+        db.cursor.execute("PRAGMA foreign_key_list(trade_idea_comments)")
+        self.assertEqual(db.cursor.fetchone()['on_delete'], 'CASCADE')
+        db.cursor.execute("SELECT content FROM trade_idea_comments")
+        self.assertEqual([row[0] for row in db.cursor.fetchall()], ['stary komentarz'])
+        
+        self.assertTrue(db.delete_trade_idea(idea_id))
+        db.close()
+
+    def test_batch_inserts(self):
+        """Test zapisu partii logów i analiz rynkowych w jednej transakcji."""
+        rows = [('INFO', 'batch', f'log {i}') for i in range(50)]
+        self.assertEqual(self.db.insert_logs_batch(rows), 50)
+        self.assertEqual(self.db.insert_logs_batch([]), 0)
+        self.assertEqual(len(self.db.get_logs(module='batch', limit=100)), 50)
+        
+        analyses = [('EURUSD', 'H1', {'trend': 'up'}), ('GBPUSD', 'H4', {'trend': 'down'})]
+        self.assertEqual(self.db.insert_market_analyses_batch(analyses), 2)
+        latest = self.db.get_latest_analyses(symbol='GBPUSD')
+        self.assertEqual(latest[0]['analysis_data'], {'trend': 'down'})
+
     def test_statistics(self):
         """Test pobierania statystyk."""
         # Najpierw dodajemy kilka transakcji
@@ -217,6 +836,31 @@ class TestDatabaseHandler(unittest.TestCase):
         self.assertIsInstance(stats, dict)
         self.assertIn('total_trades', stats)
         self.assertEqual(stats['total_trades'], 3)
+        self.assertEqual(stats['analyses_count'], 1)
+        self.assertEqual(stats['trade_ideas_count'], 1)
+        self.assertEqual(stats['open_trades'], 3)
+
+    def test_clear_database(self):
+        """Test czyszczenia bazy danych z zachowaniem struktury, indeksów i triggerów."""
+        analysis_id = self.db.insert_market_analysis('EURUSD', 'H1', {'trend': 'up'})
+        idea_id = self.db.insert_trade_idea(analysis_id, 'EURUSD', 'buy', 1.1, 1.09, 1.12, 2.0)
+        self.db.insert_trade(idea_id, 'EURUSD', 'buy', 1.1, datetime.now().isoformat(), 1.09, 1.12, 0.1)
+        self.db.insert_log('INFO', 'test', 'log')
+        
+        self.assertTrue(self.db.clear_database())
+        
+        for table in ('trades', 'trade_stats_daily', 'trade_ideas', 'market_analyses', 'system_logs'):
+            self.db.cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            self.assertEqual(self.db.cursor.fetchone()[0], 0, table)
+        self.db.cursor.execute("PRAGMA foreign_keys")
+        self.assertEqual(self.db.cursor.fetchone()[0], 1)
+        self.db.cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger'")
+        self.assertEqual(self.db.cursor.fetchone()[0], 3)
+        
+        # Triggery agregatów działają po odtworzeniu tabel
+        self.db.insert_trade(None, 'EURUSD', 'buy', 1.1, datetime.now().isoformat(), 1.09, 1.12, 0.1)
+        self.db.cursor.execute("SELECT trades FROM trade_stats_daily")
+        self.assertEqual(self.db.cursor.fetchone()[0], 1)
 
     def test_error_handling(self):
         """Test obsługi błędów."""
@@ -20,6 +20,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from LLM_Engine.llm_engine import LLMEngine
 from LLM_Engine.technical_indicators import TechnicalIndicators
+from LLM_Engine import advanced_indicators
 from LLM_Engine.advanced_indicators import AdvancedIndicators
 from LLM_Engine.response_parser import ResponseParserFactory
 from LLM_Engine.market_analyzer import MarketAnalyzer
@@ -152,6 +153,81 @@ class TestAdvancedIndicators(unittest.TestCase):
             if not pd.isna(atr_5[i]):
                 self.assertGreaterEqual(atr_5[i], 0)
     
+    def test_atr_matches_reference(self):
+        """Test zgodności ATR z obliczeniem referencyjnym w pandas."""
+        atr_5 = self.ai.calculate_atr(self.highs, self.lows, self.closes, 5)
+        
+        prev_close = self.closes.shift(1)
+        true_range = pd.concat([self.highs - self.lows, (self.highs - prev_close).abs(),
+                                (self.lows - prev_close).abs()], axis=1).max(axis=1)
+        expected = true_range.ewm(span=5, adjust=False).mean()
+        np.testing.assert_allclose(atr_5.to_numpy(), expected.to_numpy())
+        self.assertTrue(atr_5.index.equals(self.closes.index))
+
+        # Ścieżka bez numba daje te same wyniki (bez wyniku zapamiętanego przez pierwsze wywołanie)
+        self.ai.clear_atr_cache()
+        with patch('LLM_Engine.advanced_indicators.njit', None):
+            fallback = self.ai.calculate_atr(self.highs, self.lows, self.closes, 5)
+        np.testing.assert_allclose(fallback.to_numpy(), expected.to_numpy())
+    
+    def _series_with_gap(self):
+        """Zwraca 100 świec z brakującą wartością high (przerwa w danych z MT5)."""
+        rng = np.random.RandomState(0)
+        closes = pd.Series(1.1 + np.cumsum(rng.normal(0, 0.001, 100)))
+        highs = closes + 0.0005 + rng.rand(100) * 0.001
+        lows = closes - 0.0005 - rng.rand(100) * 0.001
+        highs.iloc[10] = np.nan
+        return highs, lows, closes
+    
+    def test_atr_with_missing_values_matches_fallback(self):
+        """Test zgodności jąder numba z obliczeniem NumPy/pandas dla danych z NaN."""
+        highs, lows, closes = self._series_with_gap()
+        atr = self.ai.calculate_atr(highs, lows, closes, 14)
+        self.ai.clear_atr_cache()
+        with patch('LLM_Engine.advanced_indicators.njit', None):
+            fallback = self.ai.calculate_atr(highs, lows, closes, 14).to_numpy()
+        
+        # Jądra wywoływane bezpośrednio (bez numba działają jako zwykłe funkcje Pythona)
+        true_range = np.empty(len(closes))
+        advanced_indicators._true_range(highs.to_numpy(), lows.to_numpy(), closes.to_numpy(), true_range)
+        kernel = np.empty_like(true_range)
+        advanced_indicators._ewma(true_range, 2.0 / 15, kernel)
+        
+        self.assertFalse(np.isnan(fallback).any())
+        np.testing.assert_allclose(atr.to_numpy(), fallback)
+        np.testing.assert_allclose(kernel, fallback)
+    
+    def test_atr_reused_for_same_series(self):
+        """Test ponownego użycia ATR obliczonego wcześniej dla tych samych serii."""
+        atr = self.ai.calculate_atr(self.highs, self.lows, self.closes, 5)
+        atr.iloc[:] = 0.0
+
+        with patch.object(self.ai, '_atr_values', wraps=self.ai._atr_values) as mock_atr:
+            again = self.ai.calculate_atr(self.highs, self.lows, self.closes, 5)
+            with patch('LLM_Engine.advanced_indicators.njit', None):
+                self.ai.calculate_adx(self.highs, self.lows, self.closes, 5)
+        mock_atr.assert_not_called()
+        self.assertTrue((again > 0).all())
+
+        self.ai.clear_atr_cache()
+        with patch.object(self.ai, '_atr_values', wraps=self.ai._atr_values) as mock_atr:
+            self.ai.calculate_atr(self.highs, self.lows, self.closes, 5)
+        mock_atr.assert_called_once()
+
+    def test_atr_recomputed_after_last_candle_update(self):
+        """Test ponownego obliczenia ATR po nadpisaniu ostatniej świecy w miejscu."""
+        highs, lows, closes = self.highs.copy(), self.lows.copy(), self.closes.copy()
+        before = self.ai.calculate_atr(highs, lows, closes, 5)
+        
+        highs.iloc[-1] += 1.0
+        closes.iloc[-1] += 0.5
+        after = self.ai.calculate_atr(highs, lows, closes, 5)
+        
+        self.ai.clear_atr_cache()
+        expected = self.ai.calculate_atr(highs, lows, closes, 5)
+        np.testing.assert_allclose(after.to_numpy(), expected.to_numpy())
+        self.assertGreater(after.iloc[-1], before.iloc[-1])
+
     def test_adx_calculation(self):
         """Test obliczania Average Directional Index."""
         adx, plus_di, minus_di = self.ai.calculate_adx(self.highs, self.lows, self.closes, 5)
@@ -179,6 +255,59 @@ class TestAdvancedIndicators(unittest.TestCase):
                 self.assertGreaterEqual(minus_di[i], 0)
                 self.assertLessEqual(minus_di[i], 100)
     
+    def test_adx_matches_reference(self):
+        """Test zgodności ADX, DI+ i DI- z obliczeniem referencyjnym w pandas."""
+        period = 3
+        adx, plus_di, minus_di = self.ai.calculate_adx(self.highs, self.lows, self.closes, period)
+        
+        prev_close = self.closes.shift(1)
+        true_range = pd.concat([self.highs - self.lows, (self.highs - prev_close).abs(),
+                                (self.lows - prev_close).abs()], axis=1).max(axis=1)
+        atr = true_range.ewm(span=period, adjust=False).mean()
+        high_diff = self.highs.diff()
+        low_diff = self.lows.diff()
+        plus_dm = high_diff.where((high_diff > low_diff.abs()) & (high_diff > 0), 0)
+        minus_dm = low_diff.abs().where((low_diff.abs() > high_diff) & (low_diff < 0), 0)
+        expected_plus = 100 * plus_dm.ewm(span=period, adjust=False).mean() / atr
+        expected_minus = 100 * minus_dm.ewm(span=period, adjust=False).mean() / atr
+        dx = 100 * (expected_plus - expected_minus).abs() / (expected_plus + expected_minus)
+        expected_adx = dx.ewm(span=period, adjust=False).mean()
+        valid = expected_adx.notna()
+        
+        np.testing.assert_allclose(adx.to_numpy(), expected_adx.to_numpy())
+        np.testing.assert_allclose(plus_di[valid].to_numpy(), expected_plus[valid].to_numpy())
+        np.testing.assert_allclose(minus_di[valid].to_numpy(), expected_minus[valid].to_numpy())
+        self.assertTrue(plus_di[~valid].isna().all())
+
+        # Ścieżka bez numba daje te same wyniki (bez wyniku zapamiętanego przez pierwsze wywołanie)
+        self.ai.clear_atr_cache()
+        with patch('LLM_Engine.advanced_indicators.njit', None):
+            fallback = self.ai.calculate_adx(self.highs, self.lows, self.closes, period)
+        for result, expected in zip(fallback, (adx, plus_di, minus_di)):
+            np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+
+    def test_adx_with_missing_values_matches_fallback(self):
+        """Test zgodności jądra ADX z obliczeniem NumPy/pandas dla danych z NaN."""
+        highs, lows, closes = self._series_with_gap()
+        results = self.ai.calculate_adx(highs, lows, closes, 14)
+        self.ai.clear_atr_cache()
+        with patch('LLM_Engine.advanced_indicators.njit', None):
+            fallback = [series.to_numpy() for series in self.ai.calculate_adx(highs, lows, closes, 14)]
+        
+        # Jądro wywoływane bezpośrednio na ATR z pominięciem NaN
+        atr = self.ai.calculate_atr(highs, lows, closes, 14).to_numpy()
+        kernel = [np.empty(len(closes)) for _ in range(3)]
+        advanced_indicators._adx(highs.to_numpy(), lows.to_numpy(), atr, 2.0 / 15, *kernel)
+        
+        # Po przerwie w danych DI mają wartości, a ADX nie zatrzymuje się na stałej
+        adx, plus_di, minus_di = fallback
+        self.assertFalse(np.isnan(plus_di[-20:]).any())
+        self.assertFalse(np.isnan(minus_di[-20:]).any())
+        self.assertGreater(len(np.unique(adx[-5:])), 1)
+        for result, computed, expected in zip(results, kernel, fallback):
+            np.testing.assert_allclose(result.to_numpy(), expected)
+            np.testing.assert_allclose(computed, expected)
+    
     def test_stochastic_calculation(self):
         """Test obliczania oscylatora stochastycznego."""
         k, d = self.ai.calculate_stochastic(self.highs, self.lows, self.closes)
@@ -196,7 +325,23 @@ class TestAdvancedIndicators(unittest.TestCase):
             if not pd.isna(d[i]):
                 self.assertGreaterEqual(d[i], 0)
                 self.assertLessEqual(d[i], 100)
-    
+
+    def test_rolling_range_matches_reference(self):
+        """Test zgodności kroczących ekstremów (Stochastic, Ichimoku) z pandas, także przy NaN."""
+        highs = self.highs.copy()
+        highs[4] = np.nan
+        highest, lowest = self.ai._rolling_range(highs.to_numpy(), self.lows.to_numpy(), 3)
+
+        np.testing.assert_array_equal(highest, highs.rolling(window=3).max().to_numpy())
+        np.testing.assert_array_equal(lowest, self.lows.rolling(window=3).min().to_numpy())
+
+        ichimoku = self.ai.calculate_ichimoku(self.highs, self.lows, self.closes, 2, 3, 4)
+        expected_tenkan = (self.highs.rolling(window=2).max() + self.lows.rolling(window=2).min()) / 2
+        pd.testing.assert_series_equal(ichimoku['tenkan_sen'], expected_tenkan)
+        pd.testing.assert_series_equal(ichimoku['senkou_span_a'].iloc[:4],
+                                       pd.Series([np.nan] * 4, index=self.closes.index[:4]))
+        pd.testing.assert_series_equal(ichimoku['chikou_span'], self.closes.shift(-3))
+
     def test_fibonacci_retracement(self):
         """Test obliczania poziomów zniesienia Fibonacciego."""
         fib_levels = self.ai.calculate_fibonacci_retracement(1.1500, 1.1000)
@@ -215,6 +360,15 @@ class TestAdvancedIndicators(unittest.TestCase):
         self.assertAlmostEqual(fib_levels['0.5'], 1.1250)
         self.assertEqual(fib_levels['1.0'], 1.1500)
 
+    def test_fibonacci_retracement_batch(self):
+        """Test obliczania poziomów zniesienia Fibonacciego dla wielu par naraz."""
+        levels = self.ai.calculate_fibonacci_retracement_batch([1.1500, 1.2000], [1.1000, 1.1800])
+
+        self.assertEqual(levels.shape, (2, 7))
+        for row, (high, low) in zip(levels, [(1.1500, 1.1000), (1.2000, 1.1800)]):
+            expected = self.ai.calculate_fibonacci_retracement(high, low)
+            np.testing.assert_allclose(row, list(expected.values()))
+
 
 class TestResponseParser(ResponseParserFactory):
     def parse(self, response: str) -> Dict[str, Any]:
@@ -0,0 +1,125 @@
+"""
+Testy dla modułu logging_config.py konfigurującego system logowania.
+"""
+
+import os
+import sys
+import logging
+import sqlite3
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Dodanie ścieżki głównego katalogu projektu do PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Common.logging_config import SamplingFilter, DatabaseLogHandler, get_logger
+
+
+class TestSamplingFilter(unittest.TestCase):
+    """Testy dla filtra próbkującego rekordy logowania."""
+
+    def _record(self, level):
+        return logging.LogRecord("test", level, __file__, 1, "msg", None, None)
+
+    def test_samples_low_level_records(self):
+        """Test przepuszczania wszystkich rekordów INFO i co n-tego rekordu DEBUG."""
+        sampling_filter = SamplingFilter(0.1)
+        passed_info = [sampling_filter.filter(self._record(logging.INFO)) for _ in range(100)]
+        passed_debug = [sampling_filter.filter(self._record(logging.DEBUG)) for _ in range(100)]
+        self.assertTrue(all(passed_info))
+        self.assertEqual(sum(passed_debug), 10)
+
+    def test_always_passes_warnings(self):
+        """Test przepuszczania wszystkich rekordów WARNING i wyższych."""
+        sampling_filter = SamplingFilter(0.01)
+        for level in (logging.WARNING, logging.ERROR, logging.CRITICAL):
+            self.assertTrue(sampling_filter.filter(self._record(level)))
+
+    def test_invalid_rate(self):
+        """Test odrzucenia nieprawidłowego współczynnika próbkowania."""
+        with self.assertRaises(ValueError):
+            SamplingFilter(0)
+        with self.assertRaises(ValueError):
+            SamplingFilter(1.5)
+
+    def test_filter_attached_to_db_handler_only(self):
+        """Test dodania filtra wyłącznie do handlera bazy danych."""
+        logger = get_logger("test_sampling_logger", level="DEBUG", log_to_file=False,
+                            log_to_console=True, log_to_db=True, db_sample_rate=0.01)
+        db_handlers = [h for h in logger.handlers if isinstance(h, DatabaseLogHandler)]
+        other_handlers = [h for h in logger.handlers if not isinstance(h, DatabaseLogHandler)]
+
+        self.assertEqual(len(db_handlers), 1)
+        self.assertEqual(db_handlers[0].level, logging.DEBUG)
+        self.assertTrue(any(isinstance(f, SamplingFilter) for f in db_handlers[0].filters))
+        for handler in other_handlers:
+            self.assertEqual(handler.filters, [])
+
+
+class TestDatabaseLogHandler(unittest.TestCase):
+    """Testy dla buforowanego handlera zapisującego logi w bazie danych."""
+
+    def _record(self, msg):
+        return logging.LogRecord("test_module", logging.INFO, __file__, 1, msg, None, None)
+
+    def test_flush_writes_single_batch(self):
+        """Test zapisu zbuforowanych rekordów jednym wywołaniem."""
+        handler = DatabaseLogHandler(batch_size=100, flush_interval=60)
+        handler.db_handler = MagicMock()
+        for i in range(3):
+            handler.emit(self._record(f"msg {i}"))
+        handler.db_handler.insert_logs_batch.assert_not_called()
+        
+        handler.close()
+        handler.db_handler.insert_logs_batch.assert_called_once_with([
+            ("INFO", "test_module", "msg 0"),
+            ("INFO", "test_module", "msg 1"),
+            ("INFO", "test_module", "msg 2"),
+        ])
+
+    def test_full_batch_flushed_in_background(self):
+        """Test zapisu w tle po zebraniu pełnej partii rekordów."""
+        handler = DatabaseLogHandler(batch_size=2, flush_interval=60)
+        handler.db_handler = MagicMock()
+        flushed = threading.Event()
+        handler.db_handler.insert_logs_batch.side_effect = lambda rows: flushed.set()
+        
+        handler.emit(self._record("a"))
+        handler.emit(self._record("b"))
+        
+        self.assertTrue(flushed.wait(5))
+        handler.close()
+        self.assertEqual(len(handler.db_handler.insert_logs_batch.call_args[0][0]), 2)
+
+    def test_buffer_drops_oldest_records(self):
+        """Test odrzucania najstarszych rekordów po przepełnieniu bufora."""
+        handler = DatabaseLogHandler(batch_size=100, flush_interval=60, capacity=2)
+        handler.db_handler = MagicMock()
+        for msg in ("a", "b", "c"):
+            handler.emit(self._record(msg))
+        
+        handler.close()
+        rows = handler.db_handler.insert_logs_batch.call_args[0][0]
+        self.assertEqual([row[2] for row in rows], ["b", "c"])
+
+    def test_failed_connection_keeps_records(self):
+        """Test zachowania rekordów w buforze, gdy nie można utworzyć połączenia z bazą."""
+        handler = DatabaseLogHandler(batch_size=100, flush_interval=60)
+        for msg in ("a", "b"):
+            handler.emit(self._record(msg))
+        
+        with patch("Database.database.DatabaseHandler",
+                   side_effect=sqlite3.OperationalError("database is locked")):
+            handler.flush()
+        self.assertIsNone(handler.db_handler)
+        
+        handler.emit(self._record("c"))
+        handler.db_handler = MagicMock()
+        handler.close()
+        rows = handler.db_handler.insert_logs_batch.call_args[0][0]
+        self.assertEqual([row[2] for row in rows], ["a", "b", "c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Testy jednostkowe dla modułu run_dashboard.py uruchamiającego dashboard.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Dodaj ścieżkę główną projektu do sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Dashboard import run_dashboard
+from Dashboard.run_dashboard import load_config
+
+
+class TestLoadConfig(unittest.TestCase):
+    """Testy dla funkcji load_config."""
+
+    def setUp(self):
+        """Przygotowanie katalogu z plikiem konfiguracyjnym."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, "test_config.json")
+        with open(self.config_path, 'w') as f:
+            json.dump({"dashboard": {"port": 5000}}, f)
+        
+        self.config_dir_patcher = patch.object(run_dashboard, 'CONFIG_DIR', Path(self.temp_dir.name))
+        self.config_dir_patcher.start()
+        run_dashboard._CONFIG_CACHE.clear()
+
+    def tearDown(self):
+        """Sprzątanie po testach."""
+        self.config_dir_patcher.stop()
+        self.temp_dir.cleanup()
+
+    def test_config_parsed_once(self):
+        """Test ponownego użycia sparsowanej konfiguracji dla niezmienionego pliku."""
+        with patch('Dashboard.run_dashboard.parse_config',
+                   wraps=run_dashboard.parse_config) as mock_parse:
+            first = load_config("test")
+            second = load_config("test")
+        
+        self.assertEqual(first, {"dashboard": {"port": 5000}})
+        self.assertEqual(second, first)
+        self.assertEqual(mock_parse.call_count, 1)
+
+    def test_returned_config_is_a_copy(self):
+        """Test odporności bufora na modyfikacje zwróconej konfiguracji."""
+        config = load_config("test")
+        config["dashboard"]["port"] = 8080
+        
+        self.assertEqual(load_config("test")["dashboard"]["port"], 5000)
+
+    def test_config_reloaded_after_change(self):
+        """Test ponownego parsowania pliku po zmianie czasu modyfikacji."""
+        load_config("test")
+        
+        with open(self.config_path, 'w') as f:
+            json.dump({"dashboard": {"port": 8080}}, f)
+        stat = os.stat(self.config_path)
+        os.utime(self.config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        
+        self.assertEqual(load_config("test")["dashboard"]["port"], 8080)
+        self.assertEqual(len(run_dashboard._CONFIG_CACHE), 1)
+
+    def test_config_loaded_from_cache_file(self):
+        """Test odczytu konfiguracji z bufora pickle bez ponownego parsowania JSON."""
+        load_config("test")
+        self.assertTrue((Path(self.temp_dir.name) / run_dashboard.CONFIG_CACHE_FILE).exists())
+        
+        run_dashboard._CONFIG_CACHE.clear()
+        with patch('Dashboard.run_dashboard.parse_config',
+                   wraps=run_dashboard.parse_config) as mock_parse:
+            config = load_config("test")
+        
+        self.assertEqual(config, {"dashboard": {"port": 5000}})
+        mock_parse.assert_not_called()
+
+    def test_default_config_for_missing_file(self):
+        """Test konfiguracji domyślnej zależnej od środowiska przy braku pliku."""
+        config = load_config("prod")
+        config["database"]["url"] = "sqlite:///changed.db"
+        
+        self.assertEqual(config["environment"], "prod")
+        self.assertFalse(config["dashboard"]["debug"])
+        self.assertEqual(config["dashboard"]["log_level"], "INFO")
+        self.assertEqual(run_dashboard._DEFAULT_CONFIG["database"]["url"],
+                         "sqlite:///data/llm_trader.db")
+        self.assertTrue(load_config("dev")["dashboard"]["debug"])
+
+    def test_invalid_config_exits(self):
+        """Test zakończenia programu przy niepoprawnym pliku konfiguracyjnym."""
+        with open(self.config_path, 'w') as f:
+            f.write("{niepoprawny json")
+        
+        with self.assertRaises(SystemExit) as context:
+            load_config("test")
+        self.assertEqual(context.exception.code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
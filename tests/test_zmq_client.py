@@ -0,0 +1,149 @@
+"""
+Testy dla modułu zmq_client.py komunikującego się z Expert Advisor przez ZeroMQ.
+"""
+
+import os
+import sys
+import json
+import time
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch, MagicMock
+
+# Dodanie ścieżki głównego katalogu projektu do PYTHONPATH
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from Common import zmq_client
+from Common.zmq_client import ZmqClient, ACK_TOPIC
+
+
+class TestZmqClientAcks(unittest.TestCase):
+    """Testy obsługi potwierdzeń sygnałów przez wątek w tle."""
+
+    def setUp(self):
+        # Sockety ZeroMQ zastępowane są atrapami - testy nie wymagają działającego EA
+        context_patcher = patch('Common.zmq_client.zmq.Context')
+        context_patcher.start()
+        self.addCleanup(context_patcher.stop)
+        self.client = ZmqClient(ack_timeout=0.0)
+
+    def _add_pending(self, request_id, sent_at=None):
+        future = Future()
+        self.client._pending_acks[request_id] = (future, time.monotonic() if sent_at is None else sent_at)
+        return future
+
+    def test_cancelled_future_ignores_ack(self):
+        """Test pominięcia potwierdzenia dla Future anulowanego przed jego nadejściem."""
+        future = self._add_pending("abc")
+        future.cancel()
+
+        self.client._resolve_ack({"request_id": "abc", "status": "success"})
+
+        self.assertTrue(future.cancelled())
+        self.assertNotIn("abc", self.client._pending_acks)
+
+    def test_cancelled_future_ignores_expiry(self):
+        """Test pominięcia przekroczenia czasu dla anulowanego Future."""
+        future = self._add_pending("abc", sent_at=0.0)
+        future.cancel()
+
+        self.client._expire_acks()
+
+        self.assertTrue(future.cancelled())
+        self.assertEqual(self.client._pending_acks, {})
+
+    def test_dispatcher_survives_invalid_acks(self):
+        """Test dalszej pracy wątku potwierdzeń po anulowanym Future i potwierdzeniu innym niż słownik."""
+        self.client.ack_timeout = 60.0
+        cancelled = self._add_pending("anulowany")
+        cancelled.cancel()
+        pending = self._add_pending("oczekujacy")
+        frames = [
+            [ACK_TOPIC, b'[1, 2]'],
+            [ACK_TOPIC, json.dumps({"request_id": "anulowany", "status": "success"}).encode("utf-8")],
+            [ACK_TOPIC, json.dumps({"request_id": "oczekujacy", "status": "success"}).encode("utf-8")],
+        ]
+
+        def recv_multipart():
+            frame = frames.pop(0)
+            if not frames:
+                self.client._ack_stop.set()
+            return frame
+
+        self.client.ack_socket.recv_multipart.side_effect = recv_multipart
+        with patch('Common.zmq_client.zmq.Poller') as mock_poller:
+            mock_poller.return_value.poll.return_value = [(self.client.ack_socket, 1)]
+            self.client._dispatch_acks()
+
+        self.assertTrue(cancelled.cancelled())
+        self.assertEqual(pending.result(timeout=0)["status"], "success")
+
+
+class TestZmqClientSignals(unittest.TestCase):
+    """Testy publikacji i dekodowania sygnałów handlowych."""
+
+    def setUp(self):
+        context_patcher = patch('Common.zmq_client.zmq.Context')
+        context_patcher.start()
+        self.addCleanup(context_patcher.stop)
+        self.client = ZmqClient()
+
+    def test_published_signal_roundtrip(self):
+        """Test odczytu opublikowanego sygnału, z orjson i bez niego."""
+        signal = {"request_id": "abc", "action": "BUY", "entry_price": 1.1}
+        for json_module in (zmq_client.orjson, None):
+            with patch.object(zmq_client, "orjson", json_module):
+                self.client._publish(ZmqClient.signal_topic("EURUSD"), signal)
+                frames, _ = self.client.pub_socket.send_multipart.call_args
+                decoded = ZmqClient.decode_signal(frames[0])
+
+            self.assertNotIn(b" ", frames[0][1])
+            self.assertEqual(decoded, dict(signal, symbol="EURUSD"))
+
+
+class TestZmqClientBatch(unittest.TestCase):
+    """Testy zbiorczego pobierania danych rynkowych."""
+
+    def setUp(self):
+        context_patcher = patch('Common.zmq_client.zmq.Context')
+        context_patcher.start()
+        self.addCleanup(context_patcher.stop)
+        self.client = ZmqClient()
+        self.client.is_connected = True
+
+    def test_batch_returns_data_by_symbol(self):
+        """Test uzupełnienia danych zbiorczych o symbol."""
+        reply = {"type": "market_data_batch", "data": {"EURUSD": {"bid": 1.1}}}
+        with patch.object(self.client, 'request', return_value=reply):
+            data = self.client.get_market_data_batch(["EURUSD"])
+
+        self.assertEqual(data, {"EURUSD": {"bid": 1.1, "symbol": "EURUSD"}})
+        self.assertTrue(self.client.supports_batch)
+
+    def test_batch_disabled_after_timeout(self):
+        """Test wyłączenia zapytań zbiorczych, gdy EA nie odpowiedział w czasie."""
+        with patch.object(self.client, 'request', return_value=None) as mock_request:
+            self.assertIsNone(self.client.get_market_data_batch(["EURUSD", "GBPUSD"]))
+
+        mock_request.assert_called_once()
+        self.assertFalse(self.client.supports_batch)
+
+    def test_batch_disabled_after_unexpected_reply(self):
+        """Test wyłączenia zapytań zbiorczych, gdy EA nie rozpoznaje zapytania."""
+        with patch.object(self.client, 'request', return_value={"type": "error"}):
+            self.assertIsNone(self.client.get_market_data_batch(["EURUSD"]))
+
+        self.assertFalse(self.client.supports_batch)
+
+    def test_batch_disabled_after_malformed_data(self):
+        """Test wyłączenia zapytań zbiorczych, gdy dane odpowiedzi nie są słownikiem słowników."""
+        for data in (None, [], {"EURUSD": None}, {"EURUSD": 1.1}):
+            self.client.supports_batch = True
+            reply = {"type": "market_data_batch", "data": data}
+            with patch.object(self.client, 'request', return_value=reply):
+                self.assertIsNone(self.client.get_market_data_batch(["EURUSD"]))
+            self.assertFalse(self.client.supports_batch, data)
+
+
+if __name__ == '__main__':
+    unittest.main()